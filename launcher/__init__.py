@@ -26,6 +26,7 @@
 
 from app import *
 from about_box_controller import *
+from alert_rules import *
 from addexisting_controller import *
 from addnew_controller import *
 from appcontroller import *
@@ -33,19 +34,48 @@ from deploy_controller import *
 from dev_appserver_task_thread import *
 from dialoghandler import *
 from dialog_controller_base import *
+from error_groups import *
+from errors_frame import *
+from hang_watchdog import *
 from html_info_dialog import *
+from launch_detector import *
+from line_reader import *
+from line_splitter import *
 from log_console import *
+from log_dedup import *
+from log_export import *
+from log_filter import *
+from log_index import *
+from log_journal import *
+from log_merge import *
+from log_model import *
+from log_metrics import *
+from log_parser import *
+from log_segments import *
+from log_store import *
+from log_time_index import *
+from log_view import *
 from mainframe import *
 from mainframe_selection_helper import *
 from maintable import *
+from merged_log_console import *
+from metrics_frame import *
+from output_throttle import *
 from platform import *
 from prefcontroller import *
 from preferences import *
 from preferenceview import *
 from project import *
+from readiness_probe import *
+from request_stats import *
+from request_stats_frame import *
 from resizing_listctrl import *
 from runtime import *
 from settings_controller import *
+from stats_frame import *
+from task_multiplexer import *
+from task_shutdown import *
+from task_supervisor import *
 from taskcontroller import *
 from taskthread import *
 from text_frame import *
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""User-defined patterns which raise an alert when seen in output."""
+
+
+import logging
+import re
+
+
+class AlertRules(object):
+  """A set of alert patterns, compiled into one matcher.
+
+  A pattern is a literal string, or a regular expression written
+  between slashes (such as /Over.*QuotaError/).  All the patterns are
+  joined into a single regular expression, so a line is searched once
+  however many patterns there are; only for a line which matches do
+  we look for which pattern it was.  (Python's re can't combine
+  expressions with more than 100 groups between them; then each
+  pattern is tried in turn.)
+
+  Patterns which aren't valid regular expressions are logged and
+  left out.
+  """
+
+  # A pattern in the preference: /regex/ (which may hold commas) or a
+  # literal up to the next comma.
+  _PATTERN_RE = re.compile(r'\s*(/(?:[^/\\]|\\.)+/|[^,]+?)\s*(?:,|$)')
+
+  def __init__(self, patterns):
+    """Create a new AlertRules.
+
+    Args:
+      patterns: a list of patterns, as described in the class docstring.
+    """
+    # self._rules: (pattern, compiled regex) for each valid pattern
+    # self._matcher: all the rules in one compiled regex, or None
+    self._rules = []
+    for pattern in patterns:
+      if len(pattern) > 2 and pattern.startswith('/') and pattern.endswith('/'):
+        expression = pattern[1:-1]
+      else:
+        expression = re.escape(pattern)
+      try:
+        self._rules.append((pattern, re.compile(expression)))
+      except re.error, err:
+        logging.info('Ignoring bad alert pattern %s: %s' % (pattern, err))
+    self._matcher = None
+    if self._rules:
+      try:
+        self._matcher = re.compile('|'.join(['(?:%s)' % regex.pattern
+                                             for (_, regex) in self._rules]))
+      except (re.error, AssertionError), err:
+        # Too many groups for one regex; match the rules one by one.
+        logging.info('Cannot combine alert patterns: %s' % err)
+
+  @classmethod
+  def FromPreference(cls, value):
+    """Create an AlertRules from a comma-separated preference value.
+
+    Args:
+      value: a string such as 'DeadlineExceededError, /Over.*Error/',
+        or None.
+    """
+    patterns = []
+    for match in cls._PATTERN_RE.finditer(value or ''):
+      pattern = match.group(1).strip()
+      if pattern:
+        patterns.append(pattern)
+    return cls(patterns)
+
+  @property
+  def patterns(self):
+    """The valid patterns, in the order given."""
+    return [pattern for (pattern, _) in self._rules]
+
+  def Match(self, line):
+    """Return the first pattern which matches a line, or None.
+
+    Args:
+      line: a line of output.
+    """
+    if self._matcher and not self._matcher.search(line):
+      return None
+    for (pattern, regex) in self._rules:
+      if regex.search(line):
+        return pattern
+    return None
+
+
+class AlertMonitor(object):
+  """Watches one project's output for lines matching some AlertRules."""
+
+  def __init__(self, rules):
+    """Create a new AlertMonitor.
+
+    Args:
+      rules: the AlertRules to match; may be replaced with the rules
+        attribute.
+    """
+    self.rules = rules
+    self.alert_count = 0
+
+  def AddLines(self, lines):
+    """Check some lines of output against our rules.
+
+    Args:
+      lines: complete lines of output, without their newlines (see
+        LineSplitter).
+    Returns:
+      A list of (pattern, line) for each line which matched.
+    """
+    alerts = []
+    match = self.rules.Match
+    for line in lines:
+      pattern = match(line)
+      if pattern is not None:
+        alerts.append((pattern, line))
+    self.alert_count += len(alerts)
+    return alerts
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for alert_rules.py"""
+
+import unittest
+import launcher
+
+
+class AlertRulesTest(unittest.TestCase):
+
+  def testFromPreference(self):
+    rules = launcher.AlertRules.FromPreference(
+        ' DeadlineExceededError,/Over\\w{1,20}Error/ , a.b, ')
+    self.assertEqual(['DeadlineExceededError', '/Over\\w{1,20}Error/', 'a.b'],
+                     rules.patterns)
+    self.assertEqual([], launcher.AlertRules.FromPreference(None).patterns)
+
+  def testMatch(self):
+    rules = launcher.AlertRules(['DeadlineExceededError', '/Over\\w+Error/',
+                                 'a.b', '/(bad/'])
+    self.assertEqual(['DeadlineExceededError', '/Over\\w+Error/', 'a.b'],
+                     rules.patterns)
+    self.assertEqual('DeadlineExceededError',
+                     rules.Match('raise DeadlineExceededError()'))
+    self.assertEqual('/Over\\w+Error/', rules.Match('OverQuotaError: x'))
+    self.assertEqual('a.b', rules.Match('in a.b'))
+    # Literals are literal.
+    self.assertEqual(None, rules.Match('in axb'))
+    self.assertEqual(None, launcher.AlertRules([]).Match('anything'))
+
+  def testManyGroups(self):
+    patterns = ['/^(x%d)$/' % i for i in range(150)]
+    rules = launcher.AlertRules(patterns)
+    self.assertEqual('/^(x149)$/', rules.Match('x149'))
+    self.assertEqual(None, rules.Match('y'))
+
+
+class AlertMonitorTest(unittest.TestCase):
+
+  def testAddLines(self):
+    monitor = launcher.AlertMonitor(launcher.AlertRules(['Oops']))
+    self.assertEqual([], monitor.AddLines(['fine']))
+    self.assertEqual([('Oops', 'Oops 1'), ('Oops', 'Oops 2')],
+                     monitor.AddLines(['Oops 1', 'ok', 'Oops 2']))
+    self.assertEqual(2, monitor.alert_count)
+    monitor.rules = launcher.AlertRules(['ok'])
+    self.assertEqual([('ok', 'ok')], monitor.AddLines(['ok']))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -54,6 +54,7 @@ class App(wx.App):
     self._CreateControllers()
     self._CreateViews()
     self._ConnectControllersToModelsViews()
+    self._ReportLastShutdown()
     self._DisplayMainFrame()
     self._VersionCheck()
     return True
@@ -128,6 +129,12 @@ class App(wx.App):
                                         table=self._table,
                                         preferences=self._preferences)
 
+  def _ReportLastShutdown(self):
+    """Note which projects weren't cleanly stopped when we last exited."""
+    projects = [self._table.ProjectAtIndex(index)
+                for index in range(self._table.ProjectCount())]
+    self._task_controller.ReportLastShutdown(projects)
+
   def _DisplayMainFrame(self):
     # Last chance to get UI up!
     self._app_controller.RefreshMainView()
@@ -248,6 +255,9 @@ Version:
     logging.warning(message % (version_data))
 
   def OnExit(self):
-    """Called when the app will exit."""
-    self._task_controller.StopAll(None)
-    self.ExitMainLoop()
+    """Called when the app will exit.
+
+    Running tasks are stopped first; the main loop is left once they
+    have (up to a deadline).  See TaskController.Shutdown().
+    """
+    self._task_controller.Shutdown(self.ExitMainLoop)
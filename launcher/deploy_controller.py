@@ -180,6 +180,11 @@ class DeployController(dialog_controller_base.DialogControllerBase):
       self._task_threads[project].start()
     return True
 
+  def TaskThreads(self):
+    """Return the TaskThreads of the deployments still running."""
+    return [thread for thread in self._task_threads.values()
+            if thread.isAlive()]
+
   def _TaskDidStop(self, project):
     """Called on the main thread when a deploy task has stopped.
 
@@ -84,6 +84,9 @@ class DeployControllerTest(unittest.TestCase):
     d._password = 'himom'
     tt = d._TaskThreadForProject(project)
     self.assertFalse(tt.isAlive())
+    # A thread that isn't running isn't one of our TaskThreads().
+    d._task_threads[project] = tt
+    self.assertEqual([], d.TaskThreads())
     # confirm stdin works.  Use python so we don't need cygwin.
     # Print out the 'Running application' string so that
     # taskthread will know to transition from WillStart to DidStart.
@@ -22,13 +22,105 @@ reflect run state.
 """
 
 
+import threading
 import wx
 import launcher
 import taskthread
 
 
 class DevAppServerTaskThread(taskthread.TaskThread):
-  """A dev_appserver.py task thread for a Project (App Engine App)."""
+  """A dev_appserver.py task thread for a Project (App Engine App).
+
+  The project is running once the dev_appserver either prints its
+  "ready" line or first answers HTTP on the project's port, whichever
+  comes first.  The HTTP probe (see launcher.ReadinessProbe) keeps
+  going until it gets an answer, so we know the time to the first
+  response even when the ready line came earlier.
+
+  An answer only means something if the port is our server's.  If the
+  port already answered before our server started (perhaps another
+  dev_appserver has it, and ours will fail to bind), we don't probe
+  it, and wait for the ready line instead.  Answers which come after
+  our process has exited are ignored.
+  """
+
+  def __init__(self, controller, project, cmd, stdin=None):
+    super(DevAppServerTaskThread, self).__init__(controller, project, cmd,
+                                                 stdin=stdin)
+    # self._probe: our ReadinessProbe, while the process runs
+    # self._probe_port: the project's port, if it was free when we
+    #   started our process; else None
+    # self._start_lock: protects self._did_start, since the ready line
+    #   and the probe's answer arrive on different threads
+    # self._did_start: True once we have told the UI we're running
+    self._probe = None
+    self._probe_port = None
+    self._start_lock = threading.Lock()
+    self._did_start = False
+    self.time_to_first_response = None
+
+  def _StartProcess(self):
+    """Start our subprocess, then start probing it over HTTP.
+
+    The port is checked first, since if it is already taken we can't
+    tell our server's answers from anyone else's.
+    """
+    port = getattr(self._project, 'port', None)
+    busy = bool(port) and self._PortInUse(port)
+    super(DevAppServerTaskThread, self)._StartProcess()
+    self._probe_port = None
+    if busy:
+      self.LogOutput('(Port %d was already in use; waiting for the '
+                     'ready line)\n' % port, date=True)
+    elif port:
+      self._probe_port = port
+      path = getattr(self._project, 'probe_path', None) or '/'
+      self._probe = launcher.ReadinessProbe(port, path,
+                                            callback=self._ProbeResponded)
+      self._ProbeScheduler().AddProbe(self._probe)
+
+  def _PortInUse(self, port):
+    """Return True if something already answers on port.
+
+    Split out for easier unit testing.
+    """
+    return launcher.ReadinessProbe.PortInUse(port)
+
+  def _ProbeScheduler(self):
+    """Return the ProbeScheduler which runs our probe.
+
+    Split out for easier unit testing.
+    """
+    return launcher.ProbeScheduler.Instance()
+
+  def _ProbeResponded(self, probe):
+    """Called on the scheduler's thread when our server first answers."""
+    if probe.cancelled:
+      return  # answered just as the process exited
+    self.time_to_first_response = probe.time_to_first_response
+    self.LogOutput('(First HTTP response, %d, after %.2f seconds)\n' %
+                   (probe.status, probe.time_to_first_response), date=True)
+    self._TaskDidStart()
+
+  def _HandleExit(self, code):
+    """Stop probing, then handle the exit of our subprocess."""
+    if self._probe:
+      self._ProbeScheduler().RemoveProbe(self._probe)
+    self._start_lock.acquire()
+    try:
+      self._did_start = True  # too late to be running now
+    finally:
+      self._start_lock.release()
+    super(DevAppServerTaskThread, self)._HandleExit(code)
+
+  @property
+  def probe_port(self):
+    """The port on which our server answers HTTP, or None if unknown.
+
+    That is the port announced in the ready line, if any; else the
+    project's port, unless it was taken before our server started.
+    """
+    return self.served_port or self._probe_port
 
   def _TaskWillStart(self):
     """Update the UI to reflect that our project is launching."""
@@ -37,7 +129,17 @@ class DevAppServerTaskThread(taskthread.TaskThread):
     self._ChangeProcessRunState(launcher.Project.STATE_STARTING)
 
   def _TaskDidStart(self):
-    """Update the UI to reflect that our project has started running."""
+    """Update the UI to reflect that our project has started running.
+
+    Only the first call (from the ready line or the probe) does so.
+    """
+    self._start_lock.acquire()
+    try:
+      if self._did_start:
+        return
+      self._did_start = True
+    finally:
+      self._start_lock.release()
     self._ChangeProcessRunState(launcher.Project.STATE_RUN)
 
   def _TaskDidStop(self, returncode):
@@ -50,7 +152,8 @@ class DevAppServerTaskThread(taskthread.TaskThread):
       returncode: The proces return (exit) code of the process this thread
                   is monitoring.
     """
-    if launcher.Platform().IsSuccessfulCommandResultCode(returncode):
+    if launcher.Platform().IsSuccessfulCommandResultCode(returncode,
+                                                         self._killed):
       self._ChangeProcessRunState(launcher.Project.STATE_STOP)
     else:
       self._ChangeProcessRunState(launcher.Project.STATE_DIED)
@@ -59,10 +162,12 @@ class DevAppServerTaskThread(taskthread.TaskThread):
     """Change the process run state and update the UI.
 
     We need to only update the UI only in the main thread, so we use
-    wx.CallAfter().
+    wx.CallAfter().  Pending output is flushed first so it is displayed
+    before the state change.
 
     Args:
       state: the new run state (e.g. launcher.STOP, launcher.RUN)
     """
     self.project.runstate = state
+    self._FlushOutput()
     wx.CallAfter(self._controller.RunStateChanged, self.project)
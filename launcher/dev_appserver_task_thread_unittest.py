@@ -18,6 +18,7 @@
 """Unit test for dev_appserver_task_thread.py"""
 
 
+import sys
 import unittest
 import wx
 import launcher
@@ -33,6 +34,10 @@ class DevAppServerTaskThreadTest(unittest.TestCase):
     """We use ourself as a fake controller for convenience."""
     self.project_changed = project
 
+  def DisplayProjectOutput(self, project, text):
+    """Output goes nowhere; we're the fake controller here, too."""
+    pass
+
   def FakeCallAfter(self, callable, project):
     callable(project)
 
@@ -77,6 +82,56 @@ class DevAppServerTaskThreadTest(unittest.TestCase):
 
     wx.CallAfter = orig_callafter
 
+  def testProbeResponded(self):
+    """The first of the ready line and the HTTP probe marks us running."""
+    datt = launcher.DevAppServerTaskThread(self, self, None)
+    orig_callafter = wx.CallAfter
+    calls = []
+    wx.CallAfter = lambda callable, *args: calls.append(args)
+    try:
+      probe = launcher.ReadinessProbe(8080)
+      probe.status = 200
+      probe.time_to_first_response = 1.25
+      self.runstate = launcher.Project.STATE_STARTING
+      datt._ProbeResponded(probe)
+      self.assertEqual(launcher.Project.STATE_RUN, self.runstate)
+      self.assertEqual(1.25, datt.time_to_first_response)
+      # The output was flushed, with the time, before the state change.
+      self.assertTrue('after 1.25 seconds' in calls[-2][1])
+      # The ready line, coming later, changes nothing.
+      self.runstate = None
+      datt._TaskDidStart()
+      self.assertEqual(None, self.runstate)
+    finally:
+      wx.CallAfter = orig_callafter
+
+  def testPortInUse(self):
+    """A port which answered before we started is not probed."""
+    datt = launcher.DevAppServerTaskThread(self, self,
+                                           [sys.executable, '-c', ''])
+    datt._PortInUse = lambda port: True
+    probes = []
+    datt._ProbeScheduler = lambda: self
+    self.AddProbe = probes.append
+    orig_callafter = wx.CallAfter
+    wx.CallAfter = lambda callable, *args: None
+    try:
+      self.port = 8080
+      self.runstate = launcher.Project.STATE_STOP
+      datt._StartProcess()
+      datt.process.wait()
+      self.assertEqual([], probes)
+      self.assertEqual(None, datt.probe_port)
+      # A free port is probed.
+      datt._PortInUse = lambda port: False
+      self.runstate = launcher.Project.STATE_STOP
+      datt._StartProcess()
+      datt.process.wait()
+      self.assertEqual(1, len(probes))
+      self.assertEqual(8080, datt.probe_port)
+    finally:
+      wx.CallAfter = orig_callafter
+
 
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Grouping of the Python tracebacks in a project's output."""
+
+
+import os
+import re
+import time
+
+
+class ErrorGroup(object):
+  """The tracebacks with one fingerprint, and when they were seen.
+
+  Only the text of the latest traceback is kept, so the memory used
+  doesn't grow with the count.
+  """
+
+  def __init__(self, fingerprint, exception_type, frames):
+    """Create a new ErrorGroup.
+
+    Args:
+      fingerprint: the key the group is counted under (see
+        ErrorGroups.Fingerprint()).
+      exception_type: the exception's type, such as 'KeyError'.
+      frames: the (filename, line number, function) of each frame of
+        the first traceback, outermost first.
+    """
+    self.fingerprint = fingerprint
+    self.exception_type = exception_type
+    self.frames = frames
+    self.count = 0
+    self.first_seen = None
+    self.last_seen = None
+    self.message = ''
+    self.text = ''
+
+  def AddTraceback(self, message, text, when):
+    """Count one traceback.
+
+    Args:
+      message: the exception's message.
+      text: the whole traceback.
+      when: the time it was seen, in seconds since the epoch.
+    """
+    self.count += 1
+    if self.first_seen is None:
+      self.first_seen = when
+    self.last_seen = when
+    self.message = message
+    self.text = text
+
+  def Where(self):
+    """Return where the exception was raised, like 'main.py:12 in get'."""
+    if not self.frames:
+      return ''
+    (filename, line, function) = self.frames[-1]
+    return '%s:%d in %s' % (os.path.basename(filename), line, function)
+
+
+class ErrorGroups(object):
+  """A streaming parser which groups the tracebacks in a project's output.
+
+  A traceback starts with a 'Traceback (most recent call last):' line,
+  then has a '  File ...' line (and usually a source line) for each
+  frame, and ends with an unindented line naming the exception, such
+  as 'KeyError: 3'.  Tracebacks are assembled a line at a time as
+  output arrives, then counted by fingerprint: the exception type and
+  the innermost TOP_FRAMES frames.  Line numbers aren't part of the
+  fingerprint, so editing a file doesn't split a group.
+  """
+
+  # Innermost frames which make up a fingerprint.
+  TOP_FRAMES = 3
+  # Fingerprints beyond this many are all counted as OTHER_TYPE.
+  MAX_GROUPS = 500
+  OTHER_TYPE = '(other)'
+  # A traceback longer than this is cut off, and its exception unknown.
+  MAX_TRACEBACK_LINES = 500
+  UNKNOWN_TYPE = '(unknown)'
+
+  _START = 'Traceback (most recent call last):'
+  _FRAME_RE = re.compile(r'^\s+File "([^"]*)", line (\d+), in (.*)$')
+  _EXCEPTION_RE = re.compile(r'^([A-Za-z_][\w.]*)(?::\s?(.*))?$')
+
+  def __init__(self, clock=time.time):
+    """Create a new ErrorGroups.
+
+    Args:
+      clock: a function returning the time in seconds; for unittests.
+    """
+    # self._groups: maps fingerprints to ErrorGroups
+    # self._lines: lines of the traceback being assembled, or None
+    # self._frames: (filename, line, function) of its frames so far
+    self._clock = clock
+    self._groups = {}
+    self._lines = None
+    self._frames = []
+    self.traceback_count = 0
+
+  def AddLines(self, lines):
+    """Look for tracebacks in some output.
+
+    Args:
+      lines: complete lines of output, without their newlines (see
+        LineSplitter).
+    """
+    for line in lines:
+      if self._lines is not None or self._START in line:
+        self.FeedLine(line)
+
+  def FeedLine(self, line):
+    """Add a line of output to the traceback being assembled, if any.
+
+    Args:
+      line: a line of output, without its newline.
+    Returns:
+      The ErrorGroup of the traceback the line finished, or None.
+    """
+    line = line.rstrip('\r')
+    if self._lines is None:
+      if self._START in line:
+        self._lines = [line]
+        self._frames = []
+      return None
+    match = self._FRAME_RE.match(line)
+    if match:
+      (filename, number, function) = match.groups()
+      self._frames.append((filename, int(number), function))
+    elif not line[:1].isspace():
+      match = self._EXCEPTION_RE.match(line)
+      if match:
+        self._lines.append(line)
+        return self._Finish(match.group(1), match.group(2) or '')
+      # Cut off by some other output; that may be a new traceback.
+      group = self._Finish(self.UNKNOWN_TYPE, '')
+      self.FeedLine(line)
+      return group
+    self._lines.append(line)
+    if len(self._lines) >= self.MAX_TRACEBACK_LINES:
+      return self._Finish(self.UNKNOWN_TYPE, '')
+    return None
+
+  def _Finish(self, exception_type, message):
+    """Count the traceback just assembled, and return its ErrorGroup."""
+    frames = self._frames
+    text = '\n'.join(self._lines) + '\n'
+    self._lines = None
+    self._frames = []
+    fingerprint = self.Fingerprint(exception_type, frames)
+    group = self._groups.get(fingerprint)
+    if group is None:
+      if len(self._groups) >= self.MAX_GROUPS:
+        fingerprint = (self.OTHER_TYPE,)
+        group = self._groups.get(fingerprint)
+      if group is None:
+        group = self._groups[fingerprint] = ErrorGroup(
+            fingerprint, fingerprint[0], frames)
+    group.AddTraceback(message, text, self._clock())
+    self.traceback_count += 1
+    return group
+
+  def Fingerprint(self, exception_type, frames):
+    """Return the key a traceback is counted under.
+
+    Args:
+      exception_type: the exception's type, such as 'KeyError'.
+      frames: the (filename, line number, function) of each frame,
+        outermost first.
+    """
+    top = [(filename, function)
+           for (filename, _, function) in frames[-self.TOP_FRAMES:]]
+    return tuple([exception_type] + top)
+
+  def Groups(self):
+    """Return a list of ErrorGroups, most recently seen first."""
+    groups = self._groups.values()
+    groups.sort(key=lambda group: (-group.last_seen, -group.count))
+    return groups
+
+  def Reset(self):
+    """Forget all tracebacks (but finish assembling the current one)."""
+    self._groups = {}
+    self.traceback_count = 0
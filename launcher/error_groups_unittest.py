@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for error_groups.py"""
+
+import unittest
+import launcher
+
+
+_TRACEBACK = (
+    'ERROR    2009-04-08 23:09:25,456 __init__.py:388] oops\n'
+    'Traceback (most recent call last):\n'
+    '  File "/sdk/webapp/__init__.py", line 507, in __call__\n'
+    '    handler.get(*groups)\n'
+    '  File "/app/main.py", line %d, in get\n'
+    '    raise KeyError(%d)\n'
+    'KeyError: %d\n'
+    'INFO     2009-04-08 23:09:25,457 dev_appserver.py:2906] "GET / HTTP/1.1"\n')
+
+
+class ErrorGroupsTest(unittest.TestCase):
+
+  def setUp(self):
+    self.now = 100.0
+    self.groups = launcher.ErrorGroups(clock=lambda: self.now)
+
+  def FeedText(self, text):
+    """Add the complete lines of some text to self.groups."""
+    self.groups.AddLines(launcher.LineSplitter().Split(text))
+
+  def testGrouping(self):
+    groups = self.groups
+    self.FeedText(_TRACEBACK % (12, 1, 1))
+    self.now = 200.0
+    # Same frames at another line number, with another message.
+    self.FeedText(_TRACEBACK % (14, 2, 2))
+    self.assertEqual(2, groups.traceback_count)
+    [group] = groups.Groups()
+    self.assertEqual(2, group.count)
+    self.assertEqual('KeyError', group.exception_type)
+    self.assertEqual('2', group.message)
+    self.assertEqual(100.0, group.first_seen)
+    self.assertEqual(200.0, group.last_seen)
+    self.assertEqual('main.py:12 in get', group.Where())
+    self.assertTrue(group.text.startswith('Traceback'))
+    self.assertTrue(group.text.endswith('KeyError: 2\n'))
+    self.assertEqual(6, len(group.text.splitlines()))
+
+  def testIncremental(self):
+    groups = self.groups
+    splitter = launcher.LineSplitter()
+    text = _TRACEBACK % (12, 1, 1)
+    for i in range(0, len(text), 7):
+      groups.AddLines(splitter.Split(text[i:i + 7]))
+    self.assertEqual(1, groups.traceback_count)
+    self.FeedText((_TRACEBACK % (12, 1, 1)).replace('KeyError', 'IOError'))
+    self.assertEqual(['IOError', 'KeyError'],
+                     sorted([g.exception_type for g in groups.Groups()]))
+
+  def testCutOff(self):
+    groups = self.groups
+    self.FeedText('Traceback (most recent call last):\n'
+                  '  File "a.py", line 1, in f\n'
+                  'INFO     2009-04-08 23:09:25,457 x.py:1] next\n'
+                  'Traceback (most recent call last):\n'
+                  '  File "b.py", line 1, in g\n'
+                  'ValueError\n')
+    types = sorted([g.exception_type for g in groups.Groups()])
+    self.assertEqual([launcher.ErrorGroups.UNKNOWN_TYPE, 'ValueError'], types)
+
+  def testMaxGroups(self):
+    groups = self.groups
+    groups.MAX_GROUPS = 2
+    for name in ('A', 'B', 'C', 'D'):
+      self.FeedText('Traceback (most recent call last):\n%sError\n' % name)
+    types = sorted([(g.exception_type, g.count) for g in groups.Groups()])
+    self.assertEqual([(launcher.ErrorGroups.OTHER_TYPE, 2), ('AError', 1),
+                      ('BError', 1)], types)
+    groups.Reset()
+    self.assertEqual([], groups.Groups())
+    self.assertEqual(0, groups.traceback_count)
+
+
+if __name__ == '__main__':
+  unittest.main()
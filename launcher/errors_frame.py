@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Window showing the grouped tracebacks of a project."""
+
+
+import time
+import wx
+import stats_frame
+
+
+class ErrorsFrame(stats_frame.StatsFrame):
+  """Table of a project's tracebacks, one row per fingerprint (view in MVC).
+
+  The table is refreshed from an ErrorGroups; see StatsFrame.
+  Selecting a row shows the latest traceback of that group below the
+  table.
+  """
+
+  # Column labels, and a function of an ErrorGroup for each.
+  COLUMNS = (
+      ('Count', lambda g: str(g.count)),
+      ('Exception', lambda g: g.exception_type),
+      ('Message', lambda g: g.message),
+      ('Where', lambda g: g.Where()),
+      ('First Seen', lambda g: _FormatTime(g.first_seen)),
+      ('Last Seen', lambda g: _FormatTime(g.last_seen)),
+  )
+
+  def __init__(self, project, groups):
+    """Create a new ErrorsFrame.
+
+    Args:
+      project: the Project whose errors we show.
+      groups: the ErrorGroups for that project.
+    """
+    title = 'Errors (%s)' % project.name
+    super(ErrorsFrame, self).__init__(
+        project, groups, title, size=(700, 400),
+        list_style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+    self._rows = []
+    self._list.SetColumnWidth(2, 250)
+    self._list.SetColumnWidth(3, 150)
+    self.Bind(wx.EVT_LIST_ITEM_SELECTED, self.OnSelect, self._list)
+    self._text_ctrl = wx.TextCtrl(
+        self, -1, style=wx.TE_MULTILINE | wx.TE_READONLY | wx.TE_DONTWRAP)
+    sizer = wx.BoxSizer(wx.VERTICAL)
+    sizer.Add(self._list, 1, wx.EXPAND)
+    sizer.Add(self._text_ctrl, 1, wx.EXPAND)
+    sizer.Add(self._ResetButton(), 0, wx.ALIGN_RIGHT | wx.ALL, 2)
+    self.SetSizer(sizer)
+    self.RefreshTable()
+
+  def RefreshTable(self):
+    """Fill the table with the current groups, keeping the selection."""
+    selected = self._SelectedGroup()
+    self._rows = self._model.Groups()
+    self._FillTable([[value(group) for (_, value) in self.COLUMNS]
+                     for group in self._rows])
+    if selected in self._rows:
+      self._list.Select(self._rows.index(selected))
+    else:
+      self._text_ctrl.SetValue('')
+    self.SetStatusText('%d tracebacks in %d groups' %
+                       (self._model.traceback_count, len(self._rows)))
+
+  def _SelectedGroup(self):
+    """Return the ErrorGroup of the selected row, or None."""
+    row = self._list.GetFirstSelected()
+    if 0 <= row < len(self._rows):
+      return self._rows[row]
+    return None
+
+  def OnSelect(self, event):
+    """Show the selected group's latest traceback.  Called directly from UI."""
+    group = self._SelectedGroup()
+    if group:
+      self._text_ctrl.SetValue(group.text)
+
+
+def _FormatTime(when):
+  """Format a time for the table; '' if unknown."""
+  if when is None:
+    return ''
+  return time.strftime('%Y-%m-%d %X', time.localtime(when))
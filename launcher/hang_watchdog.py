@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Spotting running dev_appservers which have hung."""
+
+
+import time
+import launcher
+
+
+class HangWatchdog(object):
+  """Watches running tasks for signs of life, and says which have hung.
+
+  A task shows it is alive when any of these change between checks:
+  the bytes of output read from it, the CPU time its process has used
+  (where the platform can tell; see Platform.ProcessCpuSeconds()), or
+  an answer to the HTTP ping we send its probe_port (if it has one)
+  once it has shown no other sign of life for PING_INTERVAL_SECONDS
+  (a one-attempt ReadinessProbe, run by the shared ProbeScheduler).
+  Pings are only sent to quiet tasks since each one runs a handler of
+  the app and adds a line to its output.
+  An idle server uses no CPU and prints nothing, but still answers;
+  a busy one may not answer, but uses CPU.  A task with no sign of
+  life for the timeout is unresponsive.
+
+  Check() is meant to be called every few seconds on the main thread.
+  It costs a stat file read per task (on Linux) and no more than a
+  ping per task per PING_INTERVAL_SECONDS on the probe thread.
+  """
+
+  DEFAULT_TIMEOUT_SECONDS = 60.0
+  PING_INTERVAL_SECONDS = 10.0
+
+  def __init__(self, timeout_seconds=DEFAULT_TIMEOUT_SECONDS, platform=None,
+               scheduler=None, clock=time.time):
+    """Create a new HangWatchdog.
+
+    Args:
+      timeout_seconds: seconds without a sign of life before a task is
+        unresponsive.
+      platform: a launcher.Platform, for CPU times; if None, a default.
+      scheduler: the ProbeScheduler to ping with; if None, the shared one.
+      clock: a function returning the time in seconds; for unittests.
+    """
+    # self._watched: a _Liveness for each task, indexed by task
+    self.timeout_seconds = timeout_seconds
+    self._platform = platform or launcher.Platform()
+    self._scheduler = scheduler or launcher.ProbeScheduler.Instance()
+    self._clock = clock
+    self._watched = {}
+
+  def Check(self, tasks):
+    """Look for signs of life in running tasks.
+
+    Tasks not passed are no longer watched.
+
+    Args:
+      tasks: the TaskThreads of the running dev_appservers.
+    Returns:
+      A (hung, recovered) tuple: lists of the tasks which have just
+      become unresponsive, and of those which just came back.
+    """
+    now = self._clock()
+    hung = []
+    recovered = []
+    for task in tasks:
+      liveness = self._watched.get(task)
+      if not liveness:
+        liveness = self._watched[task] = _Liveness(now)
+      if self._SawLife(task, liveness, now):
+        liveness.last_alive = now
+        if liveness.unresponsive:
+          liveness.unresponsive = False
+          recovered.append(task)
+      elif (not liveness.unresponsive and
+            now - liveness.last_alive >= self.timeout_seconds):
+        liveness.unresponsive = True
+        hung.append(task)
+    for task in self._watched.keys():
+      if task not in tasks:
+        self._Forget(task)
+    return (hung, recovered)
+
+  def _SawLife(self, task, liveness, now):
+    """Return True if a task has shown a sign of life since last checked.
+
+    Also sends the task a new ping, when it has been quiet long enough.
+    """
+    alive = False
+    bytes_read = task.bytes_read
+    if bytes_read != liveness.bytes_read:
+      liveness.bytes_read = bytes_read
+      alive = True
+    process = task.process
+    if process:
+      cpu_seconds = self._platform.ProcessCpuSeconds(process.pid)
+      if cpu_seconds is not None and cpu_seconds != liveness.cpu_seconds:
+        if liveness.cpu_seconds is not None:
+          alive = True
+        liveness.cpu_seconds = cpu_seconds
+    ping = liveness.ping
+    if ping and ping.time_to_first_response is not None:
+      alive = True
+      liveness.ping = ping = None
+    elif ping and (ping.Exhausted() or ping.cancelled):
+      liveness.ping = ping = None
+    port = getattr(task, 'probe_port', None)
+    if (not alive and not ping and port and
+        now - liveness.last_alive >= self.PING_INTERVAL_SECONDS and
+        now - liveness.last_ping >= self.PING_INTERVAL_SECONDS):
+      liveness.last_ping = now
+      liveness.ping = launcher.ReadinessProbe(
+          port, getattr(task.project, 'probe_path', None) or '/',
+          max_attempts=1)
+      self._scheduler.AddProbe(liveness.ping)
+    return alive
+
+  def _Forget(self, task):
+    """Stop watching a task."""
+    liveness = self._watched.pop(task)
+    if liveness.ping:
+      self._scheduler.RemoveProbe(liveness.ping)
+
+  def IsUnresponsive(self, task):
+    """Return True if a task is unresponsive."""
+    liveness = self._watched.get(task)
+    return bool(liveness and liveness.unresponsive)
+
+  def WatchedCount(self):
+    """Return the number of tasks being watched."""
+    return len(self._watched)
+
+
+class _Liveness(object):
+  """What we last saw of one task."""
+
+  def __init__(self, now):
+    self.last_alive = now
+    self.last_ping = now
+    self.bytes_read = None
+    self.cpu_seconds = None
+    self.ping = None
+    self.unresponsive = False
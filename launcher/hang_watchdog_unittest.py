@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for hang_watchdog.py"""
+
+import unittest
+import launcher
+import testutil
+
+
+class FakeProject(object):
+  probe_path = None
+
+
+class FakeProcess(object):
+  pid = 42
+
+
+class FakeTask(object):
+
+  def __init__(self):
+    self.project = FakeProject()
+    self.process = FakeProcess()
+    self.bytes_read = 0
+    self.probe_port = 8080
+
+
+class FakePlatform(object):
+
+  def __init__(self):
+    self.cpu_seconds = None
+
+  def ProcessCpuSeconds(self, pid):
+    return self.cpu_seconds
+
+
+class FakeScheduler(object):
+
+  def __init__(self):
+    self.probes = []
+
+  def AddProbe(self, probe):
+    self.probes.append(probe)
+
+  def RemoveProbe(self, probe):
+    probe.cancelled = True
+
+
+class HangWatchdogTest(unittest.TestCase):
+
+  def setUp(self):
+    self.clock = testutil.FakeClock()
+    self.platform = FakePlatform()
+    self.scheduler = FakeScheduler()
+    self.watchdog = launcher.HangWatchdog(60, self.platform, self.scheduler,
+                                          self.clock)
+    self.task = FakeTask()
+
+  def Check(self, seconds):
+    """Let seconds pass, then check our task."""
+    self.clock.now += seconds
+    return self.watchdog.Check([self.task])
+
+  def AnswerPings(self):
+    for probe in self.scheduler.probes:
+      if not probe.cancelled:
+        probe.attempts = 1
+        probe.time_to_first_response = 0.01
+
+  def testQuietTaskHangs(self):
+    self.assertEqual(([], []), self.Check(0))
+    self.assertEqual(([], []), self.Check(59))
+    self.assertEqual(([self.task], []), self.Check(1))
+    self.assertTrue(self.watchdog.IsUnresponsive(self.task))
+    # Only reported once.
+    self.assertEqual(([], []), self.Check(30))
+    self.task.bytes_read += 10
+    self.assertEqual(([], [self.task]), self.Check(5))
+    self.assertFalse(self.watchdog.IsUnresponsive(self.task))
+
+  def testOutputIsLife(self):
+    self.Check(0)
+    for i in range(10):
+      self.task.bytes_read += 1
+      self.assertEqual(([], []), self.Check(30))
+
+  def testCpuIsLife(self):
+    self.platform.cpu_seconds = 1.0
+    self.Check(0)
+    for i in range(10):
+      self.platform.cpu_seconds += 0.01
+      self.assertEqual(([], []), self.Check(30))
+    self.assertEqual(([self.task], []), self.Check(60))
+
+  def testPings(self):
+    self.Check(0)
+    self.assertEqual([], self.scheduler.probes)
+    self.Check(launcher.HangWatchdog.PING_INTERVAL_SECONDS)
+    self.assertEqual(1, len(self.scheduler.probes))
+    probe = self.scheduler.probes[0]
+    self.assertEqual(8080, probe.port)
+    # No second ping while one is on its way.
+    self.Check(launcher.HangWatchdog.PING_INTERVAL_SECONDS)
+    self.assertEqual(1, len(self.scheduler.probes))
+    # An idle server which answers its pings never hangs.
+    for i in range(20):
+      self.AnswerPings()
+      self.assertEqual(([], []), self.Check(10))
+    self.assertTrue(len(self.scheduler.probes) > 5)
+
+  def testNoPingsWhileAlive(self):
+    """Tasks showing other signs of life are left alone."""
+    self.platform.cpu_seconds = 1.0
+    self.Check(0)
+    for i in range(10):
+      self.task.bytes_read += 1
+      self.Check(launcher.HangWatchdog.PING_INTERVAL_SECONDS)
+      self.platform.cpu_seconds += 0.01
+      self.Check(launcher.HangWatchdog.PING_INTERVAL_SECONDS)
+    self.assertEqual([], self.scheduler.probes)
+    # Only a full quiet interval brings a ping.
+    self.Check(launcher.HangWatchdog.PING_INTERVAL_SECONDS - 1)
+    self.assertEqual([], self.scheduler.probes)
+    self.Check(1)
+    self.assertEqual(1, len(self.scheduler.probes))
+
+  def testNoProbePort(self):
+    """A task whose port isn't known to be its own is never pinged."""
+    self.task.probe_port = None
+    self.Check(0)
+    self.Check(launcher.HangWatchdog.PING_INTERVAL_SECONDS)
+    self.assertEqual([], self.scheduler.probes)
+
+  def testUnansweredPings(self):
+    self.Check(0)
+    for i in range(5):
+      for probe in self.scheduler.probes:
+        probe.attempts = 1  # no answer
+      self.assertEqual(([], []), self.Check(10))
+    self.assertEqual(([self.task], []), self.Check(10))
+
+  def testForget(self):
+    self.Check(launcher.HangWatchdog.PING_INTERVAL_SECONDS)
+    self.Check(launcher.HangWatchdog.PING_INTERVAL_SECONDS)
+    self.assertEqual(1, self.watchdog.WatchedCount())
+    self.watchdog.Check([])
+    self.assertEqual(0, self.watchdog.WatchedCount())
+    self.assertTrue(self.scheduler.probes[0].cancelled)
+
+
+if __name__ == '__main__':
+  unittest.main()
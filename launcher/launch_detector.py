@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Detection of the "server is ready" line in dev_appserver output."""
+
+
+import logging
+import re
+
+
+class LaunchDetector(object):
+  """Spots the log line which says a subprocess has finished launching.
+
+  Patterns are compiled once, and matched with search() so there is no
+  leading '.*' to backtrack over long lines.  Once a launch has been
+  seen, Check() stops scanning.  The port in the matched line (if any)
+  is remembered, since it's the port the server actually bound.
+
+  A pattern may contain a group named 'port'; if it doesn't, its first
+  group (if any) is assumed to be the port.  Patterns which aren't
+  valid regular expressions are logged and ignored.
+  """
+
+  # Launch lines for the SDK versions we know about.
+  DEFAULT_PATTERNS = (
+      # INFO ... dev_appserver_main.py] Running application NAME on
+      # port 8080: http://localhost:8080
+      r'Running application.*http://[^:/\s]+:(?P<port>[0-9]+)',
+      # INFO ... Starting module "default" running at: http://localhost:8080
+      r'Starting \w+ .*running at: http://[^:/\s]+:(?P<port>[0-9]+)',
+  )
+
+  # Every launch line we know of contains this; it's a cheap test that
+  # lets us skip the regular expressions for most lines.
+  _REQUIRED_SUBSTRING = 'http://'
+
+  def __init__(self, patterns=None):
+    """Create a new LaunchDetector.
+
+    Args:
+      patterns: a list of regular expression strings, any of which
+        marks a launch-completed line.  If None, empty or all bad,
+        use DEFAULT_PATTERNS.
+    """
+    self._regexes = []
+    for pattern in patterns or ():
+      try:
+        self._regexes.append(re.compile(pattern))
+      except re.error, err:
+        logging.info('Ignoring bad launch pattern %s: %s' % (pattern, err))
+    # Only our own patterns are known to need _REQUIRED_SUBSTRING.
+    self._prefilter = not self._regexes
+    if not self._regexes:
+      self._regexes = [re.compile(p) for p in self.DEFAULT_PATTERNS]
+    self.launched = False
+    self.port = None
+
+  def Match(self, line):
+    """Return the match object if line is a launch line, else None.
+
+    Does not change our state; see Check() for that.
+
+    Args:
+      line: a line of output from the subprocess
+    """
+    if self._prefilter and self._REQUIRED_SUBSTRING not in line:
+      return None
+    for regex in self._regexes:
+      match = regex.search(line)
+      if match:
+        return match
+    return None
+
+  def Check(self, line):
+    """Return True the first time a launch line is seen.
+
+    After a launch has been seen, always returns False without
+    looking at the line.
+
+    Args:
+      line: a line of output from the subprocess
+    """
+    if self.launched:
+      return False
+    match = self.Match(line)
+    if not match:
+      return False
+    self.launched = True
+    self.port = self._PortFromMatch(match)
+    return True
+
+  def _PortFromMatch(self, match):
+    """Return the port number captured by a match, or None."""
+    port = match.groupdict().get('port')
+    if port is None and match.lastindex:
+      port = match.group(1)
+    try:
+      return int(port)
+    except (TypeError, ValueError):
+      return None
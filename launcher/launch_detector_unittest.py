@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for launch_detector.py"""
+
+import unittest
+import launcher
+
+
+class LaunchDetectorTest(unittest.TestCase):
+
+  def testDefaultPatterns(self):
+    detector = launcher.LaunchDetector()
+    line = ('INFO     2009-04-08 15:36:23,888 dev_appserver_main.py] Running '
+            'application TheDen on port 8015: http://localhost:8015')
+    self.assertTrue(detector.Match(line))
+    line = ('INFO     2013-08-01 10:00:00,000 dispatcher.py:164] Starting '
+            'module "default" running at: http://localhost:9080')
+    self.assertTrue(detector.Match(line))
+    for line in ('socket.error: (48, \'Address already in use\')',
+                 'INFO 2009 dev_appserver.py] "GET http://x/ HTTP/1.1" 200 -',
+                 ''):
+      self.assertFalse(detector.Match(line))
+
+  def testCheckStopsAfterLaunch(self):
+    detector = launcher.LaunchDetector()
+    self.assertFalse(detector.launched)
+    self.assertFalse(detector.Check('nothing to see here'))
+    self.assertEqual(None, detector.port)
+    self.assertTrue(detector.Check('Running application foo on port 8123: '
+                                   'http://localhost:8123'))
+    self.assertTrue(detector.launched)
+    self.assertEqual(8123, detector.port)
+    # A second launch line is ignored; the first port sticks.
+    self.assertFalse(detector.Check('Running application http://x:5'))
+    self.assertEqual(8123, detector.port)
+
+  def testCustomPatterns(self):
+    detector = launcher.LaunchDetector([r'^READY$', r'listening on (\d+)'])
+    self.assertFalse(detector.Match('Running application http://x:5'))
+    self.assertTrue(detector.Check('READY'))
+    self.assertEqual(None, detector.port)
+    detector = launcher.LaunchDetector([r'^READY$', r'listening on (\d+)'])
+    self.assertTrue(detector.Check('server listening on 4242'))
+    self.assertEqual(4242, detector.port)
+
+  def testBadPatterns(self):
+    """Bad patterns are ignored; if none is left, the defaults are used."""
+    detector = launcher.LaunchDetector([r'ready (', r'^READY$'])
+    self.assertTrue(detector.Check('READY'))
+    detector = launcher.LaunchDetector([r'ready ('])
+    self.assertFalse(detector.Match('ready ('))
+    self.assertTrue(detector.Check('Running application x on port 5: '
+                                   'http://localhost:5'))
+    self.assertEqual(5, detector.port)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Chunked line reader for subprocess pipes.
+
+subprocess.Popen() defaults to an unbuffered stdout (bufsize=0), and
+readline() on an unbuffered file does one read() system call per
+byte.  A LineReader instead reads large chunks straight into a
+reusable buffer and splits complete lines out of it.
+"""
+
+
+import errno
+import io
+
+
+class LineReader(object):
+  """Reads a file descriptor in chunks and returns complete lines.
+
+  Works with both blocking and non-blocking descriptors.  A partial
+  line at the end of a chunk is kept and completed by the next read.
+  The reader also counts bytes and lines read, which is handy for
+  measuring how much output a task produces.
+  """
+
+  # Initial buffer size.  The buffer grows if a single line is longer.
+  _BUFFER_SIZE = 65536
+
+  def __init__(self, fd, buffer_size=_BUFFER_SIZE):
+    """Create a new LineReader.
+
+    Args:
+      fd: the file descriptor to read from.  It is not closed by us.
+      buffer_size: the initial size of our read buffer.
+    """
+    # self._buffer: reusable read buffer; valid data is [_start:_end]
+    # self._start: offset of the first byte not yet returned
+    # self._end: offset just past the last byte read
+    self._file = io.FileIO(fd, 'rb', closefd=False)
+    self._buffer = bytearray(buffer_size)
+    self._start = 0
+    self._end = 0
+    self.bytes_read = 0
+    self.lines_read = 0
+    self.at_eof = False
+
+  def Read(self):
+    """Do a single read and return the complete lines it finished.
+
+    Blocks only if the descriptor is blocking.  At EOF, a final
+    unterminated line is returned as if it was complete, and at_eof
+    is set.
+
+    Returns:
+      A (possibly empty) list of lines, each ending in a newline
+      except possibly the last line before EOF.
+    """
+    if self.at_eof:
+      return []
+    self._MakeRoom()
+    try:
+      # memoryview lets readinto() write into the middle of our buffer
+      # without a copy.  Don't hold on to it: a bytearray with a live
+      # view can't be resized.
+      count = self._file.readinto(memoryview(self._buffer)[self._end:])
+    except IOError, err:
+      if err.errno in (errno.EAGAIN, errno.EINTR):
+        return []
+      count = 0
+    if count is None:
+      return []  # non-blocking and nothing to read
+    if not count:
+      self.at_eof = True
+      return self._Remainder()
+    self._end += count
+    self.bytes_read += count
+    return self._SplitLines()
+
+  def _MakeRoom(self):
+    """Make sure there is space after self._end for another read.
+
+    A leftover partial line is moved to the start of the buffer; if
+    it already fills the whole buffer, the buffer is doubled.
+    """
+    if self._start == self._end:
+      self._start = self._end = 0
+    elif self._start:
+      length = self._end - self._start
+      self._buffer[0:length] = self._buffer[self._start:self._end]
+      self._start = 0
+      self._end = length
+    if self._end == len(self._buffer):
+      self._buffer.extend(bytearray(len(self._buffer)))
+
+  def _SplitLines(self):
+    """Return the complete lines in our buffer, consuming them."""
+    lines = []
+    view = memoryview(self._buffer)
+    start = self._start
+    while True:
+      newline = self._buffer.find('\n', start, self._end)
+      if newline < 0:
+        break
+      lines.append(view[start:newline+1].tobytes())
+      start = newline + 1
+    del view
+    self._start = start
+    self.lines_read += len(lines)
+    return lines
+
+  def _Remainder(self):
+    """Return any unterminated line left in our buffer, consuming it."""
+    if self._start == self._end:
+      return []
+    line = str(self._buffer[self._start:self._end])
+    self._start = self._end = 0
+    self.lines_read += 1
+    return [line]
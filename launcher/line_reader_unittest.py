@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for line_reader.py"""
+
+import os
+import unittest
+import launcher
+
+
+class LineReaderTest(unittest.TestCase):
+
+  def ReadAll(self, data, buffer_size=16):
+    """Feed data through a pipe and a LineReader; return lines and reader."""
+    (read_end, write_end) = os.pipe()
+    os.write(write_end, data)
+    os.close(write_end)
+    reader = launcher.LineReader(read_end, buffer_size=buffer_size)
+    lines = []
+    while not reader.at_eof:
+      lines += reader.Read()
+    os.close(read_end)
+    return (lines, reader)
+
+  def testBasics(self):
+    data = 'hello\nworld\n\nlast line no newline'
+    (lines, reader) = self.ReadAll(data)
+    self.assertEqual(['hello\n', 'world\n', '\n', 'last line no newline'],
+                     lines)
+    self.assertEqual(len(data), reader.bytes_read)
+    self.assertEqual(4, reader.lines_read)
+    self.assertEqual([], reader.Read())
+
+  def testLongLines(self):
+    """Lines longer than the buffer make it grow."""
+    long_lines = ['x' * 100 + '\n', 'y' * 37 + '\n', 'z\n']
+    (lines, reader) = self.ReadAll(''.join(long_lines), buffer_size=8)
+    self.assertEqual(long_lines, lines)
+
+  def testEmpty(self):
+    (lines, reader) = self.ReadAll('')
+    self.assertEqual([], lines)
+    self.assertEqual(0, reader.bytes_read)
+    self.assertEqual(0, reader.lines_read)
+
+  def testManyLines(self):
+    expected = ['line %d\n' % i for i in range(1000)]
+    (lines, reader) = self.ReadAll(''.join(expected), buffer_size=4096)
+    self.assertEqual(expected, lines)
+    self.assertEqual(1000, reader.lines_read)
+
+
+if __name__ == '__main__':
+  unittest.main()
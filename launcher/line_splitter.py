@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Splitting output which arrives in pieces into complete lines."""
+
+
+class LineSplitter(object):
+  """Splits a stream of output into complete lines.
+
+  Text after the last newline is held until the rest of its line
+  arrives.  A project's output is split once, as it arrives, and the
+  complete lines are handed to each of its analyzers (RequestStats,
+  ErrorGroups and so on) through their AddLines().
+  """
+
+  def __init__(self):
+    # self._partial: text after the last newline
+    self._partial = ''
+
+  def Split(self, text):
+    """Return the lines some output completes.
+
+    Args:
+      text: a string of output; may hold many lines, or part of one.
+    Returns:
+      A (possibly empty) list of complete lines, without their
+      newlines.
+    """
+    if '\n' not in text:
+      self._partial += text
+      return []
+    lines = (self._partial + text).split('\n')
+    self._partial = lines.pop()
+    return lines
+
+  def PartialLine(self):
+    """Return the text after the last newline."""
+    return self._partial
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for line_splitter.py"""
+
+import unittest
+import launcher
+
+
+class LineSplitterTest(unittest.TestCase):
+
+  def testSplit(self):
+    splitter = launcher.LineSplitter()
+    self.assertEqual([], splitter.Split(''))
+    self.assertEqual(['a', 'b'], splitter.Split('a\nb\nc'))
+    self.assertEqual('c', splitter.PartialLine())
+    self.assertEqual([], splitter.Split('d'))
+    self.assertEqual(['cd', ''], splitter.Split('\n\n'))
+    self.assertEqual('', splitter.PartialLine())
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -26,7 +26,18 @@ A Project is a Google App Engine Application.
 """
 
 
+import collections
+import logging
 import wx
+import log_export
+import log_filter
+import log_index
+import log_model
+import log_parser
+import log_store
+import log_time_index
+import log_view
+import output_throttle
 import text_frame
 
 
@@ -37,33 +48,793 @@ class LogConsole(text_frame.TextFrame):
   it.  Projects which nave never launched may not yet have a
   LogConsole associated with them.  (The project does not have to be
   running.)  Closing the project window does not destroy it; is simply
-  hidden.  The LogConsole is the only store for project output.
+  hidden.  Project output is kept in a ProjectLog, which exists
+  whether or not there is a console; the console is a listener of it,
+  made only when the output is first shown.  Recent output is kept in
+  the log's bounded LogStore; the console displays only the lines the
+  store still holds, and its status bar says how many older lines
+  were dropped.
+
+  If the project also has a LogJournal (the full output, on disk), the
+  Earlier / Later buttons page back through it.  Only the page being
+  shown is read from the journal.  Live output keeps being stored (but
+  not displayed) until the Live button is pressed.
+
+  A console can instead show its output in a virtual LogView, which
+  only draws the rows on screen and so stays fast however much output
+  there is.  The view shows the whole journal if there is one (so no
+  paging is needed), else the LogStore.  See SetVirtualView().
+
+  The search box finds lines the LogStore holds with a LogIndex, which
+  is brought up to date a piece at a time when the UI is idle, so
+  indexing never holds up output.  Pressing Enter again goes to the
+  next match.
+
+  The level menu shows only the lines at or above a severity, using
+  the levels the LogStore parsed as the lines came in.  Filtered lines
+  are shown in a virtual view.
+
+  Runs of repeated lines come to us folded (see AddRepeats()), and
+  are shown as one line with a count such as '(x12)'.
+
+  Export... writes the output (all of the journal, or else what the
+  store holds) to a file on a background LogExporter.  The text
+  control's contents are never copied.
+
+  The log's sparse TimeIndex of when lines arrived lets Go to Time...
+  jump straight to the output of some moment, or pick out the lines of
+  a period (such as 10:00-10:05) to show, copy or export.
+
+  Output that comes too fast for the text control to keep up with is
+  sampled by an OutputThrottle: only the first lines of each second
+  are shown, then a count of those left out.  Only the text control
+  is sampled; the log (store and journal) and the virtual view keep
+  every line.  See SetOutputRateLimit().
   """
 
-  def __init__(self, project):
+  # Number of journal lines shown per page of scrollback.
+  SCROLLBACK_PAGE_LINES = 1000
+
+  # Most lines indexed per idle event.
+  _INDEX_LINES_PER_IDLE = 2000
+
+  # Files the Export... dialog offers to write.
+  EXPORT_WILDCARD = ('Text (*.log)|*.log|'
+                     'Gzipped text (*.log.gz)|*.log.gz|'
+                     'JSON Lines (*.jsonl)|*.jsonl|'
+                     'Gzipped JSON Lines (*.jsonl.gz)|*.jsonl.gz')
+
+  # Choices in the level menu: (label, lowest level shown).
+  LEVEL_CHOICES = (('All', 0),
+                   ('Info+', logging.INFO),
+                   ('Warning+', logging.WARNING),
+                   ('Error+', logging.ERROR))
+
+  def __init__(self, project, max_lines=log_store.LogStore.DEFAULT_MAX_LINES,
+               max_bytes=log_store.LogStore.DEFAULT_MAX_BYTES, journal=None,
+               virtual_view=False, title=None, project_log=None):
     """Create a new LogConsole.
 
     Args:
       project: the Project associated with this LogConsole.
+      max_lines: the most lines of output we keep.
+      max_bytes: the most bytes of output we keep.
+      journal: if not None, a LogJournal of all the project's output.
+      virtual_view: if True, show output in a LogView, not a text control.
+      title: the window title; defaults to one naming the project.
+      project_log: the ProjectLog to show, which may already hold
+        output; if None, we make our own (with max_lines, max_bytes
+        and journal).
     """
-    title = 'Log Console (%s)' % project.name
+    title = title or 'Log Console (%s)' % project.name
     super(LogConsole, self).__init__(title)
+    if project_log is None:
+      project_log = log_model.ProjectLog(max_lines, max_bytes, journal)
     self._project = project
+    self._log = project_log
+    self._store = project_log.store
+    self._journal = project_log.journal
+    # self._scrollback_start: first journal line shown, or None if live
+    # self._view: our LogView, or None if we show output in _text_ctrl
+    # self._filter: a LevelFilter on self._store, or None to show all
+    # self._view_for_filter: True if self._view was only made to show
+    #   self._filter, and goes once the filter does
+    # self._hits: line numbers matching self._query
+    # self._hit: index in self._hits of the match being shown
+    # self._exporter: the LogExporter writing our output, or None
+    # self._throttle: samples output too fast for the text control
+    # self._throttle_timer_scheduled: True if a throttle tick is on its way
+    # self._rendered: [log lines, text control lines, sampled] runs,
+    #   oldest first, mapping the live lines we show to the log's
+    # self._last_line_shown: True if the text control's last line is
+    #   the log's newest line
+    self._scrollback_start = None
+    self._view = None
+    self._filter = None
+    self._view_for_filter = False
+    self._index = log_index.LogIndex(self._store)
+    self._query = None
+    self._hits = []
+    self._hit = 0
+    self._exporter = None
+    self._throttle = output_throttle.OutputThrottle()
+    self._throttle_timer_scheduled = False
+    self._rendered = collections.deque()
+    self._last_line_shown = True
+    self.CreateStatusBar()
+    self._LayoutControls()
     self.Bind(wx.EVT_CLOSE, self.CloseHandler)
+    self.Bind(wx.EVT_IDLE, self.OnIdle)
+    if virtual_view:
+      self.SetVirtualView(True)
+    else:
+      self.ShowLive()
+    project_log.AddListener(self)
+
+  def _LayoutControls(self):
+    """Add the level menu, search box and paging buttons below the text."""
+    sizer = wx.BoxSizer(wx.VERTICAL)
+    sizer.Add(self._text_ctrl, 1, wx.EXPAND)
+    buttons = wx.BoxSizer(wx.HORIZONTAL)
+    self._level_choice = wx.Choice(
+        self, -1, choices=[label for (label, _) in self.LEVEL_CHOICES])
+    self._level_choice.SetSelection(0)
+    self.Bind(wx.EVT_CHOICE, self.OnLevelChoice, self._level_choice)
+    buttons.Add(self._level_choice, 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 2)
+    self._search_ctrl = wx.SearchCtrl(self, -1, style=wx.TE_PROCESS_ENTER)
+    self.Bind(wx.EVT_TEXT_ENTER, self.OnSearch, self._search_ctrl)
+    self.Bind(wx.EVT_SEARCHCTRL_SEARCH_BTN, self.OnSearch, self._search_ctrl)
+    buttons.Add(self._search_ctrl, 1, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 2)
+    self._paging_buttons = []
+    for (label, handler) in (('Earlier', self.OnEarlier),
+                             ('Later', self.OnLater),
+                             ('Live', self.OnLive)):
+      button = wx.Button(self, -1, label)
+      self.Bind(wx.EVT_BUTTON, handler, button)
+      buttons.Add(button, 0, wx.ALL, 2)
+      if handler == self.OnLive:
+        self._live_button = button
+      else:
+        self._paging_buttons.append(button)
+    time_button = wx.Button(self, -1, 'Go to Time...')
+    self.Bind(wx.EVT_BUTTON, self.OnGoToTime, time_button)
+    buttons.Add(time_button, 0, wx.ALL, 2)
+    self._export_button = wx.Button(self, -1, 'Export...')
+    self.Bind(wx.EVT_BUTTON, self.OnExport, self._export_button)
+    buttons.Add(self._export_button, 0, wx.ALL, 2)
+    self._export_gauge = wx.Gauge(self, -1, 100, size=(80, -1))
+    buttons.Add(self._export_gauge, 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 2)
+    buttons.Hide(self._export_gauge)
+    sizer.Add(buttons, 0, wx.EXPAND)
+    self.SetSizer(sizer)
+    self._EnableButtons()
+
+  def _EnableButtons(self):
+    """Enable the paging buttons only when they can do something."""
+    can_page = bool(self._journal and not self._view and not self._filter)
+    for button in self._paging_buttons:
+      button.Enable(can_page)
+    self._live_button.Enable(can_page or self._view is not None)
+
+  def _Provider(self):
+    """Return the line provider a LogView should show."""
+    return self._filter or self._journal or self._store
+
+  def _LiveText(self):
+    """Return the live text a text control should show."""
+    if self._filter:
+      return self._filter.GetText()
+    return self._store.GetText()
+
+  def SetLevelFilter(self, min_level):
+    """Show only lines at or above a severity.
+
+    Filtered lines are shown in a virtual LogView, which only fetches
+    the rows on screen, rather than by refilling the text control.
+    The text control comes back when the filter is removed.
+
+    Args:
+      min_level: the lowest level shown, such as logging.WARNING, or 0
+        to show every line.
+    """
+    if min_level:
+      self._filter = log_filter.LevelFilter(self._store, min_level)
+    else:
+      self._filter = None
+    for (index, (_, level)) in enumerate(self.LEVEL_CHOICES):
+      if level == min_level:
+        self._level_choice.SetSelection(index)
+    if self._filter and not self._view:
+      self.SetVirtualView(True)
+      self._view_for_filter = True
+    elif not self._filter and self._view_for_filter:
+      self.SetVirtualView(False)
+    elif self._view:
+      self._view.SetProvider(self._Provider())
+    else:
+      self.ShowLive()
+    self._EnableButtons()
+    self._UpdateStatus()
+
+  def OnLevelChoice(self, event):
+    """Change the level filter.  Called directly from UI."""
+    self.SetLevelFilter(self.LEVEL_CHOICES[event.GetSelection()][1])
+
+  def SetVirtualView(self, enabled):
+    """Switch between a virtual LogView and a plain text control.
+
+    Args:
+      enabled: if True, show output in a LogView.
+    """
+    self._view_for_filter = False
+    if enabled == self.IsVirtualView():
+      return
+    sizer = self.GetSizer()
+    if enabled:
+      self._scrollback_start = None
+      self._view = log_view.LogView(self, self._Provider())
+      sizer.Insert(0, self._view, 1, wx.EXPAND)
+      sizer.Hide(self._text_ctrl)
+      self._text_ctrl.Clear()
+    else:
+      sizer.Detach(self._view)
+      self._view.Destroy()
+      self._view = None
+      sizer.Show(self._text_ctrl)
+      self.ShowLive()
+    self._EnableButtons()
+    sizer.Layout()
+    self._UpdateStatus()
+
+  def IsVirtualView(self):
+    """Return True if we show output in a LogView."""
+    return self._view is not None
+
+  def SetOutputRateLimit(self, lines_per_second):
+    """Set the output rate above which the text control shows a sample.
+
+    Args:
+      lines_per_second: the most lines per second shown in full.
+    """
+    self._throttle = output_throttle.OutputThrottle(lines_per_second)
+
+  def AppendText(self, text):
+    """Append text to our log, and so to our display.
+
+    While showing scrollback, text is only stored.
+
+    Args:
+      text: a string of output to append.
+    """
+    self._log.AppendText(text)
+
+  def LogAppended(self, text, dropped):
+    """Bring the display up to date after output was added to our log.
+
+    Called by our ProjectLog.
+
+    Args:
+      text: the text added.
+      dropped: the number of lines the store dropped to make room.
+    """
+    if self._filter:
+      (added, dropped) = self._filter.Update()
+      if added and not self._view:
+        end = self._filter.EndLineNumber()
+        text = ''.join(self._filter.Lines(end - added, end))
+      else:
+        text = ''
+    if self._view:
+      self._view.ProviderChanged()
+      if dropped and not self._journal:
+        self._UpdateStatus()
+      return
+    if self._scrollback_start is not None:
+      return
+    if text:
+      self._AppendSampled(text)
+    if dropped:
+      self._RemoveLeadingLines(self._RenderedLinesDropped(dropped))
+      self._UpdateStatus()
+
+  def _AppendSampled(self, text):
+    """Append output to our text control, sampling it if it is too fast.
+
+    Args:
+      text: the text added to the lines we show.
+    """
+    lines = text.splitlines(True)
+    suppressed = self._throttle.lines_suppressed
+    shown = []
+    for line in lines:
+      admitted = self._throttle.Admit(line)
+      shown.extend(admitted)
+      self._last_line_shown = bool(admitted) and admitted[-1] is line
+    sampled = (len(shown) != len(lines) or
+               self._throttle.lines_suppressed != suppressed)
+    shown_text = ''.join(shown)
+    self._AddRendered(text.count('\n'), shown_text.count('\n'), sampled)
+    if shown_text:
+      super(LogConsole, self).AppendText(shown_text)
+    if sampled:
+      self._UpdateStatus()
+    self._ScheduleThrottleTimer()
+
+  def _OnThrottleTimer(self):
+    """Show the summary of a sampled second.  Called by a timer.
+
+    While output is sampled the timer keeps going, so the last summary
+    appears even if the output stops.
+    """
+    self._throttle_timer_scheduled = False
+    summary = ''.join(self._throttle.Tick())
+    if summary and not self._view and self._scrollback_start is None:
+      self._AddRendered(0, summary.count('\n'), True)
+      self._last_line_shown = False
+      super(LogConsole, self).AppendText(summary)
+      self._UpdateStatus()
+    self._ScheduleThrottleTimer()
+
+  def _ScheduleThrottleTimer(self):
+    """While output is sampled, arrange a call of _OnThrottleTimer()."""
+    if self._throttle.sampling and not self._throttle_timer_scheduled:
+      self._throttle_timer_scheduled = True
+      wx.CallLater(int(output_throttle.OutputThrottle.WINDOW_SECONDS * 1000),
+                   self._OnThrottleTimer)
+
+  def _AddRendered(self, log_lines, shown_lines, sampled):
+    """Record that some log lines were shown as some text control lines.
+
+    Args:
+      log_lines: the number of lines of the log (store or filter).
+      shown_lines: the number of lines put in the text control for them.
+      sampled: True if the two are not the same lines, one for one.
+    """
+    rendered = self._rendered
+    if not sampled and rendered and not rendered[-1][2]:
+      rendered[-1][0] += log_lines
+      rendered[-1][1] += shown_lines
+    else:
+      rendered.append([log_lines, shown_lines, sampled])
+
+  def _RenderedLinesDropped(self, dropped):
+    """Return the number of text control lines showing dropped log lines.
+
+    Lines of a sampled run are only removed once the whole run has
+    been dropped.
+
+    Args:
+      dropped: the number of our oldest log lines just dropped.
+    """
+    count = 0
+    rendered = self._rendered
+    while dropped and rendered:
+      (log_lines, shown_lines, sampled) = rendered[0]
+      if dropped < log_lines:
+        rendered[0][0] -= dropped
+        if not sampled:
+          rendered[0][1] -= dropped
+          count += dropped
+        return count
+      dropped -= log_lines
+      count += shown_lines
+      rendered.popleft()
+    return count + dropped
+
+  def AddRepeats(self, count):
+    """Count the newest line as seen more times, and show the new count.
+
+    Args:
+      count: the number of repeats of the newest complete line which
+        were folded out of the output.
+    """
+    self._log.AddRepeats(count)
+
+  def LogRepeated(self, count):
+    """Show the newest line's new repeat count.  Called by our ProjectLog.
+
+    Args:
+      count: how many more times the line was seen.
+    """
+    number = self._store.EndLineNumber() - 1
+    if number < self._store.FirstLineNumber():
+      return
+    if self._view:
+      self._view.ProviderChanged()
+      return
+    if self._scrollback_start is not None:
+      return
+    if self._filter and self._filter.RowForLine(number) is None:
+      return
+    if not self._last_line_shown:
+      return
+    self._ReplaceLastLine(self._store.Line(number))
+
+  def _ReplaceLastLine(self, line):
+    """Replace the last complete line in our text control.
+
+    Args:
+      line: the new text of the line, with its newline.
+    """
+    text_ctrl = self._text_ctrl
+    row = text_ctrl.GetNumberOfLines() - 2
+    start = text_ctrl.XYToPosition(0, max(0, row))
+    if start < 0:
+      return
+    text_ctrl.Replace(start, text_ctrl.GetLastPosition(), line)
+
+  def _UpdateStatus(self):
+    """Describe what we are showing in the status bar."""
+    if self._scrollback_start is not None:
+      end = min(self._scrollback_start + self.SCROLLBACK_PAGE_LINES,
+                self._journal.EndLineNumber())
+      self.SetStatusText('Lines %d-%d of %d (live output paused)' %
+                         (self._scrollback_start + 1, end,
+                          self._journal.EndLineNumber()))
+    elif self._store.dropped_lines and not (self._view and self._journal):
+      self.SetStatusText('%d earlier lines dropped' %
+                         self._store.dropped_lines)
+    else:
+      self.SetStatusText('')
+    if self._filter:
+      name = log_parser.LineParser.LEVEL_NAMES[self._filter.min_level]
+      status = 'Showing %s and above.  %s' % (
+          name.title(), self.GetStatusBar().GetStatusText())
+      self.SetStatusText(status.strip())
+    if self._throttle.lines_suppressed and not self._view:
+      status = '%s  %s fast lines not shown here.' % (
+          self.GetStatusBar().GetStatusText(),
+          format(self._throttle.lines_suppressed, ','))
+      self.SetStatusText(status.strip())
+
+  def ShowScrollback(self, start):
+    """Show a page of journal lines, pausing live output.
+
+    Args:
+      start: the first journal line to show.
+    """
+    if not self._journal or self._view:
+      return
+    start = max(self._journal.FirstLineNumber(),
+                min(start, self._journal.EndLineNumber() - 1))
+    self._scrollback_start = start
+    lines = self._journal.Lines(start, start + self.SCROLLBACK_PAGE_LINES)
+    self._text_ctrl.SetValue(''.join(lines))
+    self._UpdateStatus()
+
+  def ShowLive(self):
+    """Go back to showing (and following) the live output."""
+    self._scrollback_start = None
+    if self._view:
+      self._view.ScrollToEnd()
+      return
+    text = self._LiveText()
+    self._rendered = collections.deque()
+    self._AddRendered(text.count('\n'), text.count('\n'), False)
+    self._last_line_shown = True
+    self._text_ctrl.SetValue(text)
+    self._text_ctrl.ShowPosition(self._text_ctrl.GetLastPosition())
+    self._UpdateStatus()
+
+  def OnEarlier(self, event):
+    """Page back through the journal.  Called directly from UI."""
+    if self._scrollback_start is None:
+      start = self._store.FirstLineNumber()
+    else:
+      start = self._scrollback_start
+    if start > self._journal.FirstLineNumber():
+      self.ShowScrollback(start - self.SCROLLBACK_PAGE_LINES)
+
+  def OnLater(self, event):
+    """Page forward through the journal.  Called directly from UI."""
+    if self._scrollback_start is None:
+      return
+    start = self._scrollback_start + self.SCROLLBACK_PAGE_LINES
+    if start >= self._store.FirstLineNumber():
+      self.ShowLive()
+    else:
+      self.ShowScrollback(start)
+
+  def OnLive(self, event):
+    """Return to live output.  Called directly from UI."""
+    if self._scrollback_start is not None or self._view:
+      self.ShowLive()
+
+  def Search(self, query):
+    """Show the next line which matches a query.
+
+    A new query goes to its first match; repeating a query goes to the
+    next one, wrapping around.  See LogIndex.Search() for the syntax.
+
+    Args:
+      query: a query string.
+    Returns:
+      The number of the line shown, or None if nothing matched.
+    """
+    if query == self._query and self._hits:
+      self._hit = (self._hit + 1) % len(self._hits)
+    else:
+      self._query = query
+      self._hits = self._index.Search(query)
+      self._hit = 0
+    if not self._hits:
+      self.SetStatusText('No matches for %s' % query)
+      return None
+    number = self._hits[self._hit]
+    self.ShowLine(number)
+    self.SetStatusText('Match %d of %d' % (self._hit + 1, len(self._hits)))
+    return number
+
+  def ShowLine(self, number):
+    """Scroll to and select one line of output.
+
+    Lines older than those in our store are shown from the journal.
+
+    Args:
+      number: the line number.
+    """
+    if self._filter:
+      row = None
+      if number >= self._store.FirstLineNumber():
+        row = self._filter.RowForLine(number)
+      if row is None:
+        self.SetLevelFilter(0)  # the line is filtered out; show all
+    if self._view:
+      provider = self._Provider()
+      if provider is self._filter:
+        self._view.SelectRow(row - provider.FirstLineNumber())
+      else:
+        self._view.SelectRow(number - provider.FirstLineNumber())
+      return
+    if self._filter:
+      row = self._LiveRow(row - self._filter.FirstLineNumber())
+    elif (self._scrollback_start is None and
+          number >= self._store.FirstLineNumber()):
+      row = self._LiveRow(number - self._store.FirstLineNumber())
+    elif self._journal:
+      if (self._scrollback_start is None or
+          number < self._scrollback_start or
+          number >= self._scrollback_start + self.SCROLLBACK_PAGE_LINES):
+        self.ShowScrollback(number - self.SCROLLBACK_PAGE_LINES / 2)
+      row = number - self._scrollback_start
+    else:
+      return
+    start = self._text_ctrl.XYToPosition(0, row)
+    if start < 0:
+      return
+    end = start + self._text_ctrl.GetLineLength(row)
+    self._text_ctrl.SetSelection(start, end)
+    self._text_ctrl.ShowPosition(start)
+
+  def _LiveRow(self, index):
+    """Return the text control row showing one of the live lines.
+
+    Sampled output shows fewer rows than there are lines, so rows are
+    found through self._rendered.  If the line is in a sampled run
+    (and so may not be shown), every line is shown first.
+
+    Args:
+      index: the line's offset from the first line of the store (or
+        of the filter).
+    """
+    row = 0
+    offset = index
+    for (log_lines, shown_lines, sampled) in self._rendered:
+      if offset < log_lines:
+        if not sampled:
+          return row + offset
+        break
+      offset -= log_lines
+      row += shown_lines
+    self.ShowLive()
+    return index
+
+  def LinesForTimeRange(self, start_time, end_time):
+    """Return the numbers [start, end) of the lines which arrived in a period.
+
+    The range may start or end a little early (see TimeIndex), and is
+    clipped to the lines we still have.
+
+    Args:
+      start_time, end_time: times, in seconds since the epoch.
+    """
+    provider = self._journal or self._store
+    (start, end) = self._log.time_index.LineRange(start_time, end_time)
+    start = max(start, provider.FirstLineNumber())
+    end = min(end, provider.EndLineNumber())
+    return (start, max(start, end))
+
+  def GoToTime(self, when):
+    """Show the first line which arrived at or after some time.
+
+    Args:
+      when: a time, in seconds since the epoch.
+    Returns:
+      The number of the line shown, or None if there is no such line.
+    """
+    number = self.LinesForTimeRange(when, when)[0]
+    if number >= (self._journal or self._store).EndLineNumber():
+      return None
+    self.ShowLine(number)
+    return number
+
+  def CopyLines(self, start, end):
+    """Put the lines numbered [start, end) on the clipboard.
+
+    Args:
+      start: the first line number.
+      end: one past the last line number.
+    """
+    text = ''.join((self._journal or self._store).Lines(start, end))
+    if wx.TheClipboard.Open():
+      try:
+        wx.TheClipboard.SetData(wx.TextDataObject(text))
+      finally:
+        wx.TheClipboard.Close()
+
+  def OnGoToTime(self, event):
+    """Ask for a time or a period, and go to it.  Called directly from UI.
+
+    For a period, the lines which arrived in it can be shown, copied
+    or exported.
+    """
+    dialog = wx.TextEntryDialog(
+        self, 'Time (such as 14:05) or period (such as 14:05-14:10):',
+        'Go to Time')
+    try:
+      if dialog.ShowModal() != wx.ID_OK:
+        return
+      text = dialog.GetValue()
+    finally:
+      dialog.Destroy()
+    try:
+      (start_time, end_time) = log_time_index.ParseTimeRange(text)
+    except ValueError, err:
+      self.SetStatusText(str(err))
+      return
+    if end_time is None:
+      if self.GoToTime(start_time) is None:
+        self.SetStatusText('No output at or after %s' % text.strip())
+      return
+    (start, end) = self.LinesForTimeRange(start_time, end_time)
+    if start >= end:
+      self.SetStatusText('No output from %s' % text.strip())
+      return
+    choices = ('Show', 'Copy', 'Export...')
+    dialog = wx.SingleChoiceDialog(
+        self, 'Lines %d-%d arrived from %s.' % (start + 1, end, text.strip()),
+        'Go to Time', list(choices))
+    try:
+      if dialog.ShowModal() != wx.ID_OK:
+        return
+      choice = choices[dialog.GetSelection()]
+    finally:
+      dialog.Destroy()
+    if choice == 'Show':
+      self.ShowLine(start)
+    elif choice == 'Copy':
+      self.CopyLines(start, end)
+      self.SetStatusText('Copied lines %d-%d' % (start + 1, end))
+    else:
+      filename = self._AskExportFilename()
+      if filename:
+        self.ExportLog(filename, start, end)
+
+  def OnSearch(self, event):
+    """Search for the text in the search box.  Called directly from UI."""
+    query = self._search_ctrl.GetValue()
+    if query.strip():
+      self.Search(query)
+
+  def ExportLog(self, filename, start=None, end=None):
+    """Start writing our output to a file in the background.
+
+    Args:
+      filename: the file to write; its extension picks the format (see
+        LogExporter.FormatForFilename()).
+      start: if not None, the first line number to write.
+      end: if not None, one past the last line number to write.
+    Returns:
+      The LogExporter, or None if an export is already running.
+    """
+    if self._exporter:
+      return None
+    self._exporter = log_export.LogExporter(
+        filename, journal=self._journal, store=self._store,
+        start=start, end=end,
+        progress_callback=(
+            lambda done, total: wx.CallAfter(self._ExportProgress,
+                                             done, total)),
+        done_callback=(
+            lambda error: wx.CallAfter(self._ExportDone, filename, error)))
+    self._export_button.Enable(False)
+    self._export_gauge.SetValue(0)
+    self._export_gauge.GetContainingSizer().Show(self._export_gauge)
+    self.GetSizer().Layout()
+    self._exporter.start()
+    return self._exporter
+
+  def _ExportProgress(self, done, total):
+    """Show how far an export has got.  Called on the main thread."""
+    percent = 100
+    if total:
+      percent = min(100, done * 100 / total)
+    self._export_gauge.SetValue(percent)
+    self.SetStatusText('Exporting... %d%%' % percent)
+
+  def _ExportDone(self, filename, error):
+    """Tidy up after an export.  Called on the main thread."""
+    self._exporter = None
+    self._export_button.Enable(True)
+    self._export_gauge.GetContainingSizer().Hide(self._export_gauge)
+    self.GetSizer().Layout()
+    if error:
+      logging.warning('Cannot export log to %s: %s' % (filename, error))
+      self._UpdateStatus()
+    else:
+      self.SetStatusText('Exported to %s' % filename)
+
+  def OnExport(self, event):
+    """Ask for a file, and export to it.  Called directly from UI."""
+    filename = self._AskExportFilename()
+    if filename:
+      self.ExportLog(filename)
+
+  def _AskExportFilename(self):
+    """Ask for a file to export to; return its name, or None if cancelled."""
+    dialog = wx.FileDialog(self, 'Export log', wildcard=self.EXPORT_WILDCARD,
+                           defaultFile=self._DefaultExportFilename(),
+                           style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT)
+    try:
+      if dialog.ShowModal() == wx.ID_OK:
+        return dialog.GetPath()
+      return None
+    finally:
+      dialog.Destroy()
+
+  def _DefaultExportFilename(self):
+    """Return the file name the Export... dialog suggests."""
+    return '%s.log' % self._project.name
+
+  def OnIdle(self, event):
+    """Index a little more output.  Called directly from UI."""
+    if not self._index.IsUpToDate():
+      if not self._index.Update(max_lines=self._INDEX_LINES_PER_IDLE):
+        event.RequestMore()
+    event.Skip()
+
+  def GetText(self):
+    """Return the text we show.  For unittest convenience."""
+    if self._view:
+      return self._view.GetText()
+    return super(LogConsole, self).GetText()
+
+  def _RemoveLeadingLines(self, count):
+    """Remove the first count lines from our text control.
+
+    Args:
+      count: the number of lines to remove.
+    """
+    end = self._text_ctrl.XYToPosition(0, count)
+    if end < 0:
+      end = self._text_ctrl.GetLastPosition()
+    self._text_ctrl.Remove(0, end)
 
   def CloseHandler(self, event):
     """Called when the user closes this window (frame).
 
-    Log Console windows are the only repository of process output.  If we
-    destroy them, the output is lost.  We override the close handler to
-    interpret a native "window close" as a "go away"; under the covers
-    we really just hide it (and save it for later).
+    The output is kept by our ProjectLog, not by us, so nothing is lost
+    if we go.  Still, a native "window close" just hides us, so that
+    reopening the window keeps its level filter, search and place.  A
+    close which can't be vetoed (such as on exit) stops us listening to
+    the log and destroys us; the TaskController drops destroyed
+    consoles and makes a new one when asked.
 
     Called directly from UI so the arg list matches wxPython handler convention.
     """
     if not event.CanVeto():
+      self._log.RemoveListener(self)
       self.Destroy()
-      # TODO(jrg): tell controller to remove me from its list
     else:
       self.Show(False)
       event.Veto()
@@ -72,3 +843,13 @@ class LogConsole(text_frame.TextFrame):
   def project(self):
     """We don't want this property to be reset after init."""
     return self._project
+
+  @property
+  def store(self):
+    """The LogStore which holds our output."""
+    return self._store
+
+  @property
+  def project_log(self):
+    """The ProjectLog we show."""
+    return self._log
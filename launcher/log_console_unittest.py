@@ -17,6 +17,8 @@
 
 """Unittests for log_console.py"""
 
+import logging
+import time
 import unittest
 import wx
 import launcher
@@ -42,6 +44,139 @@ class LogConsoleTest(unittest.TestCase):
     lc = launcher.LogConsole(project)
     self.assertEqual(project, lc.project)
 
+  def testProjectLog(self):
+    """A console shows what its log held before it, and what comes after."""
+    project = launcher.Project('path', 8000, 'name')
+    project_log = launcher.ProjectLog()
+    project_log.AppendText('early\n')
+    lc = launcher.LogConsole(project, project_log=project_log)
+    self.assertEqual(project_log, lc.project_log)
+    self.assertEqual('early\n', lc.GetText())
+    project_log.AppendText('late\n')
+    self.assertEqual('early\nlate\n', lc.GetText())
+
+  def testBoundedOutput(self):
+    """Old lines are dropped from the display once the store is full."""
+    project = launcher.Project('path', 8000, 'name')
+    lc = launcher.LogConsole(project, max_lines=3)
+    for i in range(5):
+      lc.AppendText('line %d\n' % i)
+    self.assertEqual('line 2\nline 3\nline 4\n', lc.GetText())
+    self.assertEqual(lc.store.GetText(), lc.GetText())
+    self.assertEqual(2, lc.store.dropped_lines)
+    self.assertTrue('2' in lc.GetStatusBar().GetStatusText())
+
+  def testVirtualView(self):
+    """A virtual view shows the same output as the text control."""
+    project = launcher.Project('path', 8000, 'name')
+    lc = launcher.LogConsole(project, max_lines=3, virtual_view=True)
+    self.assertTrue(lc.IsVirtualView())
+    for i in range(5):
+      lc.AppendText('line %d\n' % i)
+    self.assertEqual('line 2\nline 3\nline 4\n', lc.GetText())
+    lc.SetVirtualView(False)
+    self.assertFalse(lc.IsVirtualView())
+    self.assertEqual('line 2\nline 3\nline 4\n', lc.GetText())
+    lc.AppendText('line 5\n')
+    lc.SetVirtualView(True)
+    self.assertEqual('line 3\nline 4\nline 5\n', lc.GetText())
+
+  def testSearch(self):
+    """Repeating a search steps through its matches."""
+    project = launcher.Project('path', 8000, 'name')
+    lc = launcher.LogConsole(project)
+    lc.AppendText('INFO start\nERROR boom\nINFO ok\nERROR bang\n')
+    self.assertEqual(1, lc.Search('error'))
+    self.assertEqual('ERROR boom', lc._text_ctrl.GetStringSelection())
+    self.assertEqual(3, lc.Search('error'))
+    self.assertEqual(1, lc.Search('error'))
+    self.assertEqual(None, lc.Search('missing'))
+
+  def testLevelFilter(self):
+    project = launcher.Project('path', 8000, 'name')
+    lc = launcher.LogConsole(project)
+    info = 'INFO     2009-04-08 23:09:25,456 a.py:1] hi\n'
+    error = 'ERROR    2009-04-08 23:09:25,456 a.py:2] bad\n'
+    lc.AppendText(info + error)
+    lc.SetLevelFilter(logging.WARNING)
+    self.assertTrue(lc.IsVirtualView())
+    self.assertEqual(error, lc.GetText())
+    lc.AppendText(info + error)
+    self.assertEqual(error + error, lc.GetText())
+    # The view made for the filter goes with it.
+    lc.SetLevelFilter(0)
+    self.assertFalse(lc.IsVirtualView())
+    self.assertEqual(info + error + info + error, lc.GetText())
+    # A view asked for stays.
+    lc.SetVirtualView(True)
+    lc.SetLevelFilter(logging.WARNING)
+    lc.SetLevelFilter(0)
+    self.assertTrue(lc.IsVirtualView())
+    self.assertEqual(info + error + info + error, lc.GetText())
+
+  def testRepeats(self):
+    """The newest line's repeat count is updated in place."""
+    project = launcher.Project('path', 8000, 'name')
+    lc = launcher.LogConsole(project)
+    lc.AppendText('start\npoll\n')
+    lc.AddRepeats(1)
+    self.assertEqual('start\npoll (x2)\n', lc.GetText())
+    lc.AddRepeats(3)
+    self.assertEqual('start\npoll (x5)\n', lc.GetText())
+    lc.SetVirtualView(True)
+    self.assertEqual('start\npoll (x5)\n', lc.GetText())
+
+  def testGoToTime(self):
+    project = launcher.Project('path', 8000, 'name')
+    lc = launcher.LogConsole(project)
+    before = time.time()
+    lc.AppendText('first\nsecond\n')
+    self.assertEqual((0, 2), lc.LinesForTimeRange(before, time.time()))
+    self.assertEqual((2, 2), lc.LinesForTimeRange(time.time() + 10,
+                                                  time.time() + 20))
+    self.assertEqual(0, lc.GoToTime(before))
+    self.assertEqual('first', lc._text_ctrl.GetStringSelection())
+    self.assertEqual(None, lc.GoToTime(time.time() + 10))
+
+  def testOutputThrottling(self):
+    """Runaway output is sampled in the text control, but all of it kept."""
+    calls = []
+    def FakeCallLater(ms, callable, *args):
+      calls.append(callable)
+    orig_calllater = wx.CallLater
+    wx.CallLater = FakeCallLater
+    try:
+      now = [1000.0]
+      project = launcher.Project('path', 8000, 'name')
+      lc = launcher.LogConsole(project)
+      lc._throttle = launcher.OutputThrottle(50, clock=lambda: now[0])
+      lc.AppendText(''.join(['line %d\n' % i for i in range(1000)]))
+      self.assertEqual(1000, lc.store.LineCount())
+      self.assertEqual(50, lc.GetText().count('\n'))
+      self.assertTrue(lc.GetText().endswith('line 49\n'))
+      # The summary appears when the second is up, even with no output.
+      self.assertEqual([lc._OnThrottleTimer], calls)
+      now[0] += 1
+      calls.pop()()
+      self.assertTrue(lc.GetText().endswith(
+          '...950 lines suppressed in last 1s...\n'))
+      self.assertTrue('950' in lc.GetStatusBar().GetStatusText())
+      # Lines after the sample are found through what was shown.
+      now[0] += 2
+      lc.AppendText('tail\n')
+      self.assertEqual(1000, lc.Search('tail'))
+      self.assertEqual('tail', lc._text_ctrl.GetStringSelection())
+      self.assertTrue('suppressed' in lc.GetText())
+      # A line left out of the sample is shown by showing every line.
+      self.assertEqual(500, lc.Search('"line 500"'))
+      self.assertEqual('line 500', lc._text_ctrl.GetStringSelection())
+      self.assertEqual(lc.store.GetText(), lc.GetText())
+      # The virtual view shows every line.
+      lc.SetVirtualView(True)
+      self.assertEqual(lc.store.GetText(), lc.GetText())
+    finally:
+      wx.CallLater = orig_calllater
+
   def testCloseHandler(self):
     """Test our close handler (if not force, hide window and save for later)"""
     project = launcher.Project('path', 8000, 'name')
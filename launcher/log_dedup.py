@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Run-length folding of repeated lines of output."""
+
+
+import re
+
+
+class RepeatFolder(object):
+  """Folds runs of repeated lines into one line and a repeat count.
+
+  A line repeats the one before it if the two are the same once their
+  timestamps are masked out (so polling requests, logged a second
+  apart, are repeats).  Only the first line of a run is passed on; the
+  rest are just counted against it.  The stores keep the count next to
+  the line, and show it with Render().
+
+  A line which arrives in more than one piece has already been passed
+  on in part by the time we see all of it, so it is never folded
+  itself (though the lines after it may be).
+
+  Not thread-safe; the caller must serialize calls.
+  """
+
+  # Dates and times as they appear in dev_appserver and access logs.
+  _TIMESTAMP_RE = re.compile(
+      r'\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d(?:[,.]\d+)?'
+      r'|\d\d?/[A-Z][a-z]{2}/\d{4}[: ]\d\d:\d\d:\d\d'
+      r'|\b\d\d:\d\d:\d\d(?:[,.]\d+)?')
+
+  def __init__(self):
+    # self._last_key: Key() of the last complete line, or None
+    # self._partial: text after the last newline
+    self._last_key = None
+    self._partial = ''
+    self.folded_lines = 0
+
+  def Key(self, line):
+    """Return what a line is compared on: itself, timestamps masked."""
+    return self._TIMESTAMP_RE.sub('#', line)
+
+  def Fold(self, text):
+    """Fold the repeated lines out of some output.
+
+    Args:
+      text: a string of output; may hold many lines, or part of one.
+    Returns:
+      A list of (text, repeats) tuples.  For each, the text should be
+      appended to the output, then the last complete line of output
+      counted as repeated that many more times.  The texts together
+      are the input, less the repeated lines.
+    """
+    if not text:
+      return []
+    lines = text.split('\n')
+    tail = lines.pop()
+    folded = []
+    parts = []
+    repeats = 0
+    for line in lines:
+      if self._partial:
+        key = self.Key(self._partial + line)
+        self._partial = ''
+      else:
+        key = self.Key(line)
+        if key == self._last_key:
+          repeats += 1
+          continue
+      if repeats:
+        folded.append((''.join(parts), repeats))
+        parts = []
+        repeats = 0
+      parts.append(line + '\n')
+      self._last_key = key
+    if tail:
+      if repeats:
+        folded.append((''.join(parts), repeats))
+        parts = []
+        repeats = 0
+      parts.append(tail)
+      self._partial += tail
+      self._last_key = None
+    if parts or repeats:
+      folded.append((''.join(parts), repeats))
+    self.folded_lines += sum([count for (_, count) in folded])
+    return folded
+
+  @staticmethod
+  def Render(line, count):
+    """Return a line as shown when it was seen count times in a row.
+
+    Args:
+      line: a line of output, with or without its newline.
+      count: how many times it was seen; 1 for a line with no repeats.
+    """
+    if count <= 1:
+      return line
+    if line.endswith('\n'):
+      return '%s (x%d)\n' % (line[:-1], count)
+    return '%s (x%d)' % (line, count)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for log_dedup.py"""
+
+import unittest
+import launcher
+
+
+class RepeatFolderTest(unittest.TestCase):
+
+  def testFold(self):
+    folder = launcher.RepeatFolder()
+    self.assertEqual([], folder.Fold(''))
+    self.assertEqual([('a\nb\n', 2), ('c\n', 0)],
+                     folder.Fold('a\nb\nb\nb\nc\n'))
+    # A run carries on across calls.
+    self.assertEqual([('', 1), ('d\n', 1)], folder.Fold('c\nd\nd\n'))
+    self.assertEqual(4, folder.folded_lines)
+
+  def testTimestampsMasked(self):
+    folder = launcher.RepeatFolder()
+    text = ('INFO     2009-04-08 23:09:25,456 dev_appserver.py:2906] '
+            '"GET /poll HTTP/1.1" 200 -\n'
+            'INFO     2009-04-08 23:09:26,501 dev_appserver.py:2906] '
+            '"GET /poll HTTP/1.1" 200 -\n'
+            'INFO     2009-04-08 23:09:27,012 dev_appserver.py:2906] '
+            '"GET /other HTTP/1.1" 200 -\n')
+    folded = folder.Fold(text)
+    self.assertEqual(2, len(folded))
+    self.assertEqual(1, folded[0][1])
+    self.assertTrue('/poll' in folded[0][0])
+    self.assertTrue('/other' in folded[1][0])
+    folded = folder.Fold('127.0.0.1 - - [08/Apr/2009 23:09:25] "GET /"\n'
+                         '127.0.0.1 - - [08/Apr/2009 23:09:28] "GET /"\n')
+    self.assertEqual(1, folded[0][1])
+
+  def testPartialLines(self):
+    folder = launcher.RepeatFolder()
+    self.assertEqual([('x\n', 0)], folder.Fold('x\n'))
+    # A line which comes in pieces is passed on as it comes...
+    self.assertEqual([('x', 0)], folder.Fold('x'))
+    self.assertEqual([('\n', 0)], folder.Fold('\n'))
+    # ...but the lines after it can still repeat it.
+    self.assertEqual([('', 1), ('y', 0)], folder.Fold('x\ny'))
+
+  def testRender(self):
+    render = launcher.RepeatFolder.Render
+    self.assertEqual('a\n', render('a\n', 1))
+    self.assertEqual('a (x3)\n', render('a\n', 3))
+    self.assertEqual('a (x2)', render('a', 2))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Background export of a project's output to a file."""
+
+
+import gzip
+import json
+import threading
+
+import log_dedup
+import log_parser
+
+
+class LogExporter(threading.Thread):
+  """Writes a project's output to a file, on its own thread.
+
+  The output is streamed through a pipeline of generators: a source
+  of lines, a formatter, and a file (gzip'd if the filename ends in
+  .gz).  Only a chunk of output is in memory at a time, so memory use
+  doesn't depend on how big the log is.
+
+  The source is either a LogJournal file, read with our own file
+  handle up to the size it had when we were created, or a snapshot of
+  the lines in a LogStore (which is bounded anyway).  Either can be
+  limited to a range of line numbers, such as the lines which arrived
+  in some period (see log_time_index.TimeIndex).  Lines folded
+  out as repeats are not written again; their first line is written
+  with its repeat count, as the console shows it.
+
+  Formats are FORMAT_TEXT (the output as is) and FORMAT_JSONL (one
+  JSON object per line, with the text and the parsed time, level and
+  source).  The format is chosen from the filename; see
+  FormatForFilename().
+  """
+
+  FORMAT_TEXT = 'text'
+  FORMAT_JSONL = 'jsonl'
+
+  # How much of a journal file we read at once.
+  _CHUNK_SIZE = 1024 * 1024
+  # How many lines go between progress reports.
+  _PROGRESS_LINES = 10000
+  # About how many bytes we give each write() call.
+  _WRITE_SIZE = 64 * 1024
+
+  def __init__(self, filename, journal=None, store=None,
+               progress_callback=None, done_callback=None,
+               start=None, end=None):
+    """Create a new LogExporter.  Call start() to export.
+
+    Must be called on the thread which writes to the journal or store,
+    since we take a snapshot of how much output there is.
+
+    Args:
+      filename: the file to write.
+      journal: a LogJournal to export.
+      store: a LogStore to export, if there is no journal.
+      progress_callback: if not None, called (on our thread) with the
+        number of bytes of output exported so far, and the total.
+      done_callback: if not None, called (on our thread) when we are
+        done, with None or the error (an IOError or OSError) which
+        stopped us.
+      start: if not None, the first line number to export.
+      end: if not None, one past the last line number to export; the
+        partial line is only exported if end is None.
+    """
+    super(LogExporter, self).__init__(name='LogExporter')
+    self.setDaemon(True)
+    self._filename = filename
+    self._progress_callback = progress_callback
+    self._done_callback = done_callback
+    self._cancelled = False
+    if journal:
+      journal.Flush()
+      # Opened now, so a journal rotated while we wait to run is still
+      # read from the file we measured.
+      self._source_filename = journal.filename
+      self._source = self._OpenSource(journal.filename)
+      self._repeats = journal.RepeatCounts()
+      self._store_lines = None
+      self._first_number = max(journal.FirstLineNumber(), start or 0)
+      self._source_offset = journal.Offset(self._first_number)
+      if end is None:
+        self.total_bytes = journal.ByteCount() - self._source_offset
+      else:
+        self.total_bytes = max(0, journal.Offset(end) - self._source_offset)
+    else:
+      self._source_filename = None
+      self._source = None
+      self._repeats = {}
+      self._store_lines = store.Lines(start, end)
+      self._first_number = max(store.FirstLineNumber(), start or 0)
+      if store.PartialLine() and end is None:
+        self._store_lines.append(store.PartialLine())
+      self.total_bytes = sum([len(line) for line in self._store_lines])
+    self.bytes_done = 0
+    self.lines_done = 0
+
+  @staticmethod
+  def _OpenSource(filename):
+    """Open a journal file, or return the error which stops us opening it."""
+    try:
+      return open(filename, 'rb')
+    except IOError, err:
+      return err
+
+  @classmethod
+  def FormatForFilename(cls, filename):
+    """Return (format, gzipped) for a filename.
+
+    Args:
+      filename: a file name such as 'app.jsonl.gz'.
+    """
+    gzipped = filename.endswith('.gz')
+    if gzipped:
+      filename = filename[:-len('.gz')]
+    if filename.endswith('.jsonl') or filename.endswith('.json'):
+      return (cls.FORMAT_JSONL, gzipped)
+    return (cls.FORMAT_TEXT, gzipped)
+
+  def Cancel(self):
+    """Ask the export to stop.  The file is left partly written."""
+    self._cancelled = True
+
+  def run(self):
+    """Export, then call the done callback.  Called by start()."""
+    error = None
+    try:
+      self.Export()
+    except (IOError, OSError), err:
+      error = err
+    if self._done_callback:
+      self._done_callback(error)
+
+  def Export(self):
+    """Do the export on the calling thread.
+
+    Raises:
+      IOError, OSError: the source can't be read or the file written.
+    """
+    (output_format, gzipped) = self.FormatForFilename(self._filename)
+    if gzipped:
+      output = gzip.GzipFile(self._filename, 'wb')
+    else:
+      output = open(self._filename, 'wb')
+    try:
+      if output_format == self.FORMAT_JSONL:
+        records = self._JsonLines(self._Lines())
+      else:
+        records = self._Lines()
+      for chunk in self._Batches(records):
+        output.write(chunk)
+        if self._cancelled:
+          break
+    finally:
+      output.close()
+
+  def _Lines(self):
+    """Generate the lines of our source, counting them as we go."""
+    if self._source_filename:
+      lines = self._JournalLines()
+    else:
+      lines = iter(self._store_lines)
+    for line in lines:
+      self.bytes_done += len(line)
+      self.lines_done += 1
+      if self.lines_done % self._PROGRESS_LINES == 0:
+        self._ReportProgress()
+      yield line
+    self._ReportProgress()
+
+  def _JournalLines(self):
+    """Generate the lines of our journal file, a chunk at a time."""
+    source = self._source
+    if isinstance(source, IOError):
+      raise source
+    try:
+      source.seek(self._source_offset)
+      remaining = self.total_bytes
+      partial = ''
+      number = self._first_number
+      repeats = self._repeats
+      while remaining > 0 and not self._cancelled:
+        chunk = source.read(min(self._CHUNK_SIZE, remaining))
+        if not chunk:
+          break
+        remaining -= len(chunk)
+        lines = (partial + chunk).split('\n')
+        partial = lines.pop()
+        for line in lines:
+          if number in repeats:
+            line = log_dedup.RepeatFolder.Render(line, repeats[number])
+          number += 1
+          yield line + '\n'
+      if partial:
+        yield partial
+    finally:
+      source.close()
+
+  def _JsonLines(self, lines):
+    """Generate a JSON Lines record for each line.
+
+    Args:
+      lines: an iterable of lines of output.
+    """
+    parser = log_parser.LineParser()
+    number = self._first_number
+    for line in lines:
+      (level, timestamp, source) = parser.Parse(line)
+      record = {
+          'line': number,
+          'text': line.rstrip('\r\n').decode('utf-8', 'replace'),
+          'level': log_parser.LineParser.LEVEL_NAMES.get(level),
+          'time': timestamp or None,
+          'source': source,
+      }
+      number += 1
+      yield json.dumps(record, sort_keys=True) + '\n'
+
+  def _Batches(self, records):
+    """Join records into strings of about _WRITE_SIZE bytes.
+
+    Args:
+      records: an iterable of strings.
+    """
+    batch = []
+    size = 0
+    for record in records:
+      batch.append(record)
+      size += len(record)
+      if size >= self._WRITE_SIZE:
+        yield ''.join(batch)
+        batch = []
+        size = 0
+    if batch:
+      yield ''.join(batch)
+
+  def _ReportProgress(self):
+    """Tell our progress callback (if any) how far we have got."""
+    if self._progress_callback:
+      self._progress_callback(self.bytes_done, self.total_bytes)
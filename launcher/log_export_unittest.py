@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for log_export.py"""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import launcher
+
+
+_OUTPUT = ('INFO     2009-04-08 23:09:25,456 dev_appserver.py:2906] hi\n'
+           'Traceback\n'
+           'no newline')
+
+
+class LogExporterTest(unittest.TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.journal = launcher.LogJournal(os.path.join(self.directory, 'j'))
+    self.journal.AppendText(_OUTPUT)
+
+  def tearDown(self):
+    self.journal.Close()
+    shutil.rmtree(self.directory)
+
+  def _Path(self, name):
+    return os.path.join(self.directory, name)
+
+  def testFormatForFilename(self):
+    exporter = launcher.LogExporter
+    self.assertEqual((exporter.FORMAT_TEXT, False),
+                     exporter.FormatForFilename('a.log'))
+    self.assertEqual((exporter.FORMAT_TEXT, True),
+                     exporter.FormatForFilename('a.txt.gz'))
+    self.assertEqual((exporter.FORMAT_JSONL, True),
+                     exporter.FormatForFilename('a.jsonl.gz'))
+
+  def testText(self):
+    launcher.LogExporter(self._Path('a.log'), journal=self.journal).Export()
+    self.assertEqual(_OUTPUT, open(self._Path('a.log')).read())
+
+  def testRepeats(self):
+    self.journal.AppendText('\n')
+    self.journal.AddRepeats(2)
+    launcher.LogExporter(self._Path('a.log'), journal=self.journal).Export()
+    self.assertEqual(_OUTPUT + ' (x3)\n', open(self._Path('a.log')).read())
+
+  def testRotatedJournal(self):
+    """An export made before a rotation reads the file it measured."""
+    journal = launcher.LogJournal(self._Path('r'), max_bytes=10)
+    try:
+      journal.AppendText('one\ntwo\n')
+      exporter = launcher.LogExporter(self._Path('a.log'), journal=journal,
+                                      start=1)
+      journal.AppendText('three\n')
+      self.assertEqual(3, journal.FirstLineNumber())
+      exporter.Export()
+      self.assertEqual('two\n', open(self._Path('a.log')).read())
+      journal.AppendText('four\n')
+      launcher.LogExporter(self._Path('b.log'), journal=journal).Export()
+      self.assertEqual('four\n', open(self._Path('b.log')).read())
+    finally:
+      journal.Close()
+
+  def testGzipFromStore(self):
+    store = launcher.LogStore(max_lines=2)
+    store.AppendText('zero\n' + _OUTPUT)
+    exporter = launcher.LogExporter(self._Path('a.log.gz'), store=store)
+    exporter.Export()
+    self.assertEqual(_OUTPUT, gzip.open(self._Path('a.log.gz')).read())
+    self.assertEqual(len(_OUTPUT), exporter.bytes_done)
+    self.assertEqual(3, exporter.lines_done)
+
+  def testJsonLines(self):
+    progress = []
+    done = []
+    exporter = launcher.LogExporter(
+        self._Path('a.jsonl'), journal=self.journal,
+        progress_callback=lambda d, t: progress.append((d, t)),
+        done_callback=done.append)
+    exporter._CHUNK_SIZE = 7  # split lines across reads
+    exporter.start()
+    exporter.join(10)
+    self.assertEqual([None], done)
+    self.assertEqual((len(_OUTPUT), len(_OUTPUT)), progress[-1])
+    records = [json.loads(line) for line in open(self._Path('a.jsonl'))]
+    self.assertEqual(3, len(records))
+    self.assertEqual('INFO', records[0]['level'])
+    self.assertEqual('dev_appserver.py:2906', records[0]['source'])
+    self.assertEqual('Traceback', records[1]['text'])
+    self.assertEqual('INFO', records[1]['level'])
+    self.assertEqual(records[0]['time'], records[1]['time'])
+    self.assertEqual(None, records[1]['source'])
+    self.assertEqual(2, records[2]['line'])
+
+  def testRange(self):
+    launcher.LogExporter(self._Path('a.jsonl'), journal=self.journal,
+                         start=1, end=2).Export()
+    records = [json.loads(line) for line in open(self._Path('a.jsonl'))]
+    self.assertEqual([(1, 'Traceback')],
+                     [(r['line'], r['text']) for r in records])
+    store = launcher.LogStore()
+    store.AppendText(_OUTPUT)
+    exporter = launcher.LogExporter(self._Path('b.log'), store=store, start=1)
+    exporter.Export()
+    self.assertEqual('Traceback\nno newline', open(self._Path('b.log')).read())
+    launcher.LogExporter(self._Path('c.log'), store=store, end=1).Export()
+    self.assertEqual(_OUTPUT.split('\n')[0] + '\n',
+                     open(self._Path('c.log')).read())
+
+  def testError(self):
+    done = []
+    exporter = launcher.LogExporter(self._Path('nodir/a.log'),
+                                    journal=self.journal,
+                                    done_callback=done.append)
+    exporter.start()
+    exporter.join(10)
+    self.assertTrue(isinstance(done[0], IOError))
+
+
+if __name__ == '__main__':
+  unittest.main()
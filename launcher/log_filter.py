@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Severity filter over the lines of a LogStore."""
+
+
+import bisect
+
+
+class LevelFilter(object):
+  """The lines of a LogStore at or above a severity (model in MVC).
+
+  A LevelFilter is itself a line provider (see LogView), numbering the
+  lines which pass from 0.  It only holds the store's numbers for
+  them; it's built from the store's level ring without looking at any
+  text, and kept up to date with Update().
+  """
+
+  def __init__(self, store, min_level):
+    """Create a new LevelFilter.
+
+    Args:
+      store: the LogStore to filter.
+      min_level: the lowest level shown, such as logging.WARNING.
+    """
+    # self._numbers: store line numbers of the lines which pass;
+    #   entries before self._head have been dropped from the store
+    # self._next_line: the first store line not yet looked at
+    # self._dropped: number of lines which passed but are now dropped
+    self._store = store
+    self._min_level = min_level
+    self._numbers = store.LineNumbersAtLevel(min_level)
+    self._head = 0
+    self._next_line = store.EndLineNumber()
+    self._dropped = 0
+
+  @property
+  def min_level(self):
+    """The lowest level we let through."""
+    return self._min_level
+
+  def Update(self):
+    """Catch up with lines added to and dropped from the store.
+
+    Returns:
+      A tuple (added, dropped) of the number of passing lines which
+      were added and dropped.
+    """
+    new_numbers = self._store.LineNumbersAtLevel(self._min_level,
+                                                 self._next_line)
+    self._numbers.extend(new_numbers)
+    self._next_line = self._store.EndLineNumber()
+    head = bisect.bisect_left(self._numbers, self._store.FirstLineNumber(),
+                              self._head)
+    dropped = head - self._head
+    self._dropped += dropped
+    self._head = head
+    if self._head > len(self._numbers) / 2:
+      del self._numbers[:self._head]
+      self._head = 0
+    return (len(new_numbers), dropped)
+
+  def FirstLineNumber(self):
+    """Return the number of the first passing line held."""
+    return self._dropped
+
+  def EndLineNumber(self):
+    """Return the number one past the last passing line held."""
+    return self._dropped + len(self._numbers) - self._head
+
+  def StoreLineNumber(self, number):
+    """Return the store's number for one of our lines."""
+    return self._numbers[self._head + number - self._dropped]
+
+  def RowForLine(self, store_number):
+    """Return our number for a store line, or None if it didn't pass."""
+    index = bisect.bisect_left(self._numbers, store_number, self._head)
+    if index < len(self._numbers) and self._numbers[index] == store_number:
+      return self._dropped + index - self._head
+    return None
+
+  def Lines(self, start, end):
+    """Return a list of our lines numbered [start, end), clipped.
+
+    Each run of consecutive store lines is fetched with one call to
+    the store's Lines().
+    """
+    start = max(start, self.FirstLineNumber())
+    end = min(end, self.EndLineNumber())
+    base = self._head - self._dropped
+    numbers = self._numbers[base + start:base + end]
+    lines = []
+    run_start = 0
+    for index in xrange(1, len(numbers) + 1):
+      if (index == len(numbers) or
+          numbers[index] != numbers[run_start] + index - run_start):
+        lines.extend(self._store.Lines(numbers[run_start],
+                                       numbers[index - 1] + 1))
+        run_start = index
+    return lines
+
+  def PartialLine(self):
+    """Partial lines are never shown, so always ''."""
+    return ''
+
+  def GetText(self):
+    """Return the text of all the passing lines held."""
+    return ''.join(self.Lines(self.FirstLineNumber(), self.EndLineNumber()))
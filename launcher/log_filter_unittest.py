@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for log_filter.py"""
+
+import logging
+import unittest
+import launcher
+
+
+def _Line(level, text):
+  return '%-8s 2009-04-08 23:09:25,456 foo.py:1] %s\n' % (level, text)
+
+
+class LevelFilterTest(unittest.TestCase):
+
+  def testFilter(self):
+    store = launcher.LogStore()
+    store.AppendText(_Line('INFO', 'a') + _Line('ERROR', 'b') +
+                     'Traceback\n' + _Line('WARNING', 'c'))
+    errors = launcher.LevelFilter(store, logging.ERROR)
+    self.assertEqual(2, errors.EndLineNumber())
+    self.assertEqual(_Line('ERROR', 'b') + 'Traceback\n', errors.GetText())
+    self.assertEqual(2, errors.StoreLineNumber(1))
+    self.assertEqual(0, errors.RowForLine(1))
+    self.assertEqual(None, errors.RowForLine(3))
+    store.AppendText(_Line('CRITICAL', 'd') + _Line('DEBUG', 'e'))
+    self.assertEqual((1, 0), errors.Update())
+    self.assertEqual([_Line('CRITICAL', 'd')], errors.Lines(2, 3))
+
+  def testLinesInRuns(self):
+    """Runs of passing lines are each fetched from the store at once."""
+    store = launcher.LogStore()
+    store.AppendText(_Line('ERROR', 'a') + 'Traceback\n' + 'x\n' +
+                     _Line('INFO', 'b') + _Line('ERROR', 'c'))
+    calls = []
+    orig_lines = store.Lines
+    def Lines(start=None, end=None):
+      calls.append((start, end))
+      return orig_lines(start, end)
+    store.Lines = Lines
+    errors = launcher.LevelFilter(store, logging.ERROR)
+    self.assertEqual([_Line('ERROR', 'a'), 'Traceback\n', 'x\n',
+                      _Line('ERROR', 'c')], errors.Lines(0, 4))
+    self.assertEqual([(0, 3), (4, 5)], calls)
+    self.assertEqual(['x\n'], errors.Lines(2, 3))
+    self.assertEqual([], errors.Lines(5, 9))
+
+  def testDroppedLines(self):
+    store = launcher.LogStore(max_lines=3)
+    warnings = launcher.LevelFilter(store, logging.WARNING)
+    for level in ('WARNING', 'INFO', 'ERROR'):
+      store.AppendText(_Line(level, level))
+    self.assertEqual((2, 0), warnings.Update())
+    store.AppendText(_Line('INFO', 'INFO'))
+    self.assertEqual((0, 1), warnings.Update())
+    self.assertEqual(1, warnings.FirstLineNumber())
+    self.assertEqual(2, warnings.EndLineNumber())
+    for level in ('INFO', 'ERROR', 'WARNING', 'INFO'):
+      store.AppendText(_Line(level, level))
+    self.assertEqual((2, 1), warnings.Update())
+    self.assertEqual(2, warnings.FirstLineNumber())
+    self.assertEqual(_Line('ERROR', 'ERROR') + _Line('WARNING', 'WARNING'),
+                     warnings.GetText())
+
+
+if __name__ == '__main__':
+  unittest.main()
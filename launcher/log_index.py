@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Incremental full-text index of the output of a project."""
+
+
+import array
+import bisect
+import re
+
+
+class LogIndex(object):
+  """An inverted index (token -> line numbers) over a line provider.
+
+  The provider is a bounded LogStore (see LogView for the methods
+  needed), so the index stays about as big as the lines it holds.
+  The index never slows down output: it is only brought up to date by
+  Update(), which the console calls a piece at a time when it is idle.
+  Each token maps to an array of the (sorted) numbers of the lines
+  containing it, which is far more compact than lists of ints.
+
+  Lines the provider has dropped are skipped in results; their
+  postings are pruned once they are half the index.
+  """
+
+  # Tokens are runs of letters, digits and underscores, matched
+  # without regard to case.
+  _TOKEN_RE = re.compile(r'\w+')
+  # A query is a list of words and "quoted phrases".
+  _QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+  # Search() indexes at most this many lines; any newer ones are
+  # scanned instead.
+  SEARCH_INDEX_LINES = 2000
+
+  def __init__(self, provider):
+    """Create a new LogIndex.
+
+    Args:
+      provider: a line provider, such as a LogStore or LogJournal.
+    """
+    # self._postings: maps a token to an array of line numbers
+    # self._next_line: number of the first line not yet indexed
+    # self._pruned_to: postings below this line number have been removed
+    self._provider = provider
+    self._postings = {}
+    self._next_line = provider.FirstLineNumber()
+    self._pruned_to = self._next_line
+
+  def IndexedLineCount(self):
+    """Return the number of lines indexed (including dropped ones)."""
+    return self._next_line - self._pruned_to
+
+  def IsUpToDate(self):
+    """Return True if every complete line in the provider is indexed."""
+    return self._next_line >= self._provider.EndLineNumber()
+
+  def Update(self, max_lines=None):
+    """Index lines added to the provider since the last update.
+
+    Args:
+      max_lines: if not None, index at most this many lines, so a big
+        backlog can be indexed a piece at a time.
+    Returns:
+      True if the index is now up to date.
+    """
+    first = self._provider.FirstLineNumber()
+    if self._next_line < first:
+      self._next_line = first  # never saw them; skip
+    end = self._provider.EndLineNumber()
+    if max_lines is not None:
+      end = min(end, self._next_line + max_lines)
+    if end > self._next_line:
+      postings = self._postings
+      tokenize = self._TOKEN_RE.findall
+      number = self._next_line
+      for line in self._provider.Lines(self._next_line, end):
+        for token in set(tokenize(line.lower())):
+          posting = postings.get(token)
+          if posting is None:
+            posting = postings[token] = array.array('L')
+          posting.append(number)
+        number += 1
+      self._next_line = end
+    if first - self._pruned_to > self.IndexedLineCount() / 2:
+      self._Prune(first)
+    return self.IsUpToDate()
+
+  def _Prune(self, first):
+    """Remove postings for lines before first.
+
+    Args:
+      first: the number of the oldest line the provider still holds.
+    """
+    for token in self._postings.keys():
+      posting = self._postings[token]
+      cut = bisect.bisect_left(posting, first)
+      if cut == len(posting):
+        del self._postings[token]
+      elif cut:
+        del posting[:cut]
+    self._pruned_to = first
+
+  def Search(self, query):
+    """Return the numbers of the lines which match a query.
+
+    A query is a list of words and "quoted phrases".  A line matches
+    if it contains every word (as a whole token) and every phrase (as
+    text), all without regard to case.  A word with punctuation in it,
+    such as foo-bar, must appear as text too.
+
+    Lines not yet indexed are indexed a piece at a time (see
+    SEARCH_INDEX_LINES); any left over are scanned.
+
+    Args:
+      query: a query string.
+    Returns:
+      A sorted list of line numbers; may be empty.
+    """
+    self.Update(max_lines=self.SEARCH_INDEX_LINES)
+    (tokens, phrases) = self._ParseQuery(query)
+    if not tokens:
+      return []
+    return (self._SearchIndex(tokens, phrases) +
+            self._SearchUnindexed(tokens, phrases))
+
+  def _SearchIndex(self, tokens, phrases):
+    """Return the numbers of the indexed lines which match a query.
+
+    Args:
+      tokens, phrases: the parsed query (see _ParseQuery()).
+    """
+    postings = []
+    for token in tokens:
+      posting = self._postings.get(token)
+      if not posting:
+        return []
+      postings.append(posting)
+    postings.sort(key=len)
+    first = self._provider.FirstLineNumber()
+    shortest = postings[0]
+    candidates = list(shortest[bisect.bisect_left(shortest, first):])
+    for posting in postings[1:]:
+      candidates = [n for n in candidates if self._Contains(posting, n)]
+      if not candidates:
+        return []
+    if phrases:
+      candidates = [n for n in candidates if self._HasPhrases(n, phrases)]
+    return candidates
+
+  def _SearchUnindexed(self, tokens, phrases):
+    """Return the numbers of the lines not yet indexed which match a query.
+
+    Args:
+      tokens, phrases: the parsed query (see _ParseQuery()).
+    """
+    start = max(self._next_line, self._provider.FirstLineNumber())
+    matches = []
+    number = start
+    for line in self._provider.Lines(start, self._provider.EndLineNumber()):
+      line = line.lower()
+      words = set(self._TOKEN_RE.findall(line))
+      for token in tokens:
+        if token not in words:
+          break
+      else:
+        if self._LineHasPhrases(line, phrases):
+          matches.append(number)
+      number += 1
+    return matches
+
+  def _ParseQuery(self, query):
+    """Split a query into (tokens, phrases).
+
+    Tokens are every token in the query, including those inside
+    phrases; they find the candidate lines.  Phrases of more than one
+    token, and words which are not a token by themselves (such as
+    foo-bar or main.py), are returned (lower-cased) so candidates can
+    be checked.
+    """
+    tokens = []
+    phrases = []
+    for (phrase, word) in self._QUERY_RE.findall(query.lower()):
+      words = self._TOKEN_RE.findall(phrase or word)
+      for token in words:
+        if token not in tokens:
+          tokens.append(token)
+      if (phrase and len(words) > 1) or (word and words != [word]):
+        phrases.append(phrase or word)
+    return (tokens, phrases)
+
+  def _Contains(self, posting, number):
+    """Return True if a sorted posting array holds a line number."""
+    index = bisect.bisect_left(posting, number)
+    return index < len(posting) and posting[index] == number
+
+  def _HasPhrases(self, number, phrases):
+    """Return True if line number contains every (lower-case) phrase."""
+    lines = self._provider.Lines(number, number + 1)
+    if not lines:
+      return False
+    return self._LineHasPhrases(lines[0].lower(), phrases)
+
+  def _LineHasPhrases(self, line, phrases):
+    """Return True if a lower-case line contains every phrase."""
+    for phrase in phrases:
+      if phrase not in line:
+        return False
+    return True
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for log_index.py"""
+
+import unittest
+import launcher
+
+
+class LogIndexTest(unittest.TestCase):
+
+  def setUp(self):
+    self.store = launcher.LogStore()
+    self.index = launcher.LogIndex(self.store)
+
+  def testSearch(self):
+    self.store.AppendText('INFO Starting server\n'
+                          'ERROR Traceback (most recent call last):\n'
+                          '  File "main.py", line 12, in get\n'
+                          'KeyError: foo_bar\n'
+                          'INFO request done\n')
+    self.assertEqual([1], self.index.Search('error'))
+    self.assertEqual([3], self.index.Search('KeyError'))
+    self.assertEqual([0, 4], self.index.Search('info'))
+    self.assertEqual([4], self.index.Search('info done'))
+    self.assertEqual([], self.index.Search('info missing'))
+    self.assertEqual([3], self.index.Search('foo_bar'))
+    self.assertEqual([1], self.index.Search('"most recent call"'))
+    self.assertEqual([], self.index.Search('"recent most"'))
+    self.assertEqual([], self.index.Search(''))
+
+  def testPunctuatedWords(self):
+    """A word like foo-bar is matched as text, not as two tokens."""
+    self.store.AppendText('foo-bar\n'
+                          'bar foo\n'
+                          'open main.py\n'
+                          'main py\n')
+    self.assertEqual([0], self.index.Search('foo-bar'))
+    self.assertEqual([0, 1], self.index.Search('foo bar'))
+    self.assertEqual([2], self.index.Search('MAIN.PY'))
+
+  def testSearchIsBounded(self):
+    """Search() indexes a piece of a big backlog and scans the rest."""
+    self.index.SEARCH_INDEX_LINES = 10
+    for i in range(25):
+      self.store.AppendText('line %d%s\n' % (i, ' odd' * (i % 2)))
+    self.assertEqual(range(1, 25, 2), self.index.Search('odd'))
+    self.assertEqual(10, self.index.IndexedLineCount())
+    self.assertEqual([21], self.index.Search('"line 21"'))
+    self.assertEqual(20, self.index.IndexedLineCount())
+
+  def testIncremental(self):
+    self.store.AppendText('alpha beta\n')
+    self.assertEqual([0], self.index.Search('alpha'))
+    self.store.AppendText('beta gam')
+    self.assertTrue(self.index.IsUpToDate())
+    self.assertEqual([0], self.index.Search('beta'))
+    self.store.AppendText('ma\n')
+    self.assertFalse(self.index.IsUpToDate())
+    self.assertEqual([1], self.index.Search('gamma'))
+    self.assertEqual([0, 1], self.index.Search('beta'))
+
+  def testPiecewiseUpdate(self):
+    for i in range(10):
+      self.store.AppendText('line %d\n' % i)
+    self.assertFalse(self.index.Update(max_lines=4))
+    self.assertEqual(4, self.index.IndexedLineCount())
+    self.assertTrue(self.index.Update())
+    self.assertEqual(range(10), self.index.Search('line'))
+
+  def testDroppedLines(self):
+    store = launcher.LogStore(max_lines=4)
+    index = launcher.LogIndex(store)
+    for i in range(3):
+      store.AppendText('line %d\n' % i)
+    self.assertEqual([0, 1, 2], index.Search('line'))
+    for i in range(3, 10):
+      store.AppendText('line %d\n' % i)
+    # Lines 0-5 are gone; some were never indexed.
+    self.assertEqual([6, 7, 8, 9], index.Search('line'))
+    self.assertEqual([], index.Search('1'))
+    self.assertTrue(index.IndexedLineCount() <= 7)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""On-disk journal of the full output of a project."""
+
+
+import array
+import logging
+import mmap
+import os
+import re
+
+import log_dedup
+
+class LogJournal(object):
+  """An append-only file of project output, with a line index (model in MVC).
+
+  The in-memory LogStore only keeps recent output.  A journal keeps
+  all of it on disk.  Next to the file we keep an array of the offset
+  where each line starts, and read the file back through mmap, so any
+  line or range of lines can be fetched without scanning.
+
+  Lines folded out as repeats (see log_dedup.RepeatFolder) are not
+  written; the count for each folded line is kept in memory instead,
+  and shown when the line is read back.
+
+  A journal starts empty: an existing file of the same name (from an
+  earlier launcher session) is truncated.
+
+  So that a chatty project can't fill the disk, the file is rotated
+  once it grows past max_bytes: it is renamed with a '.1' suffix
+  (replacing any older one) and a new, empty file started.  The lines
+  in the renamed file are dropped from the journal, so
+  FirstLineNumber() moves on, just as for a LogStore.
+  """
+
+  DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+  # Suffix for the rotated-out file.
+  ROTATED_SUFFIX = '.1'
+
+  def __init__(self, filename, max_bytes=DEFAULT_MAX_BYTES):
+    """Create a new, empty LogJournal.
+
+    Args:
+      filename: the file to write the journal to.
+      max_bytes: the size past which the file is rotated.
+    Raises:
+      IOError: the file can't be created.
+    """
+    # self._file: the journal file, opened for appending
+    # self._first_number: the number of the first line in the file
+    # self._starts: offset of the start of every line in the file, plus
+    #   the start of the (possibly empty) line being written now.  The
+    #   offsets are doubles, since 'L' is only 32 bits on some platforms
+    #   and Python 2 has no 'Q'; a double holds any file offset exactly.
+    # self._size: number of bytes written to the file
+    # self._rotate_size: the size at which we next try to rotate
+    # self._map: a read-only mmap of the file, or None
+    # self._map_size: the file size when self._map was made
+    # self._repeats: maps the number of each line seen more than once
+    #   in a row to how many times it was seen
+    self._filename = filename
+    self._max_bytes = max_bytes
+    self._file = open(filename, 'w+b')
+    self._first_number = 0
+    self._starts = array.array('d', [0])
+    self._size = 0
+    self._rotate_size = max_bytes
+    self._map = None
+    self._map_size = 0
+    self._repeats = {}
+
+  @staticmethod
+  def FilenameForProject(directory, project):
+    """Return a journal filename for a project.
+
+    Args:
+      directory: the directory which holds journals
+      project: a launcher.Project
+    """
+    name = re.sub(r'[^A-Za-z0-9_.-]', '_', project.name)
+    return os.path.join(directory, '%s-%d.log' % (name, project.port))
+
+  @property
+  def filename(self):
+    """The name of our journal file."""
+    return self._filename
+
+  def AppendText(self, text):
+    """Append text to the journal and index the lines it starts.
+
+    Args:
+      text: a string of output; may hold many lines, or part of one.
+    """
+    if not text:
+      return
+    self._file.write(text)
+    newline = text.find('\n')
+    while newline >= 0:
+      self._starts.append(self._size + newline + 1)
+      newline = text.find('\n', newline + 1)
+    self._size += len(text)
+    if self._size > self._rotate_size and self.LineCount():
+      self._Rotate()
+
+  def _Rotate(self):
+    """Move the file's complete lines aside and start a new file.
+
+    The partial line (if any) is carried over to the new file.  If the
+    file can't be renamed (on Windows, say, while an export is reading
+    it), we keep appending and try again once it has grown by another
+    max_bytes.
+    """
+    partial = self.PartialLine()
+    if self._map:
+      self._map.close()
+      self._map = None
+      self._map_size = 0
+    self._file.close()
+    rotated = self._filename + self.ROTATED_SUFFIX
+    try:
+      if os.path.exists(rotated):
+        os.remove(rotated)
+      os.rename(self._filename, rotated)
+    except OSError, err:
+      logging.warning('Cannot rotate log journal %s: %s' %
+                      (self._filename, err))
+      self._file = open(self._filename, 'a+b')
+      self._rotate_size = self._size + self._max_bytes
+      return
+    self._file = open(self._filename, 'w+b')
+    self._file.write(partial)
+    self._first_number = self.EndLineNumber()
+    self._starts = array.array('d', [0])
+    self._size = len(partial)
+    self._rotate_size = self._max_bytes
+    for number in [n for n in self._repeats if n < self._first_number]:
+      del self._repeats[number]
+
+  def AddRepeats(self, count):
+    """Count the last complete line as seen count more times.
+
+    Args:
+      count: the number of repeats folded out of the output.
+    """
+    if self.LineCount():
+      number = self.EndLineNumber() - 1
+      self._repeats[number] = self._repeats.get(number, 1) + count
+
+  def Repeats(self, number):
+    """Return how many times in a row a line was seen."""
+    return self._repeats.get(number, 1)
+
+  def RepeatCounts(self):
+    """Return a copy of the map from line number to repeat count."""
+    return dict(self._repeats)
+
+  def LineCount(self):
+    """Return the number of complete lines in the journal."""
+    return len(self._starts) - 1
+
+  def FirstLineNumber(self):
+    """Return the number of the first line still in the journal."""
+    return self._first_number
+
+  def EndLineNumber(self):
+    """Return the number one past the last complete line."""
+    return self._first_number + self.LineCount()
+
+  def ByteCount(self):
+    """Return the size of the journal file in bytes."""
+    return self._size
+
+  def Offset(self, number):
+    """Return the offset in the file where a line starts.
+
+    Args:
+      number: the line number, clipped to [FirstLineNumber(),
+        EndLineNumber()]; the start of the partial line (if any) is the
+        offset of EndLineNumber().
+    """
+    index = max(0, min(number - self._first_number, self.LineCount()))
+    return int(self._starts[index])
+
+  def Line(self, number):
+    """Return one complete line.
+
+    Args:
+      number: the line number, counting from 0.
+    Raises:
+      IndexError: there is no such line.
+    """
+    if number < self._first_number or number >= self.EndLineNumber():
+      raise IndexError('no line %d in journal' % number)
+    index = number - self._first_number
+    line = self._Read(int(self._starts[index]),
+                      int(self._starts[index + 1]))
+    return log_dedup.RepeatFolder.Render(line, self.Repeats(number))
+
+  def Lines(self, start, end):
+    """Return a list of the complete lines numbered [start, end).
+
+    Args:
+      start: the first line number.
+      end: one past the last line number.  Both are clipped to the
+        lines actually in the journal.
+    """
+    first = self._first_number
+    start = max(first, start)
+    end = min(end, self.EndLineNumber())
+    if start >= end:
+      return []
+    starts = map(int, self._starts[start - first:end - first + 1])
+    if starts[-1] > self._map_size:
+      self._Remap()
+    data = self._map
+    lines = [data[starts[i]:starts[i + 1]] for i in xrange(end - start)]
+    if self._repeats:
+      repeats = self._repeats
+      render = log_dedup.RepeatFolder.Render
+      for n in xrange(start, end):
+        if n in repeats:
+          lines[n - start] = render(lines[n - start], repeats[n])
+    return lines
+
+  def PartialLine(self):
+    """Return the text after the last newline (possibly '')."""
+    return self._Read(int(self._starts[-1]), self._size)
+
+  def _Read(self, begin, end):
+    """Return the bytes of the journal in [begin, end)."""
+    if begin >= end:
+      return ''
+    if end > self._map_size:
+      self._Remap()
+    return self._map[begin:end]
+
+  def _Remap(self):
+    """Map the file again so the mapping covers everything written."""
+    self._file.flush()
+    if self._map:
+      self._map.close()
+    self._map = mmap.mmap(self._file.fileno(), self._size,
+                          access=mmap.ACCESS_READ)
+    self._map_size = self._size
+
+  def Flush(self):
+    """Make sure everything appended is in the file, for other readers."""
+    self._file.flush()
+
+  def Close(self):
+    """Close the journal.  The file is left on disk."""
+    if self._map:
+      self._map.close()
+      self._map = None
+    self._file.close()
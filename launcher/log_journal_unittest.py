@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for log_journal.py"""
+
+import os
+import tempfile
+import unittest
+import launcher
+
+
+class LogJournalTest(unittest.TestCase):
+
+  def setUp(self):
+    (fd, self.filename) = tempfile.mkstemp()
+    os.close(fd)
+    self.journal = launcher.LogJournal(self.filename)
+
+  def tearDown(self):
+    self.journal.Close()
+    os.remove(self.filename)
+
+  def testBasics(self):
+    journal = self.journal
+    self.assertEqual(0, journal.LineCount())
+    self.assertEqual([], journal.Lines(0, 10))
+    self.assertEqual('', journal.PartialLine())
+    journal.AppendText('one\ntwo\nthr')
+    self.assertEqual(2, journal.LineCount())
+    self.assertEqual('two\n', journal.Line(1))
+    self.assertEqual('thr', journal.PartialLine())
+    journal.AppendText('ee\r\n\nfour\n')
+    self.assertEqual(5, journal.LineCount())
+    self.assertEqual(['three\r\n', '\n', 'four\n'], journal.Lines(2, 99))
+    self.assertEqual(['one\n'], journal.Lines(-5, 1))
+    self.assertRaises(IndexError, journal.Line, 5)
+    self.assertEqual(len('one\ntwo\nthree\r\n\nfour\n'), journal.ByteCount())
+    self.assertEqual('one\ntwo\nthree\r\n\nfour\n',
+                     open(self.filename, 'rb').read())
+
+  def testManyLines(self):
+    for i in range(5000):
+      self.journal.AppendText('line %d\n' % i)
+      if i % 1000 == 0:
+        # Reads in the middle of writing must see everything so far.
+        self.assertEqual('line %d\n' % i, self.journal.Line(i))
+    self.assertEqual(5000, self.journal.LineCount())
+    self.assertEqual(0, self.journal.FirstLineNumber())
+    self.assertEqual(5000, self.journal.EndLineNumber())
+    self.assertEqual(['line 2500\n', 'line 2501\n'],
+                     self.journal.Lines(2500, 2502))
+
+  def testRepeats(self):
+    journal = self.journal
+    journal.AppendText('poll\nother\n')
+    journal.AddRepeats(4)
+    self.assertEqual(5, journal.Repeats(1))
+    self.assertEqual(1, journal.Repeats(0))
+    self.assertEqual(['poll\n', 'other (x5)\n'], journal.Lines(0, 2))
+    self.assertEqual('other (x5)\n', journal.Line(1))
+    self.assertEqual({1: 5}, journal.RepeatCounts())
+    # Only the first line of a run is written.
+    self.assertEqual('poll\nother\n', open(self.filename, 'rb').read())
+
+  def testRotation(self):
+    """A full journal moves its file aside and drops those lines."""
+    journal = launcher.LogJournal(self.filename + '.r', max_bytes=20)
+    rotated = journal.filename + launcher.LogJournal.ROTATED_SUFFIX
+    try:
+      journal.AppendText('line 0\nline 1\n')
+      journal.AddRepeats(2)
+      self.assertEqual(0, journal.FirstLineNumber())
+      journal.AppendText('line 2\nli')
+      self.assertEqual(3, journal.FirstLineNumber())
+      self.assertEqual(3, journal.EndLineNumber())
+      self.assertEqual('line 0\nline 1\nline 2\nli',
+                       open(rotated, 'rb').read())
+      self.assertEqual({}, journal.RepeatCounts())
+      journal.AppendText('ne 3\nline 4\n')
+      self.assertEqual(['line 3\n', 'line 4\n'], journal.Lines(0, 99))
+      self.assertEqual('line 4\n', journal.Line(4))
+      self.assertRaises(IndexError, journal.Line, 2)
+      self.assertEqual(7, journal.Offset(4))
+      self.assertEqual(0, journal.Offset(0))
+      # The next rotation replaces the older file.
+      journal.AppendText('line 5\n')
+      self.assertEqual(6, journal.FirstLineNumber())
+      self.assertEqual('line 3\nline 4\nline 5\n',
+                       open(rotated, 'rb').read())
+    finally:
+      journal.Close()
+      for name in (journal.filename, rotated):
+        if os.path.exists(name):
+          os.remove(name)
+
+  def testFilenameForProject(self):
+    project = launcher.Project('/tmp/foo', 8080, 'my app/1')
+    filename = launcher.LogJournal.FilenameForProject('/logs', project)
+    self.assertEqual(os.path.join('/logs', 'my_app_1-8080.log'), filename)
+
+
+if __name__ == '__main__':
+  unittest.main()
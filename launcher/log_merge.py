@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Merging of the output of several projects in arrival order."""
+
+
+import heapq
+
+
+class LogMerger(object):
+  """Merges the lines of several LogStores by the time they arrived.
+
+  Each store's lines are already in arrival order, so each Update()
+  does a k-way heap merge of the lines added to every store since the
+  last one.  Lines are tagged with the name of their source, and keep
+  the level, timestamp and source their store parsed.
+
+  Since output is added to the stores on the main thread as it
+  arrives, lines added after an Update() never arrived before the
+  lines it returned; so the merged lines stay in order across calls.
+
+  Lines dropped from a store before we get to them are skipped.
+  """
+
+  def __init__(self, sources):
+    """Create a new LogMerger.  The first Update() gets all held lines.
+
+    Args:
+      sources: a list of (name, LogStore) pairs.
+    """
+    # self._next_lines: for each source, the first line not yet merged
+    self._sources = list(sources)
+    self._next_lines = [store.FirstLineNumber()
+                        for (_, store) in self._sources]
+
+  def Update(self):
+    """Return the lines added to our sources since the last call.
+
+    Returns:
+      A list of (line, level, timestamp, source, arrival time) tuples,
+      in arrival order, with each line prefixed by '[name] '.  The
+      tuples suit LogStore.AppendParsedLines().
+    """
+    streams = []
+    for (index, (name, store)) in enumerate(self._sources):
+      start = max(self._next_lines[index], store.FirstLineNumber())
+      end = store.EndLineNumber()
+      self._next_lines[index] = end
+      if start < end:
+        streams.append(self._Stream(index, name, store, start, end))
+    return [entry[3:] for entry in heapq.merge(*streams)]
+
+  def _Stream(self, index, name, store, start, end):
+    """Generate the merge entries for some lines of one store.
+
+    Entries sort by arrival time, then by source and line number, so
+    lines which arrived at the same time keep a fixed order.
+
+    Args:
+      index: the index of the store in our sources.
+      name: the name lines from the store are tagged with.
+      store: the LogStore.
+      start, end: the numbers of the lines wanted, [start, end).
+    """
+    tag = '[%s] ' % name
+    for (number, line) in enumerate(store.Lines(start, end), start):
+      arrival_time = store.ArrivalTime(number)
+      yield (arrival_time, index, number, tag + line, store.Level(number),
+             store.Timestamp(number), store.Source(number), arrival_time)
+
+  @property
+  def names(self):
+    """The names of our sources."""
+    return [name for (name, _) in self._sources]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for log_merge.py"""
+
+import logging
+import unittest
+import launcher
+
+
+class LogMergerTest(unittest.TestCase):
+
+  def setUp(self):
+    self.frontend = launcher.LogStore()
+    self.backend = launcher.LogStore()
+    self.merger = launcher.LogMerger([('frontend', self.frontend),
+                                      ('backend', self.backend)])
+
+  def testMerge(self):
+    self.frontend.AppendText('f1\n', arrival_time=1.0)
+    self.backend.AppendText('b1\nb2\n', arrival_time=2.0)
+    self.frontend.AppendText('f2\n', arrival_time=3.0)
+    self.backend.AppendText('b3\n', arrival_time=3.0)
+    lines = [entry[0] for entry in self.merger.Update()]
+    self.assertEqual(['[frontend] f1\n', '[backend] b1\n', '[backend] b2\n',
+                      '[frontend] f2\n', '[backend] b3\n'], lines)
+    self.assertEqual([], self.merger.Update())
+    self.backend.AppendText('b4\n', arrival_time=4.0)
+    self.assertEqual(['[backend] b4\n'],
+                     [entry[0] for entry in self.merger.Update()])
+    self.assertEqual(['frontend', 'backend'], self.merger.names)
+
+  def testParsedFieldsKept(self):
+    self.frontend.AppendText(
+        'ERROR    2009-04-08 23:09:25,456 main.py:12] bad\n', arrival_time=5)
+    (line, level, timestamp, source, arrival_time) = self.merger.Update()[0]
+    self.assertEqual(logging.ERROR, level)
+    self.assertEqual(self.frontend.Timestamp(0), timestamp)
+    self.assertEqual('main.py:12', source)
+    self.assertEqual(5, arrival_time)
+    merged = launcher.LogStore()
+    merged.AppendParsedLines([(line, level, timestamp, source, arrival_time)])
+    self.assertEqual(logging.ERROR, merged.Level(0))
+    self.assertEqual('main.py:12', merged.Source(0))
+    self.assertEqual(line, merged.GetText())
+
+  def testDroppedLinesSkipped(self):
+    store = launcher.LogStore(max_lines=2)
+    merger = launcher.LogMerger([('a', store)])
+    store.AppendText('1\n2\n3\n')
+    self.assertEqual(['[a] 2\n', '[a] 3\n'],
+                     [entry[0] for entry in merger.Update()])
+
+
+if __name__ == '__main__':
+  unittest.main()
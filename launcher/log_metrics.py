@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""User-defined metrics taken from a project's output."""
+
+
+import collections
+import csv
+import logging
+import math
+import re
+import time
+
+
+class MetricExtractor(object):
+  """Pulls the value of one named metric out of lines of output.
+
+  The pattern is a regular expression.  If it has a group, a matching
+  line's value is the number the group matched, as for 'rpc_ms=(\\d+)';
+  otherwise each matching line counts 1, as for 'cache hit'.
+  """
+
+  def __init__(self, name, pattern):
+    """Create a new MetricExtractor.
+
+    Args:
+      name: the metric's name.
+      pattern: a regular expression, as described in the class docstring.
+    Raises:
+      re.error: the pattern isn't a valid regular expression.
+    """
+    self.name = name
+    self.pattern = pattern
+    self._regex = re.compile(pattern)
+
+  @classmethod
+  def FromSpec(cls, spec):
+    """Create a MetricExtractor from a 'name=pattern' string.
+
+    Raises:
+      ValueError: the spec doesn't have a name and a pattern.
+      re.error: the pattern isn't a valid regular expression.
+    """
+    (name, _, pattern) = spec.partition('=')
+    name = name.strip()
+    if not name or not pattern:
+      raise ValueError('want name=pattern, not %s' % spec)
+    return cls(name, pattern)
+
+  def Extract(self, line):
+    """Return the metric's value in a line, or None if it has none.
+
+    Args:
+      line: a line of output.
+    """
+    match = self._regex.search(line)
+    if not match:
+      return None
+    if not self._regex.groups:
+      return 1.0
+    try:
+      return float(match.group(1))
+    except (TypeError, ValueError):
+      return None
+
+
+class RollingSummary(object):
+  """Count, sum, min, max and percentiles of values in a sliding window.
+
+  Values are kept in one-second buckets for the last
+  MAX_WINDOW_SECONDS, so a summary can be had for any window up to
+  that long.  Counts, sums, minimums and maximums are exact;
+  percentiles are taken from the first SAMPLES_PER_BUCKET values of
+  each bucket, so memory stays bounded however fast values come.
+  """
+
+  MAX_WINDOW_SECONDS = 300
+  SAMPLES_PER_BUCKET = 200
+
+  def __init__(self, clock=time.time):
+    """Create a new RollingSummary.
+
+    Args:
+      clock: a function returning the time in seconds; for unittests.
+    """
+    # self._buckets: [second, count, sum, min, max, samples] for each
+    #   second (oldest first) in which a value was added
+    self._clock = clock
+    self._buckets = collections.deque()
+    self.total_count = 0
+    self.total_sum = 0.0
+
+  def Add(self, value):
+    """Add a value, at the current time."""
+    second = int(self._clock())
+    if self._buckets and second <= self._buckets[-1][0]:
+      bucket = self._buckets[-1]
+      bucket[1] += 1
+      bucket[2] += value
+      bucket[3] = min(bucket[3], value)
+      bucket[4] = max(bucket[4], value)
+      if len(bucket[5]) < self.SAMPLES_PER_BUCKET:
+        bucket[5].append(value)
+    else:
+      self._buckets.append([second, 1, value, value, value, [value]])
+      self._Expire(second)
+    self.total_count += 1
+    self.total_sum += value
+
+  def _Expire(self, now):
+    """Drop buckets too old for any window."""
+    oldest = now - self.MAX_WINDOW_SECONDS
+    while self._buckets and self._buckets[0][0] <= oldest:
+      self._buckets.popleft()
+
+  def Summary(self, window_seconds):
+    """Summarize the values added in the last window_seconds.
+
+    Args:
+      window_seconds: the window length, at most MAX_WINDOW_SECONDS.
+    Returns:
+      A dict with the count, sum, min, max, mean, p50 and p95 of the
+      values; all but count and sum are None if there were none.
+    """
+    now = int(self._clock())
+    self._Expire(now)
+    count = 0
+    total = 0.0
+    low = high = None
+    samples = []
+    for (second, bucket_count, bucket_sum, bucket_min, bucket_max,
+         bucket_samples) in self._buckets:
+      if second <= now - window_seconds:
+        continue
+      count += bucket_count
+      total += bucket_sum
+      if low is None or bucket_min < low:
+        low = bucket_min
+      if high is None or bucket_max > high:
+        high = bucket_max
+      samples.extend(bucket_samples)
+    samples.sort()
+    summary = {'count': count, 'sum': total, 'min': low, 'max': high,
+               'mean': None, 'p50': None, 'p95': None}
+    if count:
+      summary['mean'] = total / count
+      summary['p50'] = _Percentile(samples, 0.5)
+      summary['p95'] = _Percentile(samples, 0.95)
+    return summary
+
+  def Reset(self):
+    """Forget all values."""
+    self._buckets.clear()
+    self.total_count = 0
+    self.total_sum = 0.0
+
+
+class ProjectMetrics(object):
+  """A project's metrics: extractors, each feeding a RollingSummary.
+
+  Fed the project's output as it arrives; see AddLines().
+  """
+
+  # Windows (in seconds) shown and exported.
+  WINDOWS = (60, 300)
+  CSV_FIELDS = ('metric', 'window_seconds', 'count', 'sum', 'min', 'max',
+                'mean', 'p50', 'p95')
+
+  def __init__(self, extractors, clock=time.time):
+    """Create a new ProjectMetrics.
+
+    Args:
+      extractors: a list of MetricExtractors.
+      clock: a function returning the time in seconds; for unittests.
+    """
+    # self._summaries: a RollingSummary for each extractor
+    # self._specs: the specs given to SetSpecs(), if any
+    self._clock = clock
+    self._extractors = list(extractors)
+    self._summaries = [RollingSummary(clock) for _ in self._extractors]
+    self._specs = None
+
+  @classmethod
+  def FromSpecs(cls, specs, clock=time.time):
+    """Create a ProjectMetrics from 'name=pattern' strings.
+
+    Bad specs are logged and left out.
+
+    Args:
+      specs: a list of strings, as for MetricExtractor.FromSpec().
+      clock: a function returning the time in seconds; for unittests.
+    """
+    metrics = cls([], clock)
+    metrics.SetSpecs(specs)
+    return metrics
+
+  def SetSpecs(self, specs):
+    """Change our metrics to those of some 'name=pattern' strings.
+
+    A metric whose name and pattern are unchanged keeps its values.
+    Bad specs are logged and left out.
+
+    Args:
+      specs: a list of strings, as for MetricExtractor.FromSpec().
+    """
+    specs = list(specs)
+    if specs == self._specs:
+      return
+    self._specs = specs
+    old = dict([((extractor.name, extractor.pattern), summary)
+                for (extractor, summary) in zip(self._extractors,
+                                                self._summaries)])
+    self._extractors = []
+    self._summaries = []
+    for spec in specs:
+      try:
+        extractor = MetricExtractor.FromSpec(spec)
+      except (ValueError, re.error), err:
+        logging.info('Ignoring bad metric %s: %s' % (spec, err))
+        continue
+      summary = old.get((extractor.name, extractor.pattern))
+      self._extractors.append(extractor)
+      self._summaries.append(summary or RollingSummary(self._clock))
+
+  def AddLines(self, lines):
+    """Take metric values from some lines of output.
+
+    Args:
+      lines: complete lines of output, without their newlines (see
+        LineSplitter).
+    """
+    if not self._extractors:
+      return
+    for line in lines:
+      self.FeedLine(line)
+
+  def FeedLine(self, line):
+    """Take metric values from a line of output."""
+    for (extractor, summary) in zip(self._extractors, self._summaries):
+      value = extractor.Extract(line)
+      if value is not None:
+        summary.Add(value)
+
+  def Names(self):
+    """Return the names of our metrics, in the order defined."""
+    return [extractor.name for extractor in self._extractors]
+
+  def Rows(self, window_seconds):
+    """Return a summary dict (see RollingSummary) for each metric.
+
+    Each dict also has the metric's name and the window, under the
+    keys 'metric' and 'window_seconds'.
+    """
+    rows = []
+    for (extractor, summary) in zip(self._extractors, self._summaries):
+      row = summary.Summary(window_seconds)
+      row['metric'] = extractor.name
+      row['window_seconds'] = window_seconds
+      rows.append(row)
+    return rows
+
+  def WriteCsv(self, output):
+    """Write the summaries for all our windows as CSV.
+
+    Args:
+      output: a file-like object to write to.
+    """
+    writer = csv.DictWriter(output, self.CSV_FIELDS)
+    writer.writerow(dict(zip(self.CSV_FIELDS, self.CSV_FIELDS)))
+    for window_seconds in self.WINDOWS:
+      for row in self.Rows(window_seconds):
+        writer.writerow(row)
+
+  def Reset(self):
+    """Forget all values."""
+    for summary in self._summaries:
+      summary.Reset()
+
+
+def _Percentile(values, fraction):
+  """Return the nearest-rank percentile of a sorted, non-empty list."""
+  index = int(math.ceil(fraction * len(values))) - 1
+  return values[max(0, min(index, len(values) - 1))]
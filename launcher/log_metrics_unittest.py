@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for log_metrics.py"""
+
+import re
+import StringIO
+import unittest
+import launcher
+import testutil
+
+
+class MetricExtractorTest(unittest.TestCase):
+
+  def testFromSpec(self):
+    extractor = launcher.MetricExtractor.FromSpec(' rpc_ms =took (\\d+)ms')
+    self.assertEqual('rpc_ms', extractor.name)
+    self.assertEqual('took (\\d+)ms', extractor.pattern)
+    for spec in ('no equals', '=pattern', 'name='):
+      self.assertRaises(ValueError, launcher.MetricExtractor.FromSpec, spec)
+    self.assertRaises(re.error, launcher.MetricExtractor.FromSpec, 'x=(bad')
+
+  def testExtract(self):
+    rpc = launcher.MetricExtractor('rpc_ms', 'took ([\\d.]+)ms')
+    self.assertEqual(12.5, rpc.Extract('datastore took 12.5ms'))
+    self.assertEqual(None, rpc.Extract('datastore took long'))
+    hits = launcher.MetricExtractor('hits', 'cache hit')
+    self.assertEqual(1.0, hits.Extract('memcache: cache hit for k'))
+    self.assertEqual(None, hits.Extract('cache miss'))
+    # A group which didn't take part in the match gives no value.
+    optional = launcher.MetricExtractor('x', 'x(\\d+)?')
+    self.assertEqual(None, optional.Extract('x'))
+
+
+class RollingSummaryTest(unittest.TestCase):
+
+  def testSummary(self):
+    clock = testutil.FakeClock()
+    summary = launcher.RollingSummary(clock)
+    self.assertEqual({'count': 0, 'sum': 0.0, 'min': None, 'max': None,
+                      'mean': None, 'p50': None, 'p95': None},
+                     summary.Summary(60))
+    for value in range(1, 101):
+      summary.Add(float(value))
+    result = summary.Summary(60)
+    self.assertEqual(100, result['count'])
+    self.assertEqual(5050.0, result['sum'])
+    self.assertEqual(1.0, result['min'])
+    self.assertEqual(100.0, result['max'])
+    self.assertEqual(50.5, result['mean'])
+    self.assertEqual(50.0, result['p50'])
+    self.assertEqual(95.0, result['p95'])
+
+  def testWindows(self):
+    clock = testutil.FakeClock()
+    summary = launcher.RollingSummary(clock)
+    summary.Add(1.0)
+    clock.now += 120
+    summary.Add(3.0)
+    self.assertEqual(1, summary.Summary(60)['count'])
+    self.assertEqual(2, summary.Summary(300)['count'])
+    self.assertEqual(1.0, summary.Summary(300)['min'])
+    clock.now += 200
+    self.assertEqual(0, summary.Summary(60)['count'])
+    self.assertEqual(1, summary.Summary(300)['count'])
+    # Totals aren't windowed.
+    self.assertEqual(2, summary.total_count)
+    self.assertEqual(4.0, summary.total_sum)
+    summary.Reset()
+    self.assertEqual(0, summary.Summary(300)['count'])
+    self.assertEqual(0, summary.total_count)
+
+  def testSamplesBounded(self):
+    summary = launcher.RollingSummary(testutil.FakeClock())
+    count = summary.SAMPLES_PER_BUCKET * 3
+    for value in range(count):
+      summary.Add(float(value))
+    result = summary.Summary(60)
+    # Count and extremes stay exact when samples are dropped.
+    self.assertEqual(count, result['count'])
+    self.assertEqual(count - 1.0, result['max'])
+    self.assertEqual(summary.SAMPLES_PER_BUCKET,
+                     len(summary._buckets[0][5]))
+
+
+class ProjectMetricsTest(unittest.TestCase):
+
+  def testAddLines(self):
+    metrics = launcher.ProjectMetrics.FromSpecs(
+        ['rpc_ms=took (\\d+)ms', 'hits=cache hit', 'bad=(oops'],
+        testutil.FakeClock())
+    self.assertEqual(['rpc_ms', 'hits'], metrics.Names())
+    metrics.AddLines(['took 10ms', 'cache hit'])
+    metrics.AddLines(['took 30ms, cache hit', 'nothing'])
+    rows = metrics.Rows(60)
+    self.assertEqual(['rpc_ms', 'hits'], [row['metric'] for row in rows])
+    self.assertEqual((2, 40.0, 10.0, 30.0),
+                     (rows[0]['count'], rows[0]['sum'], rows[0]['min'],
+                      rows[0]['max']))
+    self.assertEqual((2, 2.0), (rows[1]['count'], rows[1]['sum']))
+    self.assertEqual(60, rows[1]['window_seconds'])
+    metrics.Reset()
+    self.assertEqual(0, metrics.Rows(60)[0]['count'])
+
+  def testSetSpecs(self):
+    """Changing the definitions keeps the values of unchanged metrics."""
+    metrics = launcher.ProjectMetrics.FromSpecs(['hits=hit', 'ms=(\\d+)ms'],
+                                                testutil.FakeClock())
+    metrics.AddLines(['hit 5ms'])
+    metrics.SetSpecs(['ms=took (\\d+)ms', 'hits=hit', 'misses=miss'])
+    self.assertEqual(['ms', 'hits', 'misses'], metrics.Names())
+    self.assertEqual([0, 1, 0],
+                     [row['count'] for row in metrics.Rows(60)])
+    metrics.AddLines(['miss, took 7ms'])
+    self.assertEqual([1, 1, 1],
+                     [row['count'] for row in metrics.Rows(60)])
+
+  def testWriteCsv(self):
+    metrics = launcher.ProjectMetrics.FromSpecs(['hits=hit'],
+                                                testutil.FakeClock())
+    metrics.AddLines(['hit'])
+    output = StringIO.StringIO()
+    metrics.WriteCsv(output)
+    lines = output.getvalue().splitlines()
+    self.assertEqual(','.join(metrics.CSV_FIELDS), lines[0])
+    self.assertEqual(['hits,60,1,1.0,1.0,1.0,1.0,1.0,1.0',
+                      'hits,300,1,1.0,1.0,1.0,1.0,1.0,1.0'], lines[1:])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""The output of a project, kept whether or not anyone is watching it."""
+
+
+import log_store
+import log_time_index
+
+
+class ProjectLog(object):
+  """A project's output: its LogStore, LogJournal and TimeIndex (model in MVC).
+
+  Output is added here as it arrives, with no window needed; a
+  LogConsole is only made when someone asks to see the output, and
+  then shows what we hold.  Views register as listeners, and are told
+  about new output by calls of:
+
+    listener.LogAppended(text, dropped): text was added, and dropped
+      old lines were evicted from the store to make room.
+    listener.LogRepeated(count): the newest line was seen count more
+      times (see log_dedup.RepeatFolder).
+  """
+
+  def __init__(self, max_lines=log_store.LogStore.DEFAULT_MAX_LINES,
+               max_bytes=log_store.LogStore.DEFAULT_MAX_BYTES, journal=None):
+    """Create a new ProjectLog.
+
+    Args:
+      max_lines: the most lines of output the store keeps.
+      max_bytes: the most bytes of output the store keeps.
+      journal: if not None, a LogJournal to record all output in.
+    """
+    # self._listeners: the views told about new output
+    self._store = log_store.LogStore(max_lines, max_bytes)
+    self._journal = journal
+    self._time_index = log_time_index.TimeIndex()
+    self._listeners = []
+
+  def AddListener(self, listener):
+    """Tell a listener (see the class docstring) about new output."""
+    if listener not in self._listeners:
+      self._listeners.append(listener)
+
+  def RemoveListener(self, listener):
+    """Stop telling a listener about new output."""
+    if listener in self._listeners:
+      self._listeners.remove(listener)
+
+  def AppendText(self, text):
+    """Add output.
+
+    Args:
+      text: a string of output; may hold many lines, or part of one.
+    """
+    if not text:
+      return
+    if self._journal:
+      self._journal.AppendText(text)
+    dropped = self._store.AppendText(text)
+    self._Appended(text, dropped)
+
+  def AppendParsedLines(self, entries):
+    """Add complete lines which have already been parsed.
+
+    The lines go into the store only, not the journal (see
+    LogStore.AppendParsedLines()).
+
+    Args:
+      entries: a list of (line, level, timestamp, source, arrival time)
+        tuples, as from log_merge.LogMerger.Update().
+    """
+    if not entries:
+      return
+    dropped = self._store.AppendParsedLines(entries)
+    self._Appended(''.join([entry[0] for entry in entries]), dropped)
+
+  def _Appended(self, text, dropped):
+    """Index the new lines' arrival times and tell our listeners."""
+    store = self._store
+    start = max(self._time_index.EndLineNumber(), store.FirstLineNumber())
+    for number in xrange(start, store.EndLineNumber()):
+      self._time_index.Add(number, store.ArrivalTime(number))
+    for listener in list(self._listeners):
+      listener.LogAppended(text, dropped)
+
+  def AddRepeats(self, count):
+    """Count the newest complete line as seen count more times.
+
+    Args:
+      count: the number of repeats folded out of the output.
+    """
+    if self._journal:
+      self._journal.AddRepeats(count)
+    if self._store.LineCount():
+      self._store.AddRepeats(count)
+      for listener in list(self._listeners):
+        listener.LogRepeated(count)
+
+  @property
+  def store(self):
+    """The LogStore of our recent output."""
+    return self._store
+
+  @property
+  def journal(self):
+    """The LogJournal of all our output, or None."""
+    return self._journal
+
+  @property
+  def time_index(self):
+    """The TimeIndex of when our lines arrived."""
+    return self._time_index
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for log_model.py"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import launcher
+
+
+class FakeListener(object):
+  """Records what a ProjectLog tells it."""
+
+  def __init__(self):
+    self.calls = []
+
+  def LogAppended(self, text, dropped):
+    self.calls.append(('appended', text, dropped))
+
+  def LogRepeated(self, count):
+    self.calls.append(('repeated', count))
+
+
+class ProjectLogTest(unittest.TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def testAppendText(self):
+    journal = launcher.LogJournal(os.path.join(self.directory, 'j'))
+    log = launcher.ProjectLog(max_lines=2, journal=journal)
+    listener = FakeListener()
+    log.AddListener(listener)
+    log.AppendText('a\nb\nc')
+    log.AppendText('')
+    log.AddRepeats(2)
+    self.assertEqual([('appended', 'a\nb\nc', 0), ('repeated', 2)],
+                     listener.calls)
+    self.assertEqual('a\nb (x3)\nc', log.store.GetText())
+    self.assertEqual(['a\n', 'b (x3)\n'], journal.Lines(0, 2))
+    log.AppendText('\nd\n')
+    self.assertEqual(('appended', '\nd\n', 2), listener.calls[-1])
+    self.assertEqual(4, log.time_index.EndLineNumber())
+    log.RemoveListener(listener)
+    log.AppendText('e\n')
+    self.assertEqual(3, len(listener.calls))
+    journal.Close()
+
+  def testAppendParsedLines(self):
+    log = launcher.ProjectLog()
+    listener = FakeListener()
+    log.AddListener(listener)
+    log.AddRepeats(1)  # no lines yet; nothing to count
+    log.AppendParsedLines([('x\n', 0, 0.0, None, 1000.0),
+                           ('y\n', 0, 0.0, None, 1002.0)])
+    self.assertEqual([('appended', 'x\ny\n', 0)], listener.calls)
+    self.assertEqual((1, 2), log.time_index.LineRange(1001, 1003))
+    self.assertEqual(None, log.journal)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Parsing of the severity, time and source of dev_appserver log lines."""
+
+
+import logging
+import re
+import time
+
+
+class LineParser(object):
+  """Pulls the severity, timestamp and source out of log lines.
+
+  dev_appserver log lines start with a header like
+    INFO     2009-04-08 23:09:25,456 dev_appserver_main.py:422] Running...
+  Lines without a header (tracebacks, print output) are taken to
+  belong to the last line which had one, so they get its severity and
+  time but no source.
+
+  Levels are the numbers from the logging module (logging.INFO and so
+  on), or LEVEL_NONE before any header has been seen.
+  """
+
+  LEVEL_NONE = 0
+
+  # Level names as they appear in the log, and the reverse.
+  LEVELS = {
+      'DEBUG': logging.DEBUG,
+      'INFO': logging.INFO,
+      'WARNING': logging.WARNING,
+      'ERROR': logging.ERROR,
+      'CRITICAL': logging.CRITICAL,
+  }
+  LEVEL_NAMES = dict([(v, k) for (k, v) in LEVELS.items()])
+
+  _HEADER_RE = re.compile(
+      r'(DEBUG|INFO|WARNING|ERROR|CRITICAL)\s+'
+      r'(\d\d\d\d)-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)(?:[,.](\d+))?\s+'
+      r'([^\s\]]+)\]')
+
+  # Every header starts with one of these, so most other lines can be
+  # skipped without trying the regular expression.
+  _HEADER_INITIALS = 'DIWEC'
+
+  def __init__(self):
+    # self._level, self._time: from the last line with a header
+    # self._sources: interned source strings, so equal ones are shared
+    # self._second_cache: (date/time groups, seconds) of the last header
+    self._level = self.LEVEL_NONE
+    self._time = 0.0
+    self._sources = {}
+    self._second_cache = (None, 0.0)
+
+  def Parse(self, line):
+    """Return the (level, timestamp, source) of a line.
+
+    Args:
+      line: a line of output.
+    Returns:
+      A tuple of the level (an int), the timestamp (seconds since the
+      epoch, as a float; 0.0 if unknown) and the source ('file.py:123',
+      or None).
+    """
+    if line[:1] in self._HEADER_INITIALS:
+      match = self._HEADER_RE.match(line)
+      if match:
+        groups = match.groups()
+        self._level = self.LEVELS[groups[0]]
+        self._time = self._Seconds(groups[1:7])
+        if groups[7]:
+          self._time += float('0.' + groups[7])
+        source = self._sources.setdefault(groups[8], groups[8])
+        return (self._level, self._time, source)
+    return (self._level, self._time, None)
+
+  def _Seconds(self, fields):
+    """Return the local time given as (year, ..., second) strings.
+
+    Consecutive lines are often logged in the same second, so we
+    remember the last conversion.
+    """
+    (cached_fields, seconds) = self._second_cache
+    if fields != cached_fields:
+      (year, month, day, hour, minute, second) = [int(f) for f in fields]
+      try:
+        seconds = time.mktime((year, month, day, hour, minute, second,
+                               0, 0, -1))
+      except (OverflowError, ValueError):
+        seconds = 0.0
+      self._second_cache = (fields, seconds)
+    return seconds
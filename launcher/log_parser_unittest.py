@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for log_parser.py"""
+
+import logging
+import time
+import unittest
+import launcher
+
+
+class LineParserTest(unittest.TestCase):
+
+  def testParse(self):
+    parser = launcher.LineParser()
+    self.assertEqual((launcher.LineParser.LEVEL_NONE, 0.0, None),
+                     parser.Parse('Allow dev_appserver to check for updates\n'))
+    (level, timestamp, source) = parser.Parse(
+        'INFO     2009-04-08 23:09:25,456 dev_appserver_main.py:422] '
+        'Running application x on port 8080\n')
+    self.assertEqual(logging.INFO, level)
+    expected = time.mktime((2009, 4, 8, 23, 9, 25, 0, 0, -1)) + 0.456
+    self.assertAlmostEqual(expected, timestamp)
+    self.assertEqual('dev_appserver_main.py:422', source)
+    (level, _, source) = parser.Parse(
+        'ERROR    2009-04-08 23:09:26,001 dev_appserver.py:2906] Oops\n')
+    self.assertEqual(logging.ERROR, level)
+    # Lines without a header belong to the last line which had one.
+    (level, timestamp, source) = parser.Parse('Traceback (most recent...\n')
+    self.assertEqual(logging.ERROR, level)
+    self.assertAlmostEqual(expected + 1 - 0.455, timestamp, 3)
+    self.assertEqual(None, source)
+
+  def testSharedSources(self):
+    parser = launcher.LineParser()
+    line = 'WARNING  2014-05-01 12:00:00,123 api_server.py:10] x\n'
+    self.assertTrue(parser.Parse(line)[2] is parser.Parse(line[:])[2])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Lines of text kept in segments, the older ones compressed."""
+
+
+import bisect
+import zlib
+
+
+class LineSegments(object):
+  """A sequence of numbered lines, mostly held zlib-compressed.
+
+  New lines go into the hot segment as they are.  Once it holds
+  SEGMENT_BYTES of text it is compressed and becomes a cold segment,
+  and a new hot segment is started.  Output compresses well, so cold
+  segments take a fraction of the memory of their text.
+
+  Reading a line of a cold segment decompresses the whole segment.
+  The last CACHE_SEGMENTS segments decompressed are kept, most
+  recently used last, so scrolling or searching through a region
+  doesn't decompress it again for every line.
+
+  Lines are numbered by the caller's numbering: the first line
+  appended gets first_number.  Old lines are dropped with
+  DropBefore(); a cold segment's memory is freed once all its lines
+  are dropped.
+
+  Every line must end in a newline.
+  """
+
+  # Bytes of text a hot segment holds before it is compressed.
+  SEGMENT_BYTES = 64 * 1024
+  # Number of decompressed segments kept.
+  CACHE_SEGMENTS = 4
+
+  def __init__(self, first_number=0, segment_bytes=SEGMENT_BYTES,
+               cache_segments=CACHE_SEGMENTS):
+    """Create a new, empty LineSegments.
+
+    Args:
+      first_number: the number of the first line to be appended.
+      segment_bytes: bytes of text per segment.
+      cache_segments: the number of decompressed segments kept.
+    """
+    # self._first: number of the first line held
+    # self._cold_starts: number of the first line in each cold segment
+    # self._cold: (end, compressed text) of each cold segment, where
+    #   end is one past the number of its last line
+    # self._hot_start: number of the first line in the hot segment
+    # self._hot: the lines of the hot segment
+    # self._cache: (start, lines) of recently decompressed segments,
+    #   the most recently used last
+    self._segment_bytes = segment_bytes
+    self._cache_segments = cache_segments
+    self._first = first_number
+    self._cold_starts = []
+    self._cold = []
+    self._hot_start = first_number
+    self._hot = []
+    self._hot_bytes = 0
+    self._cold_bytes = 0
+    self._cache = []
+
+  def Append(self, line):
+    """Add a line at the end, compressing the hot segment if it's full.
+
+    Args:
+      line: a line of text, ending in a newline.
+    """
+    self._hot.append(line)
+    self._hot_bytes += len(line)
+    if self._hot_bytes >= self._segment_bytes:
+      self._Compress()
+
+  def _Compress(self):
+    """Turn the hot segment into a cold one."""
+    end = self._hot_start + len(self._hot)
+    data = zlib.compress(''.join(self._hot))
+    self._cold_starts.append(self._hot_start)
+    self._cold.append((end, data))
+    self._cold_bytes += len(data)
+    self._hot_start = end
+    self._hot = []
+    self._hot_bytes = 0
+
+  def EndNumber(self):
+    """Return the number one past the last line held."""
+    return self._hot_start + len(self._hot)
+
+  def OldestSegmentEnd(self):
+    """Return the end of the oldest cold segment, or None if none.
+
+    Dropping the lines before it frees that segment's memory.
+    """
+    if self._cold:
+      return self._cold[0][0]
+    return None
+
+  def MemoryBytes(self):
+    """Return about how much memory the text held takes, in bytes."""
+    return self._cold_bytes + self._hot_bytes
+
+  def DropBefore(self, number):
+    """Drop the lines numbered below number.
+
+    Args:
+      number: the number of the first line to keep.
+    """
+    if number <= self._first:
+      return
+    self._first = number
+    while self._cold and self._cold[0][0] <= number:
+      start = self._cold_starts.pop(0)
+      (_, data) = self._cold.pop(0)
+      self._cold_bytes -= len(data)
+      self._cache = [entry for entry in self._cache if entry[0] != start]
+    if number > self._hot_start:
+      count = min(number, self.EndNumber()) - self._hot_start
+      self._hot_bytes -= sum([len(line) for line in self._hot[:count]])
+      del self._hot[:count]
+      self._hot_start += count
+
+  def Lines(self, start, end):
+    """Return a list of the held lines numbered [start, end), clipped."""
+    start = max(start, self._first)
+    end = min(end, self.EndNumber())
+    lines = []
+    while start < end and start < self._hot_start:
+      index = bisect.bisect_right(self._cold_starts, start) - 1
+      segment_start = self._cold_starts[index]
+      segment_end = min(end, self._cold[index][0])
+      segment = self._Decompress(index)
+      lines.extend(segment[start - segment_start:segment_end - segment_start])
+      start = segment_end
+    if start < end:
+      lines.extend(self._hot[start - self._hot_start:end - self._hot_start])
+    return lines
+
+  def Line(self, number):
+    """Return one held line.
+
+    Raises:
+      IndexError: the line isn't held.
+    """
+    if number < self._first or number >= self.EndNumber():
+      raise IndexError('line %d not held' % number)
+    return self.Lines(number, number + 1)[0]
+
+  def _Decompress(self, index):
+    """Return the lines of a cold segment, through the cache.
+
+    Args:
+      index: the index of the segment in self._cold.
+    """
+    start = self._cold_starts[index]
+    for (position, entry) in enumerate(self._cache):
+      if entry[0] == start:
+        if position != len(self._cache) - 1:
+          del self._cache[position]
+          self._cache.append(entry)
+        return entry[1]
+    text = zlib.decompress(self._cold[index][1])
+    lines = [line + '\n' for line in text.split('\n')[:-1]]
+    self._cache.append((start, lines))
+    if len(self._cache) > self._cache_segments:
+      del self._cache[0]
+    return lines
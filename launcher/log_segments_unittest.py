@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for log_segments.py"""
+
+import unittest
+import launcher
+
+
+class LineSegmentsTest(unittest.TestCase):
+
+  def setUp(self):
+    self.segments = launcher.LineSegments(segment_bytes=20, cache_segments=2)
+    for i in range(100):
+      self.segments.Append('line %02d\n' % i)
+
+  def testLines(self):
+    segments = self.segments
+    self.assertEqual(100, segments.EndNumber())
+    self.assertEqual('line 00\n', segments.Line(0))
+    self.assertEqual('line 99\n', segments.Line(99))
+    self.assertEqual(['line %02d\n' % i for i in range(5, 95)],
+                     segments.Lines(5, 95))
+    self.assertEqual(['line 99\n'], segments.Lines(99, 200))
+    self.assertRaises(IndexError, segments.Line, 100)
+    # Only the cache's worth of segments is kept decompressed.
+    self.assertEqual(2, len(segments._cache))
+
+  def testCompressed(self):
+    segments = launcher.LineSegments()
+    for i in range(10000):
+      segments.Append('INFO dev_appserver.py:2906] "GET /poll HTTP/1.1" 200\n')
+    self.assertTrue(segments.MemoryBytes() * 10 < 10000 * 54)
+    self.assertEqual(segments.Line(5000), segments.Line(9999))
+
+  def testDropBefore(self):
+    segments = self.segments
+    end = segments.OldestSegmentEnd()
+    before = segments.MemoryBytes()
+    segments.DropBefore(end - 1)
+    self.assertEqual(before, segments.MemoryBytes())
+    self.assertRaises(IndexError, segments.Line, end - 2)
+    self.assertEqual(['line %02d\n' % (end - 1)], segments.Lines(0, end))
+    segments.DropBefore(end)
+    self.assertTrue(segments.MemoryBytes() < before)
+    self.assertNotEqual(end, segments.OldestSegmentEnd())
+    segments.DropBefore(99)
+    self.assertEqual(None, segments.OldestSegmentEnd())
+    self.assertEqual(['line 99\n'], segments.Lines(0, 100))
+    segments.DropBefore(100)
+    self.assertEqual(0, segments.MemoryBytes())
+    segments.Append('more\n')
+    self.assertEqual('more\n', segments.Line(100))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Bounded in-memory store for the output of a project."""
+
+
+import array
+import time
+
+import line_splitter
+import log_dedup
+import log_parser
+import log_segments
+
+
+class LogStore(object):
+  """A bounded store of output lines (model in MVC).
+
+  The store is capped both by line count and by the memory its text
+  takes.  When new output would exceed either cap, the oldest lines
+  are evicted.  Lines are numbered from the first line ever added, so
+  a line keeps its number after older lines have been dropped.
+
+  The text is kept in a LineSegments: all but the newest segment are
+  zlib-compressed, so the byte cap holds several times more output
+  than it would as plain text.  Evicting to make memory frees a whole
+  compressed segment at a time.
+
+  Text which doesn't end in a newline is held as a partial line until
+  the rest of it arrives.  Partial lines are never evicted.
+
+  Each line is parsed once, as it is added, for its severity,
+  timestamp and source (see log_parser.LineParser).  These are kept in
+  parallel rings next to the text, so lines can be filtered by level
+  without looking at the text again.
+
+  A line can stand for a run of repeats of itself (see
+  log_dedup.RepeatFolder and AddRepeats()).  The count is kept in
+  another parallel ring, and lines are returned with it shown.
+
+  The time each line arrived is kept too, so the output of several
+  stores can be merged in order (see log_merge.LogMerger).
+
+  The rings start small and double as lines arrive, up to max_lines,
+  so a store which never holds much output never takes much memory.
+  """
+
+  DEFAULT_MAX_LINES = 250000
+  DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+  # Number of lines the rings have room for at first.
+  _INITIAL_CAPACITY = 1024
+
+  def __init__(self, max_lines=DEFAULT_MAX_LINES, max_bytes=DEFAULT_MAX_BYTES):
+    """Create a new LogStore.
+
+    Args:
+      max_lines: the maximum number of complete lines kept.
+      max_bytes: the maximum memory, in bytes, the text may take.
+    """
+    # self._segments: the text of the lines held
+    # self._capacity: number of lines the rings have room for
+    # self._first: index in the rings of the oldest line
+    # self._count: number of lines held
+    # self._splitter: splits text into lines; holds any partial line
+    # self._lengths: the length of each line
+    # self._levels, self._times, self._sources: the parsed severity,
+    #   timestamp and source of each line
+    # self._repeats: how many times in a row each line was seen
+    # self._arrivals: when each line was added, in seconds since the epoch
+    self._max_lines = max(1, int(max_lines))
+    self._max_bytes = max(1, int(max_bytes))
+    self._segments = log_segments.LineSegments()
+    self._capacity = min(self._max_lines, self._INITIAL_CAPACITY)
+    self._lengths = array.array('I', [0]) * self._capacity
+    self._levels = array.array('b', [0]) * self._capacity
+    self._times = array.array('d', [0.0]) * self._capacity
+    self._sources = [None] * self._capacity
+    self._repeats = array.array('L', [1]) * self._capacity
+    self._arrivals = array.array('d', [0.0]) * self._capacity
+    self._parser = log_parser.LineParser()
+    self._first = 0
+    self._count = 0
+    self._splitter = line_splitter.LineSplitter()
+    self.byte_count = 0
+    self.dropped_lines = 0
+
+  def AppendText(self, text, arrival_time=None):
+    """Add text to the store, evicting old lines if needed.
+
+    Args:
+      text: a string of output; may hold many lines, or part of one.
+      arrival_time: when the text arrived; defaults to now.
+    Returns:
+      The number of lines evicted to make room.
+    """
+    if not text:
+      return 0
+    if arrival_time is None:
+      arrival_time = time.time()
+    self.byte_count += len(text)
+    lines = self._splitter.Split(text)
+    dropped_before = self.dropped_lines
+    for line in lines:
+      line += '\n'
+      self._Push(line, self._parser.Parse(line), arrival_time)
+    self._EvictToFit()
+    return self.dropped_lines - dropped_before
+
+  def AppendParsedLines(self, entries):
+    """Add complete lines which have already been parsed.
+
+    Used to copy lines from other stores.  The store must not be
+    holding a partial line.
+
+    Args:
+      entries: a list of (line, level, timestamp, source, arrival time)
+        tuples, as from log_merge.LogMerger.Update().  Each line must
+        end in a newline.
+    Returns:
+      The number of lines evicted to make room.
+    """
+    dropped_before = self.dropped_lines
+    for (line, level, timestamp, source, arrival_time) in entries:
+      self.byte_count += len(line)
+      self._Push(line, (level, timestamp, source), arrival_time)
+    self._EvictToFit()
+    return self.dropped_lines - dropped_before
+
+  def _Push(self, line, parsed, arrival_time):
+    """Add a complete line after the newest.
+
+    Args:
+      line: the line, ending in a newline.
+      parsed: its (level, timestamp, source), from log_parser.LineParser.
+      arrival_time: when it arrived.
+    """
+    if self._count == self._capacity:
+      if self._capacity < self._max_lines:
+        self._Grow()
+      else:
+        self._Evict()
+    slot = (self._first + self._count) % self._capacity
+    self._segments.Append(line)
+    self._lengths[slot] = len(line)
+    (self._levels[slot], self._times[slot], self._sources[slot]) = parsed
+    self._repeats[slot] = 1
+    self._arrivals[slot] = arrival_time
+    self._count += 1
+
+  def _Grow(self):
+    """Double the room in the rings, up to max_lines.
+
+    The rings are unrolled, so afterwards the oldest line is at index 0.
+    """
+    capacity = min(self._max_lines, self._capacity * 2)
+    extra = capacity - self._capacity
+    first = self._first
+    for (name, fill) in (('_lengths', 0), ('_levels', 0), ('_times', 0.0),
+                         ('_sources', None), ('_repeats', 1),
+                         ('_arrivals', 0.0)):
+      ring = getattr(self, name)
+      if isinstance(ring, list):
+        padding = [fill] * extra
+      else:
+        padding = array.array(ring.typecode, [fill]) * extra
+      setattr(self, name, ring[first:] + ring[:first] + padding)
+    self._first = 0
+    self._capacity = capacity
+
+  def _EvictToFit(self):
+    """Evict old lines until the text fits in the memory cap."""
+    while self.MemoryBytes() > self._max_bytes and self._count:
+      end = self._segments.OldestSegmentEnd()
+      if end is None:
+        self._Evict()
+      else:
+        while self.dropped_lines < end:
+          self._Evict()
+
+  def AddRepeats(self, count):
+    """Count the newest complete line as seen count more times.
+
+    Args:
+      count: the number of repeats folded out of the output.
+    """
+    if self._count:
+      slot = (self._first + self._count - 1) % self._capacity
+      self._repeats[slot] += count
+
+  def _Evict(self):
+    """Drop the oldest line."""
+    self.byte_count -= self._lengths[self._first]
+    self._sources[self._first] = None
+    self._first = (self._first + 1) % self._capacity
+    self._count -= 1
+    self.dropped_lines += 1
+    self._segments.DropBefore(self.dropped_lines)
+
+  def MemoryBytes(self):
+    """Return about how much memory the text held takes, in bytes."""
+    return (self._segments.MemoryBytes() +
+            len(self._splitter.PartialLine()))
+
+  def LineCount(self):
+    """Return the number of complete lines held."""
+    return self._count
+
+  def FirstLineNumber(self):
+    """Return the number of the oldest line held."""
+    return self.dropped_lines
+
+  def EndLineNumber(self):
+    """Return the number one past the newest complete line held."""
+    return self.dropped_lines + self._count
+
+  def Lines(self, start=None, end=None):
+    """Return a list of the held lines numbered [start, end).
+
+    Args:
+      start: first line number; defaults to FirstLineNumber().
+      end: one past the last line number; defaults to EndLineNumber().
+        Both are clipped to the lines actually held.
+    """
+    first = self.FirstLineNumber()
+    if start is None or start < first:
+      start = first
+    if end is None or end > self.EndLineNumber():
+      end = self.EndLineNumber()
+    lines = self._segments.Lines(start, end)
+    repeats = self._repeats
+    slot = (self._first + start - first) % self._capacity
+    for index in xrange(len(lines)):
+      if repeats[slot] > 1:
+        lines[index] = log_dedup.RepeatFolder.Render(lines[index],
+                                                     repeats[slot])
+      slot = (slot + 1) % self._capacity
+    return lines
+
+  def Line(self, number):
+    """Return one held line.
+
+    Raises:
+      IndexError: the line isn't held.
+    """
+    repeats = self._repeats[self._Slot(number)]
+    return log_dedup.RepeatFolder.Render(self._segments.Line(number),
+                                         repeats)
+
+  def _Slot(self, number):
+    """Return the ring index of a held line.
+
+    Raises:
+      IndexError: the line isn't held.
+    """
+    if number < self.FirstLineNumber() or number >= self.EndLineNumber():
+      raise IndexError('line %d not in store' % number)
+    return (self._first + number - self.FirstLineNumber()) % self._capacity
+
+  def Repeats(self, number):
+    """Return how many times in a row a held line was seen."""
+    return self._repeats[self._Slot(number)]
+
+  def Level(self, number):
+    """Return the severity of a held line (see log_parser.LineParser)."""
+    return self._levels[self._Slot(number)]
+
+  def Timestamp(self, number):
+    """Return the timestamp of a held line (0.0 if unknown)."""
+    return self._times[self._Slot(number)]
+
+  def Source(self, number):
+    """Return the source ('file.py:123') of a held line, or None."""
+    return self._sources[self._Slot(number)]
+
+  def ArrivalTime(self, number):
+    """Return when a held line was added, in seconds since the epoch."""
+    return self._arrivals[self._Slot(number)]
+
+  def LineNumbersAtLevel(self, min_level, start=None):
+    """Return the numbers of held lines at or above a severity.
+
+    Only the level ring is scanned, in at most two slices.
+
+    Args:
+      min_level: the lowest level wanted, such as logging.WARNING.
+      start: first line number to consider; defaults to FirstLineNumber().
+    Returns:
+      A sorted list of line numbers.
+    """
+    first = self.FirstLineNumber()
+    if start is None or start < first:
+      start = first
+    offset = start - first
+    count = self._count - offset
+    if count <= 0:
+      return []
+    capacity = self._capacity
+    begin = (self._first + offset) % capacity
+    end = begin + count
+    levels = self._levels
+    if end <= capacity:
+      slices = ((begin, end, start),)
+    else:
+      split = capacity - begin
+      slices = ((begin, capacity, start),
+                (0, end - capacity, start + split))
+    numbers = []
+    for (slice_start, slice_end, number) in slices:
+      numbers.extend([number + i for (i, level)
+                      in enumerate(levels[slice_start:slice_end])
+                      if level >= min_level])
+    return numbers
+
+  def PartialLine(self):
+    """Return the text after the last newline (possibly '')."""
+    return self._splitter.PartialLine()
+
+  def GetText(self):
+    """Return all held text, including a trailing partial line."""
+    return ''.join(self.Lines()) + self._splitter.PartialLine()
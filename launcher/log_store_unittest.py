@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for log_store.py"""
+
+import logging
+import unittest
+import launcher
+
+
+class LogStoreTest(unittest.TestCase):
+
+  def testBasics(self):
+    store = launcher.LogStore()
+    self.assertEqual('', store.GetText())
+    self.assertEqual(0, store.AppendText('hello\nwor'))
+    self.assertEqual(['hello\n'], store.Lines())
+    self.assertEqual('wor', store.PartialLine())
+    store.AppendText('ld\n')
+    self.assertEqual(['hello\n', 'world\n'], store.Lines())
+    self.assertEqual('hello\nworld\n', store.GetText())
+    self.assertEqual(12, store.byte_count)
+    self.assertEqual(0, store.AppendText(''))
+
+  def testLineCap(self):
+    store = launcher.LogStore(max_lines=3)
+    dropped = 0
+    for i in range(10):
+      dropped += store.AppendText('%d\n' % i)
+    self.assertEqual(7, dropped)
+    self.assertEqual(7, store.dropped_lines)
+    self.assertEqual(3, store.LineCount())
+    self.assertEqual(['7\n', '8\n', '9\n'], store.Lines())
+    self.assertEqual(7, store.FirstLineNumber())
+    self.assertEqual(10, store.EndLineNumber())
+    self.assertEqual(['8\n'], store.Lines(8, 9))
+    self.assertEqual(['9\n'], store.Lines(9, 100))
+    self.assertEqual(['7\n'], store.Lines(0, 8))
+    self.assertEqual(6, store.byte_count)
+
+  def testRingsGrow(self):
+    """The rings start small and grow, even once the oldest has wrapped."""
+    store = launcher.LogStore(max_lines=5000, max_bytes=1024 * 1024)
+    self.assertEqual(launcher.LogStore._INITIAL_CAPACITY,
+                     len(store._lengths))
+    for i in range(3000):
+      store.AppendText('INFO     2009-04-08 23:09:25,456 a.py:%d] %d\n' %
+                       (i, i))
+    self.assertEqual(4096, len(store._lengths))
+    for i in range(3000, 12000):
+      store.AppendText('ERROR    2009-04-08 23:09:25,456 a.py:%d] %d\n' %
+                       (i, i))
+    self.assertEqual(5000, len(store._lengths))
+    self.assertEqual(5000, store.LineCount())
+    self.assertEqual(7000, store.FirstLineNumber())
+    self.assertTrue(store.Line(7000).endswith('] 7000\n'))
+    self.assertEqual('a.py:11999', store.Source(11999))
+    self.assertEqual(range(7000, 12000),
+                     store.LineNumbersAtLevel(logging.ERROR))
+
+  def testByteCap(self):
+    store = launcher.LogStore(max_lines=1000, max_bytes=10)
+    self.assertEqual(0, store.AppendText('aaaa\nbbbb\n'))
+    self.assertEqual(1, store.AppendText('cccc\n'))
+    self.assertEqual(['bbbb\n', 'cccc\n'], store.Lines())
+    # A chunk bigger than the whole cap keeps only what fits.
+    self.assertEqual(3, store.AppendText('dddd\neeee\nffff\n'))
+    self.assertEqual('eeee\nffff\n', store.GetText())
+    self.assertTrue(store.byte_count <= 10)
+
+
+  def testLevels(self):
+    store = launcher.LogStore(max_lines=4)
+    store.AppendText('starting\n'
+                     'INFO     2009-04-08 23:09:25,456 a.py:1] hi\n'
+                     'ERROR    2009-04-08 23:09:26,000 b.py:2] bad\n'
+                     '  File "x.py"\n')
+    self.assertEqual(0, store.Level(0))
+    self.assertEqual(logging.ERROR, store.Level(3))
+    self.assertEqual('b.py:2', store.Source(2))
+    self.assertEqual(None, store.Source(3))
+    self.assertEqual(store.Timestamp(2), store.Timestamp(3))
+    self.assertEqual([2, 3], store.LineNumbersAtLevel(logging.WARNING))
+    self.assertEqual([3], store.LineNumbersAtLevel(logging.WARNING, 3))
+    # Wrap around the ring.
+    store.AppendText('WARNING  2009-04-08 23:09:27,000 c.py:3] hmm\n'
+                     'INFO     2009-04-08 23:09:28,000 a.py:1] ok\n')
+    self.assertEqual([2, 3, 4], store.LineNumbersAtLevel(logging.WARNING))
+    self.assertEqual([2, 3, 4, 5], store.LineNumbersAtLevel(logging.INFO))
+    self.assertRaises(IndexError, store.Level, 1)
+    self.assertEqual('b.py:2', store.Source(2))
+
+  def testCompressedSegments(self):
+    store = launcher.LogStore(max_bytes=128 * 1024)
+    line = 'INFO     2009-04-08 23:09:25,456 a.py:1] "GET /poll" %06d\n'
+    store.AppendText(''.join([line % i for i in range(10000)]))
+    # Much more text than the cap is held, since most is compressed.
+    self.assertEqual(10000, store.LineCount())
+    self.assertTrue(store.byte_count > 4 * 128 * 1024)
+    self.assertTrue(store.MemoryBytes() <= 128 * 1024)
+    self.assertEqual(line % 10, store.Line(10))
+    self.assertEqual([line % 9999], store.Lines(9999))
+    # Once over the cap, a whole old segment is dropped.
+    for i in range(10000, 80000, 1000):
+      store.AppendText(''.join([line % n for n in range(i, i + 1000)]))
+    self.assertTrue(store.MemoryBytes() <= 128 * 1024)
+    first = store.FirstLineNumber()
+    self.assertTrue(first > 0)
+    self.assertEqual(line % first, store.Line(first))
+    self.assertEqual(store.byte_count, len(store.GetText()))
+
+  def testArrivalTimes(self):
+    store = launcher.LogStore()
+    store.AppendText('a\nb', arrival_time=10.0)
+    store.AppendText('\nc\n', arrival_time=11.0)
+    self.assertEqual(10.0, store.ArrivalTime(0))
+    self.assertEqual(11.0, store.ArrivalTime(1))
+    self.assertEqual(11.0, store.ArrivalTime(2))
+    store.AppendText('d\n')
+    self.assertTrue(store.ArrivalTime(3) > 11.0)
+
+  def testRepeats(self):
+    store = launcher.LogStore(max_lines=2)
+    store.AddRepeats(5)  # nothing to repeat yet
+    store.AppendText('poll\n')
+    store.AddRepeats(2)
+    self.assertEqual(3, store.Repeats(0))
+    self.assertEqual('poll (x3)\n', store.Line(0))
+    store.AppendText('a\nb\n')
+    self.assertEqual(['a\n', 'b\n'], store.Lines())
+    self.assertEqual(1, store.Repeats(1))
+
+
+if __name__ == '__main__':
+  unittest.main()
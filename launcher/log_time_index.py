@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Sparse index from the time output arrived to its line numbers."""
+
+
+import array
+import bisect
+import datetime
+import re
+import time
+
+
+class TimeIndex(object):
+  """A sparse map from arrival time to line number.
+
+  Rather than a time for every line, we keep a sample (line number,
+  arrival time) whenever SAMPLE_SECONDS have passed or SAMPLE_LINES
+  lines have arrived since the last one, in two compact arrays.  A
+  sample is 12 bytes, so a day of steady output costs about a
+  megabyte however many lines there are.  Finding the lines which
+  arrived at some time is a binary search; the answer may include the
+  lines of one sample interval too many, but never misses one.
+
+  Lines must be added in order.  Arrival times which go backwards (the
+  clock was set back) are taken as the latest time added before.
+  """
+
+  SAMPLE_SECONDS = 1.0
+  SAMPLE_LINES = 1000
+
+  def __init__(self):
+    # self._numbers: the line number of each sample
+    # self._times: the arrival time of each sample
+    # self._end: one past the number of the last line added
+    # self._last_time: the latest arrival time added
+    self._numbers = array.array('L')
+    self._times = array.array('d')
+    self._end = 0
+    self._last_time = None
+
+  def Add(self, number, when):
+    """Note that a line arrived at some time.
+
+    Args:
+      number: the line's number; no less than EndLineNumber().
+      when: when it arrived, in seconds since the epoch.
+    """
+    self._end = number + 1
+    if self._numbers:
+      when = max(when, self._last_time)
+    self._last_time = when
+    if self._numbers and (when - self._times[-1] < self.SAMPLE_SECONDS and
+                          number - self._numbers[-1] < self.SAMPLE_LINES):
+      return
+    self._numbers.append(number)
+    self._times.append(when)
+
+  def EndLineNumber(self):
+    """Return one past the number of the last line added."""
+    return self._end
+
+  def SampleCount(self):
+    """Return the number of samples kept."""
+    return len(self._numbers)
+
+  def LineForTime(self, when):
+    """Return the number of the first line which may have arrived at when.
+
+    No line before it arrived at or after when.
+
+    Args:
+      when: a time, in seconds since the epoch.
+    Returns:
+      A line number, or None if no lines have been added.
+    """
+    if not self._numbers:
+      return None
+    if when > self._last_time:
+      return self._end
+    index = bisect.bisect_left(self._times, when)
+    if index == 0:
+      return self._numbers[0]
+    return self._numbers[index - 1] + 1
+
+  def LineRange(self, start_time, end_time):
+    """Return the line numbers [start, end) of lines arriving in a range.
+
+    Every line which arrived at or after start_time and at or before
+    end_time is in the range.
+
+    Args:
+      start_time, end_time: times, in seconds since the epoch.
+    Returns:
+      A (start, end) tuple; start == end if there are no lines.
+    """
+    if not self._numbers:
+      return (0, 0)
+    start = self.LineForTime(start_time)
+    index = bisect.bisect_right(self._times, end_time)
+    if index < len(self._numbers):
+      end = self._numbers[index]
+    else:
+      end = self._end
+    return (start, max(start, end))
+
+
+_CLOCK_FORMATS = ('%H:%M:%S', '%H:%M')
+_DATE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M')
+
+# A range of times, such as '10:00-10:05' or '2009-04-08 10:00 to 10:05'.
+# The end is matched first, so the dashes of a date aren't taken as
+# the separator.
+_RANGE_RE = re.compile(r'^(.+?)\s*(?:-|\bto\b)\s*'
+                       r'((?:\d{4}-\d{1,2}-\d{1,2}\s+)?'
+                       r'\d{1,2}:\d{2}(?::\d{2})?)$')
+
+
+def ParseTime(text, now=None):
+  """Parse a local time such as '14:05', '14:05:30' or '2009-04-08 14:05'.
+
+  A time without a date is the latest such time no later than now.
+
+  Args:
+    text: the string to parse.
+    now: the current time, in seconds since the epoch; for unittests.
+  Returns:
+    The time, in seconds since the epoch.
+  Raises:
+    ValueError: text isn't a time in one of those forms.
+  """
+  if now is None:
+    now = time.time()
+  text = text.strip()
+  for time_format in _DATE_FORMATS:
+    try:
+      return time.mktime(time.strptime(text, time_format))
+    except ValueError:
+      pass
+  for time_format in _CLOCK_FORMATS:
+    try:
+      parsed = time.strptime(text, time_format)
+    except ValueError:
+      continue
+    clock = datetime.time(parsed.tm_hour, parsed.tm_min, parsed.tm_sec)
+    today = datetime.date.fromtimestamp(now)
+    when = time.mktime(datetime.datetime.combine(today, clock).timetuple())
+    if when > now:
+      yesterday = today - datetime.timedelta(days=1)
+      when = time.mktime(
+          datetime.datetime.combine(yesterday, clock).timetuple())
+    return when
+  raise ValueError('not a time: %s' % text)
+
+
+def ParseTimeRange(text, now=None):
+  """Parse a time, or a range of times such as '14:05-14:10'.
+
+  Args:
+    text: the string to parse; see ParseTime() for the forms of time.
+    now: the current time, in seconds since the epoch; for unittests.
+  Returns:
+    A (start, end) tuple of times in seconds since the epoch; end is
+    None if text is a single time.
+  Raises:
+    ValueError: text isn't a time or a range of them, or the range
+      ends before it starts.
+  """
+  match = _RANGE_RE.match(text.strip())
+  if not match:
+    return (ParseTime(text, now), None)
+  start = ParseTime(match.group(1), now)
+  end = ParseTime(match.group(2), now)
+  if end < start:
+    raise ValueError('%s ends before it starts' % text)
+  return (start, end)
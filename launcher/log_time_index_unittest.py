@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for log_time_index.py"""
+
+import time
+import unittest
+import launcher
+
+
+class TimeIndexTest(unittest.TestCase):
+
+  def setUp(self):
+    # Ten lines a second for a minute, starting at t=1000.
+    self.index = launcher.TimeIndex()
+    for number in range(600):
+      self.index.Add(number, 1000 + number / 10.0)
+
+  def testSparse(self):
+    self.assertEqual(60, self.index.SampleCount())
+    self.assertEqual(600, self.index.EndLineNumber())
+    index = launcher.TimeIndex()
+    for number in range(2500):
+      index.Add(number, 1000.0)
+    self.assertEqual(3, index.SampleCount())
+
+  def testLineForTime(self):
+    self.assertEqual(None, launcher.TimeIndex().LineForTime(1000))
+    self.assertEqual(0, self.index.LineForTime(0))
+    self.assertEqual(0, self.index.LineForTime(1000))
+    self.assertEqual(91, self.index.LineForTime(1010))
+    self.assertEqual(151, self.index.LineForTime(1015.5))
+    self.assertEqual(591, self.index.LineForTime(1059.9))
+    self.assertEqual(600, self.index.LineForTime(2000))
+
+  def testLineRange(self):
+    self.assertEqual((0, 0), launcher.TimeIndex().LineRange(0, 1))
+    (start, end) = self.index.LineRange(1010, 1020)
+    # All of 10.0 .. 20.0 seconds, plus at most a sample interval.
+    self.assertTrue(start <= 100 and 201 <= end)
+    self.assertTrue(start >= 90 and end <= 210)
+    self.assertEqual((0, 600), self.index.LineRange(0, 5000))
+    self.assertEqual((600, 600), self.index.LineRange(3000, 4000))
+
+  def testClockGoesBack(self):
+    index = launcher.TimeIndex()
+    index.Add(0, 1000)
+    index.Add(1, 900)
+    self.assertEqual(0, index.LineForTime(1000))
+    self.assertEqual((0, 2), index.LineRange(1000, 1000))
+
+
+class ParseTimeTest(unittest.TestCase):
+
+  def setUp(self):
+    self.now = time.mktime((2009, 4, 8, 12, 0, 0, 0, 0, -1))
+
+  def _Time(self, day, hour, minute, second=0):
+    return time.mktime((2009, 4, day, hour, minute, second, 0, 0, -1))
+
+  def testParseTime(self):
+    self.assertEqual(self._Time(8, 11, 30),
+                     launcher.ParseTime(' 11:30 ', self.now))
+    self.assertEqual(self._Time(8, 11, 30, 15),
+                     launcher.ParseTime('11:30:15', self.now))
+    # A time later than now must have been yesterday.
+    self.assertEqual(self._Time(7, 13, 0),
+                     launcher.ParseTime('13:00', self.now))
+    self.assertEqual(self._Time(2, 13, 0),
+                     launcher.ParseTime('2009-04-02 13:00', self.now))
+    for text in ('', 'noon', '25:00', '11:30-'):
+      self.assertRaises(ValueError, launcher.ParseTime, text, self.now)
+
+  def testParseTimeRange(self):
+    self.assertEqual((self._Time(8, 10, 0), None),
+                     launcher.ParseTimeRange('10:00', self.now))
+    self.assertEqual((self._Time(2, 10, 0), None),
+                     launcher.ParseTimeRange('2009-04-02 10:00', self.now))
+    self.assertEqual((self._Time(8, 10, 0), self._Time(8, 10, 5)),
+                     launcher.ParseTimeRange('10:00-10:05', self.now))
+    self.assertEqual((self._Time(2, 10, 0), self._Time(8, 10, 5)),
+                     launcher.ParseTimeRange('2009-04-02 10:00 to 10:05',
+                                             self.now))
+    self.assertRaises(ValueError, launcher.ParseTimeRange, '10:05 - 10:00',
+                      self.now)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Virtual list view of log lines."""
+
+
+import wx
+
+
+class LogView(wx.ListCtrl):
+  """A list control which shows the lines of a line provider (view in MVC).
+
+  A wx.TextCtrl holds (and re-lays out) all of its text, so appending
+  to a big one gets slow.  A LogView is a virtual list: it holds no
+  text at all, and asks its provider for just the rows on screen when
+  it paints.  Appending costs the same no matter how much output the
+  provider holds.
+
+  A line provider is any object with these methods (LogStore and
+  LogJournal both qualify):
+    FirstLineNumber(): the number of the first line held
+    EndLineNumber(): one past the number of the last complete line held
+    Lines(start, end): a list of the lines numbered [start, end)
+    PartialLine(): the text after the last newline (possibly '')
+  The partial line, if any, is shown as the last row.
+  """
+
+  def __init__(self, parent, provider):
+    """Create a new LogView.
+
+    Args:
+      parent: our parent wx.Window.
+      provider: a line provider, as described in the class docstring.
+    """
+    style = (wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_NO_HEADER |
+             wx.BORDER_NONE)
+    super(LogView, self).__init__(parent, -1, style=style)
+    self._provider = provider
+    self.SetFont(wx.Font(10,
+                         wx.FONTFAMILY_MODERN,
+                         wx.FONTSTYLE_NORMAL,
+                         wx.FONTWEIGHT_NORMAL))
+    self.InsertColumn(0, '')
+    self.Bind(wx.EVT_SIZE, self.OnSize)
+    self.Bind(wx.EVT_KEY_DOWN, self.OnKeyDown)
+    self.ProviderChanged()
+
+  def SetProvider(self, provider):
+    """Show the lines of a different provider.
+
+    Args:
+      provider: a line provider.
+    """
+    self._provider = provider
+    self.ProviderChanged()
+    self.ScrollToEnd()
+
+  def RowCount(self):
+    """Return the number of rows our provider has for us."""
+    provider = self._provider
+    count = provider.EndLineNumber() - provider.FirstLineNumber()
+    if provider.PartialLine():
+      count += 1
+    return count
+
+  def ProviderChanged(self):
+    """Tell the view its provider has new (or fewer) lines.
+
+    Only the row count and the visible rows are updated.  If the last
+    row was on screen we keep following the output.
+    """
+    old_count = self.GetItemCount()
+    following = (self.GetTopItem() + self.GetCountPerPage() >= old_count)
+    count = self.RowCount()
+    if count != old_count:
+      self.SetItemCount(count)
+    if following:
+      self.ScrollToEnd()
+    self._RefreshVisibleRows()
+
+  def ScrollToEnd(self):
+    """Scroll so the last row is visible."""
+    count = self.GetItemCount()
+    if count:
+      self.EnsureVisible(count - 1)
+
+  def SelectRow(self, row):
+    """Select just one row, and scroll it into view.
+
+    Args:
+      row: the row number, counting from 0.
+    """
+    item = self.GetFirstSelected()
+    while item >= 0:
+      self.Select(item, False)
+      item = self.GetNextSelected(item)
+    if 0 <= row < self.GetItemCount():
+      self.Select(row)
+      self.Focus(row)
+      self.EnsureVisible(row)
+
+  def _RefreshVisibleRows(self):
+    """Repaint the rows on screen, since their text may have changed."""
+    count = self.GetItemCount()
+    if not count:
+      return
+    top = self.GetTopItem()
+    bottom = min(count, top + self.GetCountPerPage() + 1) - 1
+    if bottom >= top:
+      self.RefreshItems(top, bottom)
+
+  def RowText(self, row):
+    """Return the text of a row, without its newline.
+
+    Args:
+      row: the row number, counting from 0.
+    """
+    provider = self._provider
+    number = provider.FirstLineNumber() + row
+    if number >= provider.EndLineNumber():
+      return provider.PartialLine()
+    lines = provider.Lines(number, number + 1)
+    if not lines:
+      return ''
+    return lines[0].rstrip('\r\n')
+
+  def OnGetItemText(self, item, column):
+    """Return the text for one visible row.  Called by wx when painting."""
+    return self.RowText(item)
+
+  def GetText(self):
+    """Return all the text our provider holds.  For unittest convenience."""
+    provider = self._provider
+    return (''.join(provider.Lines(provider.FirstLineNumber(),
+                                   provider.EndLineNumber())) +
+            provider.PartialLine())
+
+  def GetSelectedText(self):
+    """Return the text of the selected rows, one line each."""
+    lines = []
+    item = self.GetFirstSelected()
+    while item >= 0:
+      lines.append(self.RowText(item) + '\n')
+      item = self.GetNextSelected(item)
+    return ''.join(lines)
+
+  def OnSize(self, event):
+    """Keep our single column as wide as we are.  Called directly from UI."""
+    self.SetColumnWidth(0, max(self.GetClientSize()[0], 2000))
+    event.Skip()
+
+  def OnKeyDown(self, event):
+    """Copy the selected rows on Ctrl-C.  Called directly from UI."""
+    if event.GetKeyCode() == ord('C') and event.CmdDown():
+      if wx.TheClipboard.Open():
+        try:
+          wx.TheClipboard.SetData(wx.TextDataObject(self.GetSelectedText()))
+        finally:
+          wx.TheClipboard.Close()
+    else:
+      event.Skip()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for log_view.py"""
+
+import unittest
+import wx
+import launcher
+
+
+class LogViewTest(unittest.TestCase):
+
+  def setUp(self):
+    # Must always create a wx.App first
+    self.app = wx.PySimpleApp()
+    self.frame = wx.Frame(None, -1)
+
+  def tearDown(self):
+    self.frame.Destroy()
+
+  def testRows(self):
+    store = launcher.LogStore(max_lines=3)
+    view = launcher.LogView(self.frame, store)
+    self.assertEqual(0, view.GetItemCount())
+    store.AppendText('a\nb\r\nc')
+    view.ProviderChanged()
+    self.assertEqual(3, view.GetItemCount())
+    self.assertEqual(['a', 'b', 'c'], [view.RowText(n) for n in range(3)])
+    self.assertEqual('a\nb\r\nc', view.GetText())
+    # Rows follow the provider as old lines are dropped.
+    store.AppendText('\nd\ne\n')
+    view.ProviderChanged()
+    self.assertEqual(3, view.GetItemCount())
+    self.assertEqual(['c', 'd', 'e'], [view.RowText(n) for n in range(3)])
+
+  def testSetProvider(self):
+    store = launcher.LogStore()
+    store.AppendText('one\n')
+    view = launcher.LogView(self.frame, store)
+    other = launcher.LogStore()
+    other.AppendText('two\nthree\n')
+    view.SetProvider(other)
+    self.assertEqual(2, view.GetItemCount())
+    self.assertEqual('two\nthree\n', view.GetText())
+
+
+if __name__ == '__main__':
+  unittest.main()
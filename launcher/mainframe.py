@@ -17,6 +17,7 @@
 
 import os
 import sys
+import time
 import wx
 import wx.lib.buttons
 from launcher import project
@@ -51,6 +52,9 @@ class MainFrame(main_frame.GenMainFrame):
   # Size of the +/- buttons in the status bar.
   STATUS_BAR_BUTTON_SIZE = 24
 
+  # Least time (in seconds) between desktop notifications of alerts.
+  ALERT_NOTIFICATION_INTERVAL = 10
+
   # Minimum size of the window.
   WINDOW_MIN_SIZE = (500, 200)
 
@@ -77,10 +81,13 @@ class MainFrame(main_frame.GenMainFrame):
     # Housekeeping
     self._icon_index_state_map = {}  # Maps project states to image array index.
     self._status_bar_buttons = []
+    self._alert_count = 0
+    self._last_alert_notification = 0
 
     self._LoadImages()
     self._RestoreWindowPosition()
     self._BuildDemoMenu()
+    self._AddControlMenuItems()
     self._SetupStatusBar()
     self._AdjustEnabledStatesBasedOnSelection()
 
@@ -173,6 +180,30 @@ class MainFrame(main_frame.GenMainFrame):
     menu.InsertMenu(pos, -1, 'Demos', demo_menu)
     menu.DeleteItem(old_demo_item)
 
+  def _AddControlMenuItems(self):
+    """Add the Control menu items which aren't in MainFrame.wxg.
+
+    They go just after the Log Console item.
+    """
+    logs_item = self.GetMenuBar().FindItemById(main_frame.LOGS_MENU)
+    if not logs_item:
+      # We get here in a unit test -- menubar not realized
+      return
+    menu = logs_item.GetMenu()
+    for pos in range(menu.GetMenuItemCount()):
+      if logs_item.Id == menu.FindItemByPosition(pos).Id:
+        break
+    for (label, handler) in (('Merged Log Console\tCtrl+Shift+M',
+                              self.OnMergedLogs),
+                             ('Request Stats\tCtrl+Shift+L', self.OnStats),
+                             ('Errors\tCtrl+Shift+X', self.OnErrors),
+                             ('Metrics\tCtrl+Shift+T', self.OnMetrics),
+                             ('Crash Reports\tCtrl+Shift+K',
+                              self.OnCrashReports)):
+      pos += 1
+      item = menu.Insert(pos, -1, label)
+      self.Bind(wx.EVT_MENU, handler, item)
+
   def _CreateDemoByNameFunction(self, path):
     """Create and return a DemoByName function.
 
@@ -210,8 +241,8 @@ class MainFrame(main_frame.GenMainFrame):
     """Create the window's status bar and populate it with the +/- buttons."""
     # Creating the status bar in the glade-generated superclass code makes
     # embedded objects (like buttons) ignore mouse clicks on the Mac.
-    self._statusbar = self.CreateStatusBar(2, 0)
-    self.SetStatusWidths([self.STATUS_BAR_BUTTON_SIZE] * 2)
+    self._statusbar = self.CreateStatusBar(3, 0)
+    self.SetStatusWidths([self.STATUS_BAR_BUTTON_SIZE] * 2 + [-1])
     self._AddStatusBarButton(main_frame.PLUS_BUTTON, '+', self.OnAddNewApp)
     self._AddStatusBarButton(main_frame.MINUS_BUTTON, '-', self.OnRemoveApp)
     self._OnStatusbarSize(None)
@@ -225,6 +256,36 @@ class MainFrame(main_frame.GenMainFrame):
     if (event):
       event.Skip()
 
+  def ShowAlert(self, project, pattern, line, count=1):
+    """Tell the user a project printed a line matching an alert pattern.
+
+    The alert goes in the status bar (with a running count), and, if
+    wx can do it, in a desktop notification; never in a dialog.
+    Notifications are sent at most every ALERT_NOTIFICATION_INTERVAL.
+
+    Args:
+      project: the Project which printed the line.
+      pattern: the alert pattern which matched.
+      line: the line of output.
+      count: the number of lines which matched.
+    """
+    self._alert_count += count
+    self.SetStatusText('%d alerts.  Latest: %s in %s' %
+                       (self._alert_count, pattern, project.name), 2)
+    notification_class = getattr(wx, 'NotificationMessage', None)
+    now = time.time()
+    if (notification_class and now - self._last_alert_notification >=
+        self.ALERT_NOTIFICATION_INTERVAL):
+      self._last_alert_notification = now
+      notification = notification_class('%s: %s' % (project.name, pattern),
+                                        line.strip()[:200], self)
+      notification.Show()
+
+  def ClearAlerts(self):
+    """Clear the alert count from the status bar."""
+    self._alert_count = 0
+    self.SetStatusText('', 2)
+
   def UnselectAll(self):
     """Empty out the listctrl's selection"""
     for index in range(self._listctrl.GetItemCount()):
@@ -257,7 +318,12 @@ class MainFrame(main_frame.GenMainFrame):
       # out from under us), display it in red.
       self._MarkRowValidity(listCtrl, row, project.valid)
 
-      listCtrl.SetStringItem(row, 1, project.name)
+      name = project.name
+      if getattr(project, 'unresponsive', False):
+        name += ' (unresponsive)'
+        if project.valid:
+          listCtrl.SetItemTextColour(row, 'ORANGE')
+      listCtrl.SetStringItem(row, 1, name)
       listCtrl.SetStringItem(row, 2, project.path)
       listCtrl.SetStringItem(row, 3, str(project.port))
 
@@ -327,8 +393,24 @@ class MainFrame(main_frame.GenMainFrame):
     self._task_controller.Browse(event)
 
   def OnLogs(self, event):
+    self.ClearAlerts()
     self._task_controller.Logs(event)
 
+  def OnMergedLogs(self, event):
+    self._task_controller.MergedLogs(event)
+
+  def OnStats(self, event):
+    self._task_controller.Stats(event)
+
+  def OnErrors(self, event):
+    self._task_controller.Errors(event)
+
+  def OnMetrics(self, event):
+    self._task_controller.Metrics(event)
+
+  def OnCrashReports(self, event):
+    self._task_controller.CrashReports(event)
+
   def OnSdkConsole(self, event):
     self._task_controller.SdkConsole(event)
 
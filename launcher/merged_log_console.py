@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Console window for the merged output of several projects."""
+
+
+import wx
+import log_console
+import log_merge
+import log_store
+
+
+class MergedLogConsole(log_console.LogConsole):
+  """The output of several projects in one window (view in MVC).
+
+  Every PULL_INTERVAL_MS a LogMerger takes the new lines from each
+  project's LogStore and merges them in the order they arrived, each
+  tagged with its project's name.  They go into our own log, so
+  search, the level menu and export work as in a LogConsole.  There is
+  no journal, so there is no paging.
+
+  Lines are pulled even while the window is hidden, so it is up to
+  date whenever it's shown.
+  """
+
+  PULL_INTERVAL_MS = 250
+
+  def __init__(self, projects, stores,
+               max_lines=log_store.LogStore.DEFAULT_MAX_LINES,
+               max_bytes=log_store.LogStore.DEFAULT_MAX_BYTES,
+               virtual_view=False):
+    """Create a new MergedLogConsole.
+
+    Args:
+      projects: the Projects whose output we show.
+      stores: the LogStore of each project, in the same order.
+      max_lines: the most lines of output we keep.
+      max_bytes: the most bytes of output we keep.
+      virtual_view: if True, show output in a LogView.
+    """
+    names = [project.name for project in projects]
+    title = 'Merged Log Console (%s)' % ', '.join(names)
+    super(MergedLogConsole, self).__init__(None, max_lines, max_bytes,
+                                           virtual_view=virtual_view,
+                                           title=title)
+    self._projects = list(projects)
+    self._merger = log_merge.LogMerger(zip(names, stores))
+    self._timer = wx.Timer(self)
+    self.Bind(wx.EVT_TIMER, self.OnTimer, self._timer)
+    self.Pull()
+    self._timer.Start(self.PULL_INTERVAL_MS)
+
+  def Pull(self):
+    """Merge in the lines added to the projects' stores since last time.
+
+    Returns:
+      The number of lines merged in.
+    """
+    entries = self._merger.Update()
+    self._log.AppendParsedLines(entries)
+    return len(entries)
+
+  def OnTimer(self, event):
+    """Pull new lines.  Called directly from UI."""
+    self.Pull()
+
+  def _DefaultExportFilename(self):
+    """Return the file name the Export... dialog suggests."""
+    return 'merged.log'
+
+  @property
+  def projects(self):
+    """The Projects whose output we show."""
+    return self._projects
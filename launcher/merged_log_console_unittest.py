@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for merged_log_console.py"""
+
+import unittest
+import wx
+import launcher
+
+
+class MergedLogConsoleTest(unittest.TestCase):
+
+  def setUp(self):
+    # Must always create a wx.App first
+    self.app = wx.PySimpleApp()
+
+  def testPull(self):
+    projects = [launcher.Project('path', 8000, 'front'),
+                launcher.Project('path2', 8001, 'back')]
+    stores = [launcher.LogStore(), launcher.LogStore()]
+    stores[0].AppendText('hello\n', arrival_time=1.0)
+    console = launcher.MergedLogConsole(projects, stores)
+    self.assertEqual(projects, console.projects)
+    self.assertEqual('[front] hello\n', console.GetText())
+    stores[1].AppendText('there\n', arrival_time=2.0)
+    self.assertEqual(1, console.Pull())
+    self.assertEqual('[front] hello\n[back] there\n', console.GetText())
+    self.assertEqual(0, console.Pull())
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Window showing the user-defined metrics of a project."""
+
+
+import logging
+import wx
+import stats_frame
+
+
+class MetricsFrame(stats_frame.StatsFrame):
+  """Table of a project's metrics, one row per metric (view in MVC).
+
+  The table summarizes each metric over the window chosen (the last
+  minute, say), and is refreshed from a ProjectMetrics; see StatsFrame.
+  All windows can be exported as CSV.
+  """
+
+  # Column labels, and the key of a ProjectMetrics row for each.
+  COLUMNS = (
+      ('Metric', 'metric'),
+      ('Count', 'count'),
+      ('Sum', 'sum'),
+      ('Min', 'min'),
+      ('Max', 'max'),
+      ('Mean', 'mean'),
+      ('p50', 'p50'),
+      ('p95', 'p95'),
+  )
+
+  def __init__(self, project, metrics):
+    """Create a new MetricsFrame.
+
+    Args:
+      project: the Project whose metrics we show.
+      metrics: the ProjectMetrics for that project.
+    """
+    title = 'Metrics (%s)' % project.name
+    super(MetricsFrame, self).__init__(project, metrics, title,
+                                       size=(640, 300))
+    self._window_seconds = metrics.WINDOWS[0]
+    self._list.SetColumnWidth(0, 150)
+    self._window_choice = wx.Choice(
+        self, -1, choices=['Last %s' % _FormatWindow(seconds)
+                           for seconds in metrics.WINDOWS])
+    self._window_choice.SetSelection(0)
+    self.Bind(wx.EVT_CHOICE, self.OnWindow, self._window_choice)
+    export = wx.Button(self, -1, 'Export CSV...')
+    self.Bind(wx.EVT_BUTTON, self.OnExport, export)
+    buttons = wx.BoxSizer(wx.HORIZONTAL)
+    buttons.Add(self._window_choice, 0, wx.ALL, 2)
+    buttons.AddStretchSpacer()
+    buttons.Add(export, 0, wx.ALL, 2)
+    buttons.Add(self._ResetButton(), 0, wx.ALL, 2)
+    sizer = wx.BoxSizer(wx.VERTICAL)
+    sizer.Add(self._list, 1, wx.EXPAND)
+    sizer.Add(buttons, 0, wx.EXPAND)
+    self.SetSizer(sizer)
+    self.RefreshTable()
+
+  def RefreshTable(self):
+    """Fill the table with the current summaries."""
+    rows = self._model.Rows(self._window_seconds)
+    self._FillTable([[row['metric']] +
+                     [_FormatValue(row[key]) for (_, key) in self.COLUMNS[1:]]
+                     for row in rows])
+    if rows:
+      self.SetStatusText('%d metrics' % len(rows))
+    else:
+      self.SetStatusText('No metrics defined for this application')
+
+  def OnWindow(self, event):
+    """Summarize over the window chosen.  Called directly from UI."""
+    self._window_seconds = self._model.WINDOWS[
+        self._window_choice.GetSelection()]
+    self.RefreshTable()
+
+  def ExportCsv(self, filename):
+    """Write the summaries for all windows to a CSV file.
+
+    Args:
+      filename: the file to write.
+    """
+    try:
+      output = open(filename, 'wb')
+      try:
+        self._model.WriteCsv(output)
+      finally:
+        output.close()
+    except IOError, err:
+      logging.warning('Cannot export metrics to %s: %s' % (filename, err))
+    else:
+      self.SetStatusText('Exported to %s' % filename)
+
+  def OnExport(self, event):
+    """Ask for a file, and export to it.  Called directly from UI."""
+    dialog = wx.FileDialog(self, 'Export metrics',
+                           wildcard='CSV files (*.csv)|*.csv',
+                           defaultFile='%s-metrics.csv' % self._project.name,
+                           style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT)
+    try:
+      if dialog.ShowModal() == wx.ID_OK:
+        self.ExportCsv(dialog.GetPath())
+    finally:
+      dialog.Destroy()
+
+
+def _FormatWindow(seconds):
+  """Format a window length, like '5 min'."""
+  if seconds % 60:
+    return '%d sec' % seconds
+  return '%d min' % (seconds / 60)
+
+
+def _FormatValue(value):
+  """Format a number for the table; '' if there is none."""
+  if value is None:
+    return ''
+  return '%.6g' % value
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Rate accounting and sampling of a task's output."""
+
+
+import time
+
+
+class OutputThrottle(object):
+  """Decides which lines of a task's output are displayed.
+
+  Lines and bytes are counted in windows of WINDOW_SECONDS.  While the
+  rate is under the limits every line is shown.  When a window goes
+  over either limit we switch to sampling: only the first
+  SAMPLE_LINES lines of each window are shown, and at the end of the
+  window a summary line says how many were suppressed.  Once a whole
+  window is back under the limits, every line is shown again.
+
+  Counting never stops, so the rates and totals are always right.
+
+  Not thread-safe; the caller must serialize calls.
+  """
+
+  DEFAULT_MAX_LINES_PER_SECOND = 2000
+  DEFAULT_MAX_BYTES_PER_SECOND = 1024 * 1024
+
+  # Length of an accounting window, in seconds.
+  WINDOW_SECONDS = 1.0
+  # Lines shown per window while sampling.
+  SAMPLE_LINES = 10
+
+  def __init__(self, max_lines_per_second=DEFAULT_MAX_LINES_PER_SECOND,
+               max_bytes_per_second=DEFAULT_MAX_BYTES_PER_SECOND,
+               clock=time.time):
+    """Create a new OutputThrottle.
+
+    Args:
+      max_lines_per_second: the line rate above which we sample.
+      max_bytes_per_second: the byte rate above which we sample.
+      clock: a function returning the time in seconds; for unittests.
+    """
+    # self._window_*: counts for the current window
+    self._max_lines = max_lines_per_second * self.WINDOW_SECONDS
+    self._max_bytes = max_bytes_per_second * self.WINDOW_SECONDS
+    self._clock = clock
+    self._window_start = clock()
+    self._window_lines = 0
+    self._window_bytes = 0
+    self._window_shown = 0
+    self._window_suppressed = 0
+    self.sampling = False
+    self.lines_seen = 0
+    self.bytes_seen = 0
+    self.lines_suppressed = 0
+    self.line_rate = 0.0
+    self.byte_rate = 0.0
+
+  def Admit(self, line):
+    """Count a line, and return the lines to display because of it.
+
+    Args:
+      line: a line of output.
+    Returns:
+      A list of lines to display: maybe a summary of the last window,
+      then the line itself unless it is suppressed.
+    """
+    shown = self.Tick()
+    self.lines_seen += 1
+    self.bytes_seen += len(line)
+    self._window_lines += 1
+    self._window_bytes += len(line)
+    if not self.sampling and self._OverLimit():
+      self.sampling = True
+    if self.sampling and self._window_shown >= self.SAMPLE_LINES:
+      self._window_suppressed += 1
+      self.lines_suppressed += 1
+    else:
+      self._window_shown += 1
+      shown.append(line)
+    return shown
+
+  def Tick(self):
+    """End the current window if its time is up.
+
+    Called for every line, and should also be called now and then
+    while sampling, so the last summary appears even if output stops.
+
+    Returns:
+      A list holding the summary line of the window just ended, if it
+      suppressed anything; else an empty list.
+    """
+    now = self._clock()
+    elapsed = now - self._window_start
+    if elapsed < self.WINDOW_SECONDS and elapsed >= 0:
+      return []
+    shown = []
+    if self._window_suppressed:
+      shown.append('...%s lines suppressed in last %ds...\n' %
+                   (format(self._window_suppressed, ','),
+                    round(max(elapsed, self.WINDOW_SECONDS))))
+    if elapsed > 0:
+      self.line_rate = self._window_lines / elapsed
+      self.byte_rate = self._window_bytes / elapsed
+    if self.sampling and not self._OverLimit():
+      self.sampling = False
+    self._window_start = now
+    self._window_lines = 0
+    self._window_bytes = 0
+    self._window_shown = 0
+    self._window_suppressed = 0
+    return shown
+
+  def _OverLimit(self):
+    """Return True if the current window is over either limit."""
+    return (self._window_lines > self._max_lines or
+            self._window_bytes > self._max_bytes)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for output_throttle.py"""
+
+import unittest
+import launcher
+
+
+class OutputThrottleTest(unittest.TestCase):
+
+  def setUp(self):
+    self.now = 100.0
+    self.throttle = launcher.OutputThrottle(max_lines_per_second=5,
+                                            max_bytes_per_second=1000,
+                                            clock=lambda: self.now)
+
+  def _Admit(self, count, line='x\n'):
+    shown = []
+    for _ in range(count):
+      shown.extend(self.throttle.Admit(line))
+    return shown
+
+  def testUnderLimit(self):
+    self.assertEqual(['x\n'] * 5, self._Admit(5))
+    self.assertFalse(self.throttle.sampling)
+    self.now += 1
+    self.assertEqual(['x\n'] * 5, self._Admit(5))
+    self.assertEqual(5.0, self.throttle.line_rate)
+    self.assertEqual(10, self.throttle.lines_seen)
+
+  def testSampling(self):
+    self.throttle.SAMPLE_LINES = 2
+    self.assertEqual(['x\n'] * 5, self._Admit(20))
+    self.assertTrue(self.throttle.sampling)
+    self.assertEqual(15, self.throttle.lines_suppressed)
+    # Still too fast: the summary, then a sample.
+    self.now += 1
+    shown = self._Admit(20)
+    self.assertEqual('...15 lines suppressed in last 1s...\n', shown[0])
+    self.assertEqual(['x\n'] * 2, shown[1:])
+    self.assertTrue(self.throttle.sampling)
+    # The summary appears even if output stops.
+    self.now += 1
+    self.assertEqual(['...18 lines suppressed in last 1s...\n'],
+                     self.throttle.Tick())
+    self.assertTrue(self.throttle.sampling)
+    # A quiet window ends sampling.
+    self.now += 1
+    self.assertEqual([], self.throttle.Tick())
+    self.assertFalse(self.throttle.sampling)
+    self.assertEqual(['x\n'] * 3, self._Admit(3))
+    self.assertEqual(43, self.throttle.lines_seen)
+    self.assertEqual(33, self.throttle.lines_suppressed)
+
+  def testByteLimit(self):
+    self.throttle.SAMPLE_LINES = 1
+    shown = self._Admit(3, 'y' * 600)
+    self.assertEqual(1, len(shown))
+    self.assertTrue(self.throttle.sampling)
+
+  def testBigNumbers(self):
+    self.throttle.SAMPLE_LINES = 0
+    self._Admit(12345)
+    self.now += 1
+    self.assertEqual(['...12,340 lines suppressed in last 1s...\n'],
+                     self.throttle.Tick())
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -29,8 +29,12 @@ The Platform class and it's derivatives provides a platform abstraction.
 """
 
 
+import errno
+import logging
 import os
 import subprocess
+import sys
+import threading
 if os.name == 'posix':
   import signal
 elif os.name == 'nt':
@@ -123,6 +127,53 @@ class Platform(object):
     """
     raise PlatformUnimplemented()
 
+  def ForceKillProcess(self, process):
+    """Kill the specified process at once, giving it no chance to clean up.
+
+    Args:
+      process: The subprocess.Popen process to be killed.
+
+    Raises:
+      PlatformUnimplemented: Always; should be overridden in subclass.
+    """
+    raise PlatformUnimplemented()
+
+  def NewProcessGroupCommand(self, cmd):
+    """Return a command which runs cmd as a task in its own group.
+
+    Args:
+      cmd: a list of executable and args.
+
+    Returns:
+      A list of executable and args, for subprocess.Popen().
+
+    Raises:
+      PlatformUnimplemented: Always; should be overridden in subclass.
+    """
+    raise PlatformUnimplemented()
+
+  def ReapOrphans(self):
+    """Reap orphaned descendants of ours which have exited.
+
+    Only overridden where orphans are handed to us (Linux).
+
+    Returns:
+      A list of (pid, command, return code) for each orphan reaped.
+    """
+    return []
+
+  def ProcessCpuSeconds(self, pid):
+    """Return the CPU time (user and system) a process has used.
+
+    Only overridden where it is cheap to find out (Linux).
+
+    Args:
+      pid: the process id.
+    Returns:
+      The CPU time in seconds, or None if we can't tell.
+    """
+    return None
+
   def PythonCommand(self):
     """Return a default path to the Python we want to use.
 
@@ -166,6 +217,29 @@ class Platform(object):
     """
     raise PlatformUnimplemented()
 
+  def ShutdownFile(self, make_parent_directory=True):
+    """Filename of the record of how our tasks stopped at last exit.
+
+    Args:
+      make_parent_directory: If True, mkdir the parent directory if needed.
+        Currently only relevant on Windows.
+
+    Raises:
+      PlatformUnimplemented: Always; should be overridden in subclass.
+    """
+    raise PlatformUnimplemented()
+
+  def LogDirectory(self, make_directory=True):
+    """Directory where project output journals are kept.
+
+    Args:
+      make_directory: If True, mkdir the directory if needed.
+
+    Raises:
+      PlatformUnimplemented: Always; should be overridden in subclass.
+    """
+    raise PlatformUnimplemented()
+
   def OpenCommand(self, path):
     """Command for opening a file or folder on disk.
 
@@ -209,11 +283,12 @@ class Platform(object):
     """
     return self._briefname
 
-  def IsSuccessfulCommandResultCode(self, code):
+  def IsSuccessfulCommandResultCode(self, code, killed=False):
     """Whether the result code from a command actually a success.
 
     Args:
       code: The numerical result code from the subprocess wait() function.
+      killed: True if we killed the command with KillProcess().
     Returns:
       True iff the result code is considered a success, especially the
       result code returned when the subprocess is intentionally killed.
@@ -227,9 +302,105 @@ class Platform(object):
 class PlatformPosix(Platform):
   """Common Platform base class for Linux and Mac."""
 
-  def KillProcess(self, process):
-    """Kill the specified process, a subprocess.Popen object."""
-    os.kill(process.pid, signal.SIGTERM)
+  # Seconds a process group has to exit after SIGTERM before SIGKILL.
+  KILL_GRACE_SECONDS = 5.0
+
+  # Starts a new session, then execs the rest of its arguments; used
+  # by NewProcessGroupCommand() where there is no setsid(1).
+  _SETSID_SCRIPT = ('import os, sys; os.setsid(); '
+                    'os.execvp(sys.argv[1], sys.argv[1:])')
+
+  def KillProcess(self, process, grace_seconds=None):
+    """Kill the specified process, a subprocess.Popen object.
+
+    A process started with NewProcessGroupCommand() leads its own process
+    group, and the whole group (the helpers it started, too) is sent
+    SIGTERM.  Whatever is left of the group after grace_seconds is
+    sent SIGKILL.  We don't wait here; the escalation runs on a timer,
+    and the process is left for its owner to reap.
+
+    Args:
+      process: The subprocess.Popen process to be killed.
+      grace_seconds: Seconds to wait before SIGKILL; defaults to
+        KILL_GRACE_SECONDS.
+    Returns:
+      The threading.Timer which will escalate to SIGKILL, or None if
+      there is nothing left to kill.
+    """
+    if grace_seconds is None:
+      grace_seconds = self.KILL_GRACE_SECONDS
+    group = self._ProcessGroup(process)
+    if not self._Signal(process.pid, group, signal.SIGTERM):
+      return None
+    timer = threading.Timer(grace_seconds, self._Escalate, (process, group))
+    timer.setDaemon(True)
+    timer.start()
+    return timer
+
+  def ForceKillProcess(self, process):
+    """Send SIGKILL to the specified process (group), a subprocess.Popen."""
+    if process.returncode is not None:
+      return  # reaped, so its pid may already be someone else's
+    self._Signal(process.pid, self._ProcessGroup(process), signal.SIGKILL)
+
+  def _ProcessGroup(self, process):
+    """Return the process group a process leads, or None if it leads none.
+
+    A process which shares our group mustn't be killed by group, or
+    we'd kill ourselves.
+    """
+    try:
+      if os.getpgid(process.pid) == process.pid:
+        return process.pid
+    except OSError:
+      pass
+    return None
+
+  def _Signal(self, pid, group, signum):
+    """Send a signal to a process group, or to one process if group is None.
+
+    Returns:
+      True if there was anything to signal.
+    """
+    try:
+      if group is None:
+        os.kill(pid, signum)
+      else:
+        os.killpg(group, signum)
+    except OSError, err:
+      if err.errno != errno.ESRCH:
+        raise
+      return False
+    return True
+
+  def _Escalate(self, process, group):
+    """SIGKILL what is left of a process (group) KillProcess() signalled."""
+    if group is None and process.returncode is not None:
+      return  # reaped, so its pid may already be someone else's
+    if self._Signal(process.pid, group, signal.SIGKILL):
+      logging.info('Process %d did not exit on SIGTERM; sent SIGKILL' %
+                   process.pid)
+
+  def NewProcessGroupCommand(self, cmd):
+    """Return a command which runs cmd as a task in its own group.
+
+    The task gets a new session (and so a new process group), so
+    KillProcess() can signal everything it starts.  The wrapper,
+    setsid(1) or else a line of Python, execs cmd, so the task keeps
+    the pid subprocess.Popen() reports.  We don't use a preexec_fn
+    instead: subprocess documents that it can deadlock a process which
+    runs threads, as ours does.
+
+    Args:
+      cmd: a list of executable and args.
+
+    Returns:
+      A list of executable and args, for subprocess.Popen().
+    """
+    setsid = self._FindInPath('setsid', ('/usr/bin', '/bin'))
+    if setsid:
+      return [setsid] + list(cmd)
+    return [sys.executable, '-c', self._SETSID_SCRIPT] + list(cmd)
 
   def PythonCommand(self):
     """Return a default path to the Python we want to use.
@@ -275,11 +446,38 @@ class PlatformPosix(Platform):
     # No need to make the parent directory when it is ~
     return os.path.expanduser('~/.google_appengine_projects.ini')
 
-  def IsSuccessfulCommandResultCode(self, code):
+  def ShutdownFile(self, make_parent_directory=True):
+    """Filename of the record of how our tasks stopped at last exit.
+
+    Arg make_parent_directory is ignored (unnecessary), but we retain
+    it to keep the signature in sync with the Windows version.
+
+    Returns:
+      The filename of our shutdown record.
+    """
+    # No need to make the parent directory when it is ~
+    return os.path.expanduser('~/.google_appengine_launcher_shutdown.ini')
+
+  def LogDirectory(self, make_directory=True):
+    """Directory where project output journals are kept.
+
+    Args:
+      make_directory: If True, mkdir the directory if needed.
+
+    Returns:
+      The name of our log directory.
+    """
+    dirname = os.path.expanduser('~/.google_appengine_launcher_logs')
+    if not os.path.exists(dirname) and make_directory:
+      os.mkdir(dirname)
+    return dirname
+
+  def IsSuccessfulCommandResultCode(self, code, killed=False):
     """Is the result code from a command actually a success?
 
     Args:
       code: The numerical result code from the subprocess wait() function.
+      killed: True if we killed the command with KillProcess().
     Returns:
       True if the result code is considered a success, especially the
       result code returned when the subprocess is intentionally killed.
@@ -289,9 +487,12 @@ class PlatformPosix(Platform):
     # module returns a code of "negative the signal number" when a process
     # is killed by a signal.  The launcher uses signal 15 (SIGTERM) to
     # kill the subprocess on the user's behalf, so it's considered to
-    # be successful.
+    # be successful.  If that didn't work, the launcher uses signal 9
+    # (SIGKILL); that is only a success if we know we sent it.
     if code in (0, -15):
       return True
+    if killed and code == -9:
+      return True
     return False
 
 
@@ -331,10 +532,144 @@ class PlatformMac(PlatformPosix):
     return self.OpenCommand(os.path.join(application, 'app.yaml'))
 
 class PlatformLinux(PlatformPosix):
-  """Linux-specific platform object."""
+  """Linux-specific platform object.
+
+  We make ourselves a "child subreaper" (see prctl(2)), so processes
+  orphaned by our tasks (helpers whose dev_appserver died first), and
+  by other commands we run (such as the browser xdg-open starts), are
+  handed to us rather than to init, and can be found, reaped and
+  reported by ReapOrphans().
+  """
+
+  _PR_SET_CHILD_SUBREAPER = 36
 
   def __init__(self, exists=os.path.exists):
     super(PlatformLinux, self).__init__('linux', exists=exists)
+    self._subreaper = None
+    # self._running_orphans: pids of running orphans already logged
+    self._running_orphans = set()
+
+  def NewProcessGroupCommand(self, cmd):
+    """Return a command which runs cmd as a task in its own group.
+
+    Also makes us a subreaper, the first time a task is started.
+
+    Args:
+      cmd: a list of executable and args.
+
+    Returns:
+      A list of executable and args, for subprocess.Popen().
+    """
+    if self._subreaper is None:
+      self._subreaper = self._BecomeSubreaper()
+    return super(PlatformLinux, self).NewProcessGroupCommand(cmd)
+
+  def _BecomeSubreaper(self):
+    """Ask to be handed our orphaned descendants; return True if we are."""
+    try:
+      import ctypes
+      libc = ctypes.CDLL(None, use_errno=True)
+      return libc.prctl(self._PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+    except (ImportError, OSError, AttributeError), err:
+      logging.info('Cannot adopt orphaned processes: %s' % err)
+      return False
+
+  def ReapOrphans(self, proc='/proc'):
+    """Reap orphaned descendants of ours which have exited.
+
+    An orphan is any child of ours which doesn't lead its own session.
+    Our tasks each lead their own session, and are reaped by their
+    TaskThreads; every other child is either handed to us or run and
+    forgotten (see TaskController.Open()), so no one else waits for
+    it.  Orphans of our tasks which are still running are logged
+    (once each), and left alone.
+
+    Args:
+      proc: where procfs is mounted; for unittests.
+    Returns:
+      A list of (pid, command, return code) for each orphan reaped.
+    """
+    reaped = []
+    my_pid = os.getpid()
+    my_session = os.getsid(0)
+    try:
+      pids = [int(name) for name in os.listdir(proc) if name.isdigit()]
+    except OSError:
+      return reaped
+    for pid in pids:
+      stat = self._ReadProcStat(proc, pid)
+      if not stat:
+        continue
+      (command, state, ppid, session) = stat
+      if ppid != my_pid or session == pid:
+        continue
+      if state != 'Z':
+        if session != my_session and pid not in self._running_orphans:
+          self._running_orphans.add(pid)
+          logging.info('Orphaned process %d (%s) of an exited task is '
+                       'still running' % (pid, command))
+        continue
+      self._running_orphans.discard(pid)
+      try:
+        (unused_pid, status) = os.waitpid(pid, os.WNOHANG)
+      except OSError:
+        continue
+      if os.WIFSIGNALED(status):
+        code = -os.WTERMSIG(status)
+      else:
+        code = os.WEXITSTATUS(status)
+      logging.info('Reaped orphaned process %d (%s), exit code %d' %
+                   (pid, command, code))
+      reaped.append((pid, command, code))
+    return reaped
+
+  def ProcessCpuSeconds(self, pid, proc='/proc'):
+    """Return the CPU time (user and system) a process has used.
+
+    Read from /proc/<pid>/stat, which costs no more than a small file
+    read.
+
+    Args:
+      pid: the process id.
+      proc: where procfs is mounted; for unittests.
+    Returns:
+      The CPU time in seconds, or None if we can't tell.
+    """
+    stat = self._ReadProcStatFields(proc, pid)
+    if not stat or len(stat[1]) < 13:
+      return None
+    fields = stat[1]
+    # utime and stime, the 14th and 15th fields, are in clock ticks.
+    return (int(fields[11]) + int(fields[12])) / float(self._ClockTicks())
+
+  def _ClockTicks(self):
+    """Return the number of clock ticks per second."""
+    try:
+      return os.sysconf('SC_CLK_TCK')
+    except (ValueError, OSError):
+      return 100
+
+  def _ReadProcStat(self, proc, pid):
+    """Return (command, state, parent pid, session) of a process, or None."""
+    stat = self._ReadProcStatFields(proc, pid)
+    if not stat or len(stat[1]) < 4:
+      return None
+    (command, fields) = stat
+    return (command, fields[0], int(fields[1]), int(fields[3]))
+
+  def _ReadProcStatFields(self, proc, pid):
+    """Return (command, the fields after it) from a process's stat, or None.
+
+    The fields start with the process state (the stat file's third).
+    """
+    try:
+      stat = open(os.path.join(proc, str(pid), 'stat')).read()
+    except IOError:
+      return None
+    # The command is in parentheses, and may itself hold spaces or ')'.
+    (head, _, tail) = stat.rpartition(')')
+    command = head.partition('(')[2]
+    return (command, tail.split())
 
   def OpenCommand(self, path):
     """Command for opening a file or folder on disk.
@@ -397,6 +732,24 @@ class PlatformWin(Platform):
     win32api.TerminateProcess(handle, -1)
     win32api.CloseHandle(handle)
 
+  def ForceKillProcess(self, process):
+    """Kill the specified process at once; the same as KillProcess() here."""
+    self.KillProcess(process)
+
+  def NewProcessGroupCommand(self, cmd):
+    """Return a command which runs cmd as a task in its own group.
+
+    cmd is returned as it is, since KillProcess() doesn't signal a
+    group here.
+
+    Args:
+      cmd: a list of executable and args.
+
+    Returns:
+      A list of executable and args, for subprocess.Popen().
+    """
+    return list(cmd)
+
   def PythonCommand(self):
     """Return a default path to the Python we want to use.
 
@@ -492,6 +845,32 @@ class PlatformWin(Platform):
       os.mkdir(basedir)
     return os.path.join(basedir, 'google_appengine_projects.ini')
 
+  def ShutdownFile(self, make_parent_directory=True):
+    """Filename of the record of how our tasks stopped at last exit.
+
+    Returns:
+      The filename of our shutdown record.
+    """
+    basedir = os.path.expanduser('~/Google')
+    if not os.path.exists(basedir) and make_parent_directory:
+      os.mkdir(basedir)
+    return os.path.join(basedir, 'google_appengine_launcher_shutdown.ini')
+
+  def LogDirectory(self, make_directory=True):
+    """Directory where project output journals are kept.
+
+    Args:
+      make_directory: If True, mkdir the directory (and its parent)
+        if needed.
+
+    Returns:
+      The name of our log directory.
+    """
+    dirname = os.path.expanduser('~/Google/launcher_logs')
+    if not os.path.exists(dirname) and make_directory:
+      os.makedirs(dirname)
+    return dirname
+
   def OpenCommand(self, path):
     """Command for opening a file or folder on disk.
 
@@ -529,11 +908,12 @@ class PlatformWin(Platform):
     """
     return (editor, os.path.join(application, 'app.yaml'))
 
-  def IsSuccessfulCommandResultCode(self, code):
+  def IsSuccessfulCommandResultCode(self, code, killed=False):
     """Is the result code from a command actually a success?
 
     Args:
       code: The numerical result code from the subprocess wait() function.
+      killed: True if we killed the command with KillProcess().
     Returns:
       True if the result code is considered a success, especially the
       result code returned when the subprocess is intentionally killed.
@@ -19,8 +19,11 @@
 
 import mox
 import os
+import shutil
 import subprocess
 import sys
+import tempfile
+import time
 import unittest
 import launcher
 
@@ -53,6 +56,50 @@ class PlatformTest(unittest.TestCase):
     cmd = (sys.executable, '-c', 'import time; time.sleep(20)')
     self.platform.KillProcess(subprocess.Popen(cmd))
 
+  def testKillProcessGroup(self):
+    """Stopping kills a task's children, and escalates to SIGKILL."""
+    if not isinstance(self.platform, launcher.PlatformPosix):
+      return
+    # Both the task and the child it starts ignore SIGTERM.
+    ignore = 'import signal; signal.signal(signal.SIGTERM, signal.SIG_IGN)\n'
+    script = (ignore + 'import subprocess, sys, time\n'
+              'subprocess.Popen([sys.executable, "-c", %r])\n'
+              'print "started"\n'
+              'sys.stdout.flush()\n'
+              'time.sleep(30)\n' % (ignore + 'import time; time.sleep(30)'))
+    process = subprocess.Popen(
+        self.platform.NewProcessGroupCommand((sys.executable, '-c', script)),
+        stdout=subprocess.PIPE)
+    process.stdout.readline()
+    timer = self.platform.KillProcess(process, grace_seconds=0.2)
+    code = process.wait()
+    self.assertEqual(-9, code)
+    self.assertTrue(self.platform.IsSuccessfulCommandResultCode(code,
+                                                                killed=True))
+    self.assertFalse(self.platform.IsSuccessfulCommandResultCode(code))
+    timer.join()
+    # The child is gone too (once reaped, if it was orphaned to us).
+    for i in range(20):
+      self.platform.ReapOrphans()
+      try:
+        os.killpg(process.pid, 0)
+      except OSError:
+        break
+      time.sleep(0.1)
+    self.assertRaises(OSError, os.killpg, process.pid, 0)
+
+  def testNewProcessGroupCommand(self):
+    """Without setsid(1), a line of Python starts the new group."""
+    if not isinstance(self.platform, launcher.PlatformPosix):
+      return
+    platform = launcher.PlatformPosix('posix', exists=lambda path: False)
+    cmd = platform.NewProcessGroupCommand(
+        (sys.executable, '-c', 'import os; print os.getpgid(0)'))
+    self.assertEqual(sys.executable, cmd[0])
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    self.assertEqual(str(process.pid), process.stdout.read().strip())
+    self.assertEqual(0, process.wait())
+
   def testPythonCommand(self):
     self.assertTrue(os.path.exists(self.platform.PythonCommand()))
 
@@ -80,6 +127,14 @@ class PlatformTest(unittest.TestCase):
     self._GenericTestConfigFile(self.platform.ProjectsFile
                                 (make_parent_directory=False))
 
+  def testShutdownFile(self):
+    self._GenericTestConfigFile(
+        self.platform.ShutdownFile(make_parent_directory=False))
+
+  def testLogDirectory(self):
+    dirname = self.platform.LogDirectory(make_directory=False)
+    self.assertTrue(os.path.isabs(dirname))
+
   def testOpenCommand(self):
     path = '/tmp/oops'
     cmd = self.platform.OpenCommand(path)
@@ -139,6 +194,57 @@ class LinuxPlatformTest(unittest.TestCase):
     os.sep = self.original_sep
     os.environ = self.original_environ
 
+  def testReadProcStat(self):
+    proc = tempfile.mkdtemp()
+    try:
+      os.mkdir(os.path.join(proc, '42'))
+      stat = open(os.path.join(proc, '42', 'stat'), 'w')
+      stat.write('42 (odd (name)) Z 7 42 40 0 -1 4194560\n')
+      stat.close()
+      linux = launcher.PlatformLinux()
+      self.assertEqual(('odd (name)', 'Z', 7, 40),
+                       linux._ReadProcStat(proc, 42))
+      self.assertEqual(None, linux._ReadProcStat(proc, 43))
+      # Not our child, so not an orphan of ours.
+      self.assertEqual([], linux.ReapOrphans(proc))
+    finally:
+      shutil.rmtree(proc)
+
+  def testReapForgottenChild(self):
+    """An exited child in our own session is reaped too."""
+    if not os.path.exists('/proc/self/stat'):
+      return
+    linux = launcher.PlatformLinux()
+    pid = os.fork()
+    if not pid:
+      os._exit(3)
+    for i in range(50):
+      stat = linux._ReadProcStat('/proc', pid)
+      if stat and stat[1] == 'Z':
+        break
+      time.sleep(0.1)
+    reaped = [(orphan, code) for (orphan, unused_command, code)
+              in linux.ReapOrphans()]
+    self.assertTrue((pid, 3) in reaped)
+    self.assertRaises(OSError, os.waitpid, pid, os.WNOHANG)
+
+  def testProcessCpuSeconds(self):
+    proc = tempfile.mkdtemp()
+    try:
+      os.mkdir(os.path.join(proc, '42'))
+      stat = open(os.path.join(proc, '42', 'stat'), 'w')
+      stat.write('42 (a) b) S 1 42 42 0 -1 4194560 0 0 0 0 150 50 0 0\n')
+      stat.close()
+      linux = launcher.PlatformLinux()
+      linux._ClockTicks = lambda: 100
+      self.assertEqual(2.0, linux.ProcessCpuSeconds(42, proc))
+      self.assertEqual(None, linux.ProcessCpuSeconds(43, proc))
+    finally:
+      shutil.rmtree(proc)
+    if os.path.exists('/proc/self/stat'):
+      self.assertTrue(launcher.PlatformLinux().ProcessCpuSeconds(
+          os.getpid()) >= 0)
+
   def doOpenCommandTest(self, session, gnome_bin, kde_bin, expect):
     """Run the open command test.
 
@@ -99,6 +99,28 @@ class PrefController(object):
                         description=deploy_desc,
                         value=pref_deploy,
                         default=def_deploy)
+    for (pref_name, summary, description) in (
+        (launcher.Preferences.PREF_LOG_MAX_LINES,
+         'Log Lines',
+         'The most lines of output kept for each running application.\n'
+         'Older lines are dropped from the Logs window.'),
+        (launcher.Preferences.PREF_LOG_MAX_MEGABYTES,
+         'Log Size (MB)',
+         'The most output (in megabytes) kept for each running\n'
+         'application.  Older lines are dropped from the Logs window.'),
+        (launcher.Preferences.PREF_LOG_MAX_LINES_PER_SECOND,
+         'Log Lines/Second',
+         'If an application prints more lines per second than this,\n'
+         'only a sample of them is shown in the Logs window.'),
+        (launcher.Preferences.PREF_ALERT_PATTERNS,
+         'Alert Patterns',
+         'Comma-separated text (or /regular expressions/) which raise\n'
+         'an alert in the status bar when an application prints them.')):
+      self._dialog.Append(pref_name,
+                          summary=summary,
+                          description=description,
+                          value=self._preferences.Get(pref_name),
+                          default=self._preferences.GetDefault(pref_name))
 
   def _ShowDialogModally(self):
     """Run our preference dialog modally.  Returns False if dialog Cancelled."""
@@ -117,7 +139,11 @@ class PrefController(object):
     for pref in (launcher.Preferences.PREF_PYTHON,
                  launcher.Preferences.PREF_APPENGINE,
                  launcher.Preferences.PREF_DEPLOY_SERVER,
-                 launcher.Preferences.PREF_EDITOR):
+                 launcher.Preferences.PREF_EDITOR,
+                 launcher.Preferences.PREF_LOG_MAX_LINES,
+                 launcher.Preferences.PREF_LOG_MAX_MEGABYTES,
+                 launcher.Preferences.PREF_LOG_MAX_LINES_PER_SECOND,
+                 launcher.Preferences.PREF_ALERT_PATTERNS):
       oldval = self._preferences.Get(pref)
       newval = self._dialog.Get(pref)
       if newval != oldval:
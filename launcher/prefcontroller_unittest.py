@@ -48,6 +48,10 @@ class PrefControllerTest(unittest.TestCase):
           launcher.Preferences.PREF_APPENGINE: None,
           launcher.Preferences.PREF_DEPLOY_SERVER: None,
           launcher.Preferences.PREF_EDITOR: None,
+          launcher.Preferences.PREF_LOG_MAX_LINES: None,
+          launcher.Preferences.PREF_LOG_MAX_MEGABYTES: None,
+          launcher.Preferences.PREF_LOG_MAX_LINES_PER_SECOND: None,
+          launcher.Preferences.PREF_ALERT_PATTERNS: None,
       }
 
     def __getitem__(self, key):
@@ -100,6 +104,11 @@ class PrefControllerTest(unittest.TestCase):
     dialog_mock.Get(appengine_pref).InAnyOrder().AndReturn(None)
     dialog_mock.Get(deploy_pref).InAnyOrder().AndReturn(None)
     dialog_mock.Get(editor_pref).InAnyOrder().AndReturn(None)
+    for log_pref in (launcher.Preferences.PREF_LOG_MAX_LINES,
+                     launcher.Preferences.PREF_LOG_MAX_MEGABYTES,
+                     launcher.Preferences.PREF_LOG_MAX_LINES_PER_SECOND,
+                     launcher.Preferences.PREF_ALERT_PATTERNS):
+      dialog_mock.Get(log_pref).InAnyOrder().AndReturn(None)
     dialog_mock.Destroy()
     mox.Replay(dialog_mock)
     pc = FakeController(self.prefs, dialog_mock)
@@ -40,9 +40,22 @@ class Preferences(object):
   PREF_APPENGINE = 'appengine'
   PREF_DEPLOY_SERVER = 'deploy_server'
   PREF_EDITOR = 'editor'
+  PREF_LOG_MAX_LINES = 'log_max_lines'
+  PREF_LOG_MAX_MEGABYTES = 'log_max_megabytes'
+  PREF_LOG_MAX_LINES_PER_SECOND = 'log_max_lines_per_second'
+  PREF_ALERT_PATTERNS = 'alert_patterns'
   # And these are not:
   PREF_MAIN_WINDOW_RECT = 'mainwindowrect'
   PREF_NOVERSIONCHECK = 'noversioncheck'
+  # Add a "nofoldrepeats = True" line to show repeated lines one by one.
+  PREF_NO_FOLD_REPEATS = 'nofoldrepeats'
+  # Add a "virtuallogview = True" line to show output in a LogView.
+  PREF_VIRTUAL_LOG_VIEW = 'virtuallogview'
+  # Seconds running applications have to stop when the launcher exits.
+  PREF_SHUTDOWN_DEADLINE_SECONDS = 'shutdown_deadline_seconds'
+  # Seconds without a sign of life before a running application is
+  # marked unresponsive; 0 turns the watchdog off.
+  PREF_HANG_TIMEOUT_SECONDS = 'hang_timeout_seconds'
 
   # ConfigParser section for prefs
   _PREF_SECTION = 'preferences'
@@ -64,6 +77,18 @@ class Preferences(object):
         self.PREF_DEPLOY_SERVER: None,
         self.PREF_EDITOR: self._platform.DefaultEditor(),
         self.PREF_NOVERSIONCHECK: None,
+        self.PREF_NO_FOLD_REPEATS: None,
+        self.PREF_VIRTUAL_LOG_VIEW: None,
+        self.PREF_LOG_MAX_LINES: str(launcher.LogStore.DEFAULT_MAX_LINES),
+        self.PREF_LOG_MAX_MEGABYTES:
+            str(launcher.LogStore.DEFAULT_MAX_BYTES / (1024 * 1024)),
+        self.PREF_LOG_MAX_LINES_PER_SECOND:
+            str(launcher.OutputThrottle.DEFAULT_MAX_LINES_PER_SECOND),
+        self.PREF_ALERT_PATTERNS: 'DeadlineExceededError, OverQuotaError',
+        self.PREF_SHUTDOWN_DEADLINE_SECONDS:
+            str(launcher.TaskShutdown.DEFAULT_DEADLINE_SECONDS),
+        self.PREF_HANG_TIMEOUT_SECONDS:
+            str(launcher.HangWatchdog.DEFAULT_TIMEOUT_SECONDS),
     }
     self.Load()
 
@@ -37,6 +37,13 @@ class Project(object):
   ALL_STATES = (STATE_STOP, STATE_RUN, STATE_PRODUCTION_RUN,
                 STATE_STARTING, STATE_DIED)
 
+  # Restart policies: when a project's task is restarted after it
+  # exits (see launcher.TaskSupervisor).
+  RESTART_NEVER = 'never'
+  RESTART_ON_FAILURE = 'on-failure'
+  RESTART_ALWAYS = 'always'
+  RESTART_POLICIES = (RESTART_NEVER, RESTART_ON_FAILURE, RESTART_ALWAYS)
+
   @staticmethod
   def ProjectWithConfigParser(configParser, sectionName):
     """Create a project from a config file.
@@ -63,10 +70,14 @@ class Project(object):
     pathport = Project._LoadFromConfigParser(configParser, sectionName)
 
     return Project(pathport[0], pathport[1], name=pathport[2],
-                   flags=pathport[3])
+                   flags=pathport[3], launch_patterns=pathport[4],
+                   metrics=pathport[5], restart_policy=pathport[6],
+                   probe_path=pathport[7])
 
 
-  def __init__(self, path, port, name=None, flags=None):
+  def __init__(self, path, port, name=None, flags=None,
+               launch_patterns=None, metrics=None, restart_policy=None,
+               probe_path=None):
     """Create a new project.
 
     Args:
@@ -75,6 +86,14 @@ class Project(object):
             that can be converted to a numeric value.
       name: A short name for the project.
       flags: A tuple of project flags.
+      launch_patterns: A list of regular expressions which match the
+        dev_appserver's "ready" line.  If empty, the defaults for known
+        SDK versions are used (see launcher.LaunchDetector).
+      metrics: A list of 'name=regexp' strings, each defining a metric
+        taken from the project's output (see launcher.MetricExtractor).
+      restart_policy: One of RESTART_POLICIES; if None, RESTART_NEVER.
+      probe_path: The path requested to tell when the dev_appserver
+        is ready (see launcher.ReadinessProbe).  If None, '/'.
 
     Raises:
       ProjectException if the argments are bad (None/zero values for path and
@@ -90,6 +109,12 @@ class Project(object):
     # self._name: a short name for this project
     # self._port: the local port we'll use when running our application
     # self._flags: list of extra command line flags for this project
+    # self.launch_patterns: list of regexps for the "ready" output line
+    # self.metrics: list of 'name=regexp' metric definitions
+    # self.restart_policy: when to restart our task after it exits
+    # self.probe_path: the path requested to tell when we're ready, or None
+    # self.unresponsive: True if our running task seems to have hung
+    #   (see launcher.HangWatchdog); cleared by any change of run state
     self._runstate = self.STATE_STOP
 
     self._path = path.strip()
@@ -102,6 +127,13 @@ class Project(object):
     # TODO(jrg): prevent changing of flags while running?
     # Perhaps just disallow GetInfo dialog while running.
     self.flags = flags  # calls a function to verify
+    self.launch_patterns = list(launch_patterns or [])
+    self.metrics = list(metrics or [])
+    self.restart_policy = restart_policy or self.RESTART_NEVER
+    if self.restart_policy not in self.RESTART_POLICIES:
+      raise ProjectException('Unknown restart policy %s' % restart_policy)
+    self.probe_path = probe_path
+    self.unresponsive = False
 
     # self.valid: True if valid (exists on disk etc)
     # Set by Verify()
@@ -153,6 +185,7 @@ class Project(object):
   def _SetRunState(self, state):
     if state in self.ALL_STATES:
       self._runstate = state
+      self.unresponsive = False
     else:
       raise ProjectException('Attempt to set runstate to bogus value')
 
@@ -228,6 +261,14 @@ class Project(object):
       name = 'flag%d' % count
       count += 1
       parser.set(sectionName, name, flag)
+    for (count, pattern) in enumerate(self.launch_patterns):
+      parser.set(sectionName, 'launchpattern%d' % count, pattern)
+    for (count, metric) in enumerate(self.metrics):
+      parser.set(sectionName, 'metric%d' % count, metric)
+    if self.restart_policy != self.RESTART_NEVER:
+      parser.set(sectionName, 'restart', self.restart_policy)
+    if self.probe_path:
+      parser.set(sectionName, 'probepath', self.probe_path)
 
   @staticmethod
   def _LoadFromConfigParser(parser, sectionName):
@@ -240,8 +281,9 @@ class Project(object):
           attributes.
 
     Returns:
-      A tuple with the read path, port, name, and flags, in that order.
-      Flags is itself a tuple of strings.
+      A tuple with the read path, port, name, flags, launch patterns,
+      metrics, restart policy and probe path, in that order.  Flags,
+      launch patterns and metrics are themselves lists of strings.
 
     Raises:
       ProjectException if the name, path, and port could not be read from
@@ -260,5 +302,27 @@ class Project(object):
     for opt in sorted(options):
       flags.append(parser.get(sectionName, opt))
 
+    # Launch patterns are regexps, so read them raw (no % interpolation).
+    patterns = [o for o in parser.options(sectionName)
+                if o.startswith('launchpattern') and
+                o[len('launchpattern'):].isdigit()]
+    patterns.sort(key=lambda o: int(o[len('launchpattern'):]))
+    launch_patterns = [parser.get(sectionName, o, raw=True) for o in patterns]
+    metrics = [o for o in parser.options(sectionName)
+               if o.startswith('metric') and o[len('metric'):].isdigit()]
+    metrics.sort(key=lambda o: int(o[len('metric'):]))
+    metrics = [parser.get(sectionName, o, raw=True) for o in metrics]
+    restart_policy = None
+    if parser.has_option(sectionName, 'restart'):
+      restart_policy = parser.get(sectionName, 'restart').strip()
+      if restart_policy not in Project.RESTART_POLICIES:
+        logging.info('Ignoring unknown restart policy %s for %s' %
+                     (restart_policy, path))
+        restart_policy = None
+    probe_path = None
+    if parser.has_option(sectionName, 'probepath'):
+      probe_path = parser.get(sectionName, 'probepath', raw=True).strip()
+
     # It's fine to have no flags; no need to check.
-    return (path, port, name, flags)
+    return (path, port, name, flags, launch_patterns, metrics,
+            restart_policy, probe_path or None)
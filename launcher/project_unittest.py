@@ -228,6 +228,66 @@ class ProjectTest(unittest.TestCase):
         launcher.Project.ProjectWithConfigParser(parser, 'grooble'),
         flagsproj.path, flagsproj.name, flagsproj.port, flags=flagsproj.flags)
 
+  def testStoreLaunchPatterns(self):
+    patterns = [r'Ready at http://[^:]+:(\d+)', r'100% (?P<port>\d+)']
+    project = launcher.Project('/tmp/hoover', 8000, launch_patterns=patterns)
+    parser = ConfigParser.ConfigParser()
+    parser.add_section('greeble')
+    project.SaveToConfigParser(parser, 'greeble')
+    loaded = launcher.Project.ProjectWithConfigParser(parser, 'greeble')
+    self.assertEqual(patterns, loaded.launch_patterns)
+    self.assertEqual([], launcher.Project('/tmp/hoover', 8000).launch_patterns)
+    # Keys without a number are ignored, not an error.
+    parser.set('greeble', 'launchpattern', 'x')
+    parser.set('greeble', 'launchpatternX', 'y')
+    loaded = launcher.Project.ProjectWithConfigParser(parser, 'greeble')
+    self.assertEqual(patterns, loaded.launch_patterns)
+
+  def testStoreMetrics(self):
+    metrics = [r'rpc_ms=rpc took (\d+)ms', 'hits=cache hit', 'pct=(\d+)%']
+    project = launcher.Project('/tmp/hoover', 8000, metrics=metrics)
+    parser = ConfigParser.ConfigParser()
+    parser.add_section('greeble')
+    project.SaveToConfigParser(parser, 'greeble')
+    loaded = launcher.Project.ProjectWithConfigParser(parser, 'greeble')
+    self.assertEqual(metrics, loaded.metrics)
+    self.assertEqual([], launcher.Project('/tmp/hoover', 8000).metrics)
+    parser.set('greeble', 'metric', 'x=y')
+    parser.set('greeble', 'metricX', 'x=z')
+    loaded = launcher.Project.ProjectWithConfigParser(parser, 'greeble')
+    self.assertEqual(metrics, loaded.metrics)
+
+  def testStoreRestartPolicy(self):
+    project = launcher.Project('/tmp/hoover', 8000,
+                               restart_policy='on-failure')
+    parser = ConfigParser.ConfigParser()
+    parser.add_section('greeble')
+    project.SaveToConfigParser(parser, 'greeble')
+    loaded = launcher.Project.ProjectWithConfigParser(parser, 'greeble')
+    self.assertEqual('on-failure', loaded.restart_policy)
+    parser.set('greeble', 'restart', 'sometimes')
+    loaded = launcher.Project.ProjectWithConfigParser(parser, 'greeble')
+    self.assertEqual('never', loaded.restart_policy)
+    self.assertRaises(launcher.ProjectException, launcher.Project,
+                      '/tmp/hoover', 8000, restart_policy='sometimes')
+
+  def testUnresponsive(self):
+    project = launcher.Project('/tmp/hoover', 8000)
+    project.runstate = launcher.Project.STATE_RUN
+    project.unresponsive = True
+    project.runstate = launcher.Project.STATE_DIED
+    self.assertFalse(project.unresponsive)
+
+  def testStoreProbePath(self):
+    project = launcher.Project('/tmp/hoover', 8000,
+                               probe_path='/_ah/ready?x=1%')
+    parser = ConfigParser.ConfigParser()
+    parser.add_section('greeble')
+    project.SaveToConfigParser(parser, 'greeble')
+    loaded = launcher.Project.ProjectWithConfigParser(parser, 'greeble')
+    self.assertEqual('/_ah/ready?x=1%', loaded.probe_path)
+    self.assertEqual(None, launcher.Project('/tmp/hoover', 8000).probe_path)
+
 
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Probing a running project over HTTP to tell when it is ready."""
+
+
+import heapq
+import httplib
+import itertools
+import logging
+import socket
+import threading
+import time
+
+
+class ReadinessProbe(object):
+  """Polls a local HTTP server until it first responds.
+
+  Any response at all, even an error, means the server is up.  Each
+  attempt has a short timeout, and all of them go through the one
+  HTTPConnection.  Attempts are made by a ProbeScheduler.
+
+  We can't tell who answers: if another process already holds the
+  port, its answers count too.  So a caller should only probe a port
+  which was free before its server started (see PortInUse()), or
+  which the server has said it is serving.
+  """
+
+  INTERVAL_SECONDS = 0.25
+  TIMEOUT_SECONDS = 1.0
+  # Added to the query of every probe request, so the requests can be
+  # told apart in the server's output (see IsProbeUrl()).
+  PROBE_QUERY = 'launcher_probe=1'
+
+  def __init__(self, port, path='/', callback=None, host='localhost',
+               max_attempts=None, clock=time.time,
+               connection_class=httplib.HTTPConnection):
+    """Create a new ReadinessProbe.
+
+    Args:
+      port: the port the server should listen on.
+      path: the path to request.
+      callback: if not None, called with this probe (on the
+        scheduler's thread) when the server first responds.
+      host: the host the server runs on.
+      max_attempts: if not None, give up after this many attempts.
+      clock: a function returning the time in seconds; for unittests.
+      connection_class: the class of HTTP connection; for unittests.
+    """
+    # self._connection: our HTTP connection, once made
+    self.port = port
+    self.path = path
+    self._callback = callback
+    self._host = host
+    self._clock = clock
+    self._connection_class = connection_class
+    self._connection = None
+    self._max_attempts = max_attempts
+    self.started = clock()
+    self.attempts = 0
+    self.status = None
+    self.time_to_first_response = None
+    self.cancelled = False
+
+  def Attempt(self):
+    """Make one request of the server.
+
+    Returns:
+      True if the server responded.
+    """
+    self.attempts += 1
+    if not self._connection:
+      self._connection = self._connection_class(
+          self._host, self.port, timeout=self.TIMEOUT_SECONDS)
+    try:
+      self._connection.request('GET', self.RequestPath())
+      response = self._connection.getresponse()
+      response.read()
+    except (socket.error, httplib.HTTPException):
+      self._connection.close()
+      return False
+    self.status = response.status
+    self.time_to_first_response = self._clock() - self.started
+    if self._callback:
+      self._callback(self)
+    return True
+
+  def RequestPath(self):
+    """Return the path we request: our path, marked as a probe's."""
+    if '?' in self.path:
+      return '%s&%s' % (self.path, self.PROBE_QUERY)
+    return '%s?%s' % (self.path, self.PROBE_QUERY)
+
+  @classmethod
+  def IsProbeUrl(cls, url):
+    """Return True if a requested URL was one of a probe's.
+
+    Args:
+      url: the URL from a request line, such as '/?launcher_probe=1'.
+    """
+    query = url.partition('?')[2]
+    return cls.PROBE_QUERY in query.split('&')
+
+  @classmethod
+  def PortInUse(cls, port, host='localhost'):
+    """Return True if something accepts connections on a port.
+
+    Args:
+      port: the port to try.
+      host: the host to try it on.
+    """
+    try:
+      sock = socket.create_connection((host, port), cls.TIMEOUT_SECONDS)
+    except socket.error:
+      return False
+    sock.close()
+    return True
+
+  def Exhausted(self):
+    """Return True if we have made all our attempts, unanswered."""
+    return (self.time_to_first_response is None and
+            self._max_attempts is not None and
+            self.attempts >= self._max_attempts)
+
+  def Close(self):
+    """Close our connection, if we have one."""
+    if self._connection:
+      self._connection.close()
+      self._connection = None
+
+
+class ProbeScheduler(object):
+  """Runs the ReadinessProbes of all projects from one thread.
+
+  Probes wait in a heap ordered by when each is next due, so our
+  thread sleeps until the earliest of them rather than polling.  A
+  probe which responds, runs out of attempts, or is removed, is
+  dropped.
+  """
+
+  # The shared instance; see Instance().
+  _instance = None
+
+  def __init__(self, clock=time.time):
+    """Create a new ProbeScheduler.
+
+    Args:
+      clock: a function returning the time in seconds; for unittests.
+    """
+    # self._condition: protects self._queue, and wakes our thread
+    # self._queue: a heap of (due time, sequence number, probe)
+    # self._sequence: breaks ties between probes due at the same time
+    self._clock = clock
+    self._condition = threading.Condition()
+    self._queue = []
+    self._sequence = itertools.count()
+    self._thread = None
+
+  @classmethod
+  def Instance(cls):
+    """Return the shared ProbeScheduler, creating it if needed."""
+    if not cls._instance:
+      cls._instance = cls()
+    return cls._instance
+
+  def AddProbe(self, probe, start_thread=True):
+    """Start making attempts with a probe, the first one right away.
+
+    Safe to call from any thread.
+
+    Args:
+      probe: a ReadinessProbe.
+      start_thread: if False, don't start our thread; for unittests.
+    """
+    self._condition.acquire()
+    try:
+      heapq.heappush(self._queue,
+                     (self._clock(), self._sequence.next(), probe))
+      if start_thread and not self._thread:
+        self._thread = threading.Thread(target=self._Run,
+                                        name='ProbeScheduler')
+        self._thread.setDaemon(True)
+        self._thread.start()
+      self._condition.notify()
+    finally:
+      self._condition.release()
+
+  def RemoveProbe(self, probe):
+    """Stop making attempts with a probe.  Safe to call from any thread."""
+    probe.cancelled = True
+
+  def ProbeCount(self):
+    """Return the number of probes still waiting for a response."""
+    self._condition.acquire()
+    try:
+      return len([entry for entry in self._queue if not entry[2].cancelled])
+    finally:
+      self._condition.release()
+
+  def _Run(self):
+    """Our thread: attempt probes as they fall due, forever."""
+    while True:
+      self._condition.acquire()
+      try:
+        while True:
+          self._DropCancelledLocked()
+          if not self._queue:
+            self._condition.wait()
+            continue
+          delay = self._queue[0][0] - self._clock()
+          if delay <= 0:
+            break
+          self._condition.wait(delay)
+      finally:
+        self._condition.release()
+      self.RunDueProbes()
+
+  def _DropCancelledLocked(self):
+    """Drop cancelled probes from the front of the queue.
+
+    self._condition must already be held.
+    """
+    while self._queue and self._queue[0][2].cancelled:
+      heapq.heappop(self._queue)[2].Close()
+
+  def RunDueProbes(self):
+    """Attempt every probe which is due, and requeue those not answered.
+
+    Called by our thread; may be called directly by unittests.
+    """
+    due = []
+    self._condition.acquire()
+    try:
+      now = self._clock()
+      while self._queue and self._queue[0][0] <= now:
+        due.append(heapq.heappop(self._queue)[2])
+    finally:
+      self._condition.release()
+    for probe in due:
+      try:
+        done = probe.cancelled or probe.Attempt() or probe.Exhausted()
+      except Exception:
+        # Don't let one bad callback stop the probes of every project.
+        logging.exception('Readiness probe of port %d failed' % probe.port)
+        done = True
+      if done:
+        probe.Close()
+        continue
+      self._condition.acquire()
+      try:
+        heapq.heappush(self._queue,
+                       (self._clock() + probe.INTERVAL_SECONDS,
+                        self._sequence.next(), probe))
+      finally:
+        self._condition.release()
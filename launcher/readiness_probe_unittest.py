@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for readiness_probe.py"""
+
+import BaseHTTPServer
+import socket
+import threading
+import unittest
+import launcher
+import testutil
+
+
+class FakeResponse(object):
+
+  status = 404
+
+  def read(self):
+    return ''
+
+
+class FakeConnection(object):
+  """An HTTPConnection to a server which answers after some refusals."""
+
+  refusals = 0
+  made = 0
+
+  def __init__(self, host, port, timeout=None):
+    FakeConnection.made += 1
+    self.closed = 0
+
+  def request(self, method, path):
+    self.path = path
+    if FakeConnection.refusals:
+      FakeConnection.refusals -= 1
+      raise socket.error('refused')
+
+  def getresponse(self):
+    return FakeResponse()
+
+  def close(self):
+    self.closed += 1
+
+
+class QuietHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+  def do_GET(self):
+    self.send_response(200)
+    self.end_headers()
+
+  def log_message(self, *args):
+    pass
+
+
+class ProbeTestBase(unittest.TestCase):
+
+  def setUp(self):
+    self.clock = testutil.FakeClock()
+    self.responded = []
+    FakeConnection.refusals = 0
+    FakeConnection.made = 0
+
+  def Probe(self, port=8080):
+    return launcher.ReadinessProbe(port, '/ready', self.responded.append,
+                                   clock=self.clock,
+                                   connection_class=FakeConnection)
+
+
+class ReadinessProbeTest(ProbeTestBase):
+
+  def testAttempt(self):
+    FakeConnection.refusals = 2
+    probe = self.Probe()
+    self.assertFalse(probe.Attempt())
+    self.assertFalse(probe.Attempt())
+    self.assertEqual([], self.responded)
+    self.clock.now += 1.5
+    self.assertTrue(probe.Attempt())
+    self.assertEqual([probe], self.responded)
+    self.assertEqual(404, probe.status)
+    self.assertEqual(1.5, probe.time_to_first_response)
+    self.assertEqual(3, probe.attempts)
+    self.assertEqual(1, FakeConnection.made)  # one connection throughout
+
+  def testProbeUrls(self):
+    probe = self.Probe()
+    probe.Attempt()
+    self.assertEqual('/ready?launcher_probe=1', probe._connection.path)
+    self.assertTrue(launcher.ReadinessProbe.IsProbeUrl(
+        probe._connection.path))
+    probe.path = '/ready?x=1'
+    self.assertEqual('/ready?x=1&launcher_probe=1', probe.RequestPath())
+    self.assertTrue(launcher.ReadinessProbe.IsProbeUrl(probe.RequestPath()))
+    self.assertFalse(launcher.ReadinessProbe.IsProbeUrl('/ready'))
+    self.assertFalse(launcher.ReadinessProbe.IsProbeUrl(
+        '/launcher_probe=1'))
+
+  def testRealServer(self):
+    server = BaseHTTPServer.HTTPServer(('localhost', 0), QuietHandler)
+    port = server.server_address[1]
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+    try:
+      probe = launcher.ReadinessProbe(port)
+      self.assertTrue(probe.Attempt())
+      self.assertEqual(200, probe.status)
+      probe.Close()
+    finally:
+      thread.join()
+      server.server_close()
+    # Nothing listens there now.
+    probe = launcher.ReadinessProbe(port)
+    self.assertFalse(probe.Attempt())
+    probe.Close()
+
+  def testPortInUse(self):
+    listener = socket.socket()
+    listener.bind(('localhost', 0))
+    listener.listen(1)
+    port = listener.getsockname()[1]
+    try:
+      self.assertTrue(launcher.ReadinessProbe.PortInUse(port))
+    finally:
+      listener.close()
+    self.assertFalse(launcher.ReadinessProbe.PortInUse(port))
+
+
+class ProbeSchedulerTest(ProbeTestBase):
+
+  def testSchedule(self):
+    scheduler = launcher.ProbeScheduler(self.clock)
+    FakeConnection.refusals = 1
+    slow = self.Probe(8080)
+    fast = self.Probe(8081)
+    scheduler.AddProbe(slow, start_thread=False)
+    scheduler.AddProbe(fast, start_thread=False)
+    self.assertEqual(2, scheduler.ProbeCount())
+    # The first is refused, the second answers.
+    scheduler.RunDueProbes()
+    self.assertEqual([fast], self.responded)
+    self.assertEqual(1, scheduler.ProbeCount())
+    # Not due again yet.
+    scheduler.RunDueProbes()
+    self.assertEqual(1, slow.attempts)
+    self.clock.now += launcher.ReadinessProbe.INTERVAL_SECONDS
+    scheduler.RunDueProbes()
+    self.assertEqual([fast, slow], self.responded)
+    self.assertEqual(0, scheduler.ProbeCount())
+
+  def testMaxAttempts(self):
+    scheduler = launcher.ProbeScheduler(self.clock)
+    FakeConnection.refusals = 5
+    probe = launcher.ReadinessProbe(8080, max_attempts=2, clock=self.clock,
+                                    connection_class=FakeConnection)
+    scheduler.AddProbe(probe, start_thread=False)
+    scheduler.RunDueProbes()
+    self.assertFalse(probe.Exhausted())
+    self.clock.now += launcher.ReadinessProbe.INTERVAL_SECONDS
+    scheduler.RunDueProbes()
+    self.assertTrue(probe.Exhausted())
+    self.assertEqual(0, scheduler.ProbeCount())
+
+  def testRemoveProbe(self):
+    scheduler = launcher.ProbeScheduler(self.clock)
+    probe = self.Probe()
+    scheduler.AddProbe(probe, start_thread=False)
+    scheduler.RemoveProbe(probe)
+    self.assertEqual(0, scheduler.ProbeCount())
+    scheduler.RunDueProbes()
+    self.assertEqual(0, probe.attempts)
+
+  def testThread(self):
+    scheduler = launcher.ProbeScheduler()
+    event = threading.Event()
+    probe = launcher.ReadinessProbe(
+        8080, callback=lambda probe: event.set(),
+        connection_class=FakeConnection)
+    scheduler.AddProbe(probe)
+    event.wait(5)
+    self.assertTrue(event.isSet())
+
+
+if __name__ == '__main__':
+  unittest.main()
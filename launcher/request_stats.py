@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Per-route request counts and latencies from dev_appserver output."""
+
+
+import array
+import re
+
+import readiness_probe
+
+
+class RouteStats(object):
+  """Counts and a latency histogram for one (method, route).
+
+  Latencies are counted in fixed buckets (see LATENCY_BUCKETS_MS), so
+  the memory used doesn't grow with the number of requests.
+  """
+
+  # Upper bounds (in ms) of the latency buckets.  There is one more
+  # bucket, for anything slower.
+  LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500,
+                        1000, 2000, 5000, 10000)
+
+  def __init__(self, method, route):
+    """Create a new RouteStats.
+
+    Args:
+      method: the HTTP method, such as 'GET'.
+      route: the normalized URL path (see RequestStats.Route()).
+    """
+    self.method = method
+    self.route = route
+    self.count = 0
+    # status_classes[n] counts nxx responses; [0] is for anything odd.
+    self.status_classes = array.array('L', [0] * 6)
+    self.latency_counts = array.array('L',
+                                      [0] * (len(self.LATENCY_BUCKETS_MS) + 1))
+    self.timed_count = 0
+    self.latency_total_ms = 0.0
+    self.latency_max_ms = 0.0
+
+  def AddRequest(self, status, latency_ms=None):
+    """Count one request.
+
+    Args:
+      status: the HTTP status code, an int.
+      latency_ms: how long the request took in ms, or None if unknown.
+    """
+    self.count += 1
+    status_class = status / 100
+    if not 1 <= status_class <= 5:
+      status_class = 0
+    self.status_classes[status_class] += 1
+    if latency_ms is not None:
+      bucket = 0
+      for bound in self.LATENCY_BUCKETS_MS:
+        if latency_ms <= bound:
+          break
+        bucket += 1
+      self.latency_counts[bucket] += 1
+      self.timed_count += 1
+      self.latency_total_ms += latency_ms
+      self.latency_max_ms = max(self.latency_max_ms, latency_ms)
+
+  def MeanLatency(self):
+    """Return the mean latency in ms, or None if no request was timed."""
+    if not self.timed_count:
+      return None
+    return self.latency_total_ms / self.timed_count
+
+  def MaxLatency(self):
+    """Return the slowest latency in ms, or None if no request was timed."""
+    if not self.timed_count:
+      return None
+    return self.latency_max_ms
+
+  def LatencyPercentile(self, fraction):
+    """Return an upper bound on a latency percentile, in ms.
+
+    Args:
+      fraction: the percentile as a fraction, such as 0.95.
+    Returns:
+      The upper bound of the bucket holding the percentile (or the
+      slowest latency seen, if that is lower), or None if no request
+      was timed.
+    """
+    if not self.timed_count:
+      return None
+    wanted = fraction * self.timed_count
+    seen = 0
+    for (bucket, count) in enumerate(self.latency_counts):
+      seen += count
+      if seen >= wanted and count:
+        if bucket < len(self.LATENCY_BUCKETS_MS):
+          return min(self.LATENCY_BUCKETS_MS[bucket], self.latency_max_ms)
+        break
+    return self.latency_max_ms
+
+
+class RequestStats(object):
+  """A streaming analyzer of the request lines in a project's output.
+
+  Request lines look like
+    INFO ... dev_appserver.py:2906] "GET /foo?x=1 HTTP/1.1" 200 -
+  with, for some servers, a latency such as '12ms' or '0.012s' later
+  on the line.  Each is counted by method and route, where the route
+  is the URL path with IDs (numbers and long hex strings) replaced by
+  placeholders, so /item/1 and /item/2 are counted together.
+  Requests made by the launcher's own ReadinessProbes are not counted.
+  """
+
+  # Routes beyond this many are all counted as OTHER_ROUTE.
+  MAX_ROUTES = 500
+  OTHER_ROUTE = '(other)'
+
+  _REQUEST_RE = re.compile(
+      r'"([A-Z]+) (\S+) HTTP/[0-9.]+" ([0-9]{3})(?: \S+)?'
+      r'(?:.*?\b([0-9]+(?:\.[0-9]+)?) ?(ms|s)\b)?')
+  _NUMBER_RE = re.compile(r'^(?:[0-9]+|[0-9a-fA-F]{16,})$')
+
+  def __init__(self):
+    # self._routes: maps (method, route) to a RouteStats
+    self._routes = {}
+    self.request_count = 0
+
+  def AddLines(self, lines):
+    """Count the requests in some output.
+
+    Args:
+      lines: complete lines of output, without their newlines (see
+        LineSplitter).
+    """
+    for line in lines:
+      if 'HTTP/' in line:
+        self.FeedLine(line)
+
+  def FeedLine(self, line):
+    """Count the request in a line, if there is one.
+
+    Args:
+      line: a line of output.
+    Returns:
+      True if the line was a request line we counted.
+    """
+    match = self._REQUEST_RE.search(line)
+    if not match:
+      return False
+    (method, url, status, latency, unit) = match.groups()
+    if readiness_probe.ReadinessProbe.IsProbeUrl(url):
+      return False
+    if latency is not None:
+      latency = float(latency)
+      if unit == 's':
+        latency *= 1000
+    key = (method, self.Route(url))
+    stats = self._routes.get(key)
+    if stats is None:
+      if len(self._routes) >= self.MAX_ROUTES:
+        key = (method, self.OTHER_ROUTE)
+        stats = self._routes.get(key)
+      if stats is None:
+        stats = self._routes[key] = RouteStats(*key)
+    stats.AddRequest(int(status), latency)
+    self.request_count += 1
+    return True
+
+  def Route(self, url):
+    """Return the route a URL is counted under.
+
+    Args:
+      url: the URL from a request line, such as '/item/12?x=1'.
+    """
+    path = url.split('?', 1)[0]
+    parts = path.split('/')
+    for (index, part) in enumerate(parts):
+      if self._NUMBER_RE.match(part):
+        parts[index] = '<id>'
+    return '/'.join(parts)
+
+  def Routes(self):
+    """Return a list of RouteStats, busiest first."""
+    routes = self._routes.values()
+    routes.sort(key=lambda stats: (-stats.count, stats.route, stats.method))
+    return routes
+
+  def Reset(self):
+    """Forget all counts."""
+    self._routes = {}
+    self.request_count = 0
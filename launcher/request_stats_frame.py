@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Window showing the request statistics of a project."""
+
+
+import wx
+import stats_frame
+
+
+class RequestStatsFrame(stats_frame.StatsFrame):
+  """Table of per-route request counts and latencies (view in MVC).
+
+  The table is refreshed from a RequestStats; see StatsFrame.
+  """
+
+  # Column labels, and a function of a RouteStats for each.
+  COLUMNS = (
+      ('Method', lambda s: s.method),
+      ('Route', lambda s: s.route),
+      ('Count', lambda s: str(s.count)),
+      ('2xx', lambda s: str(s.status_classes[2])),
+      ('3xx', lambda s: str(s.status_classes[3])),
+      ('4xx', lambda s: str(s.status_classes[4])),
+      ('5xx', lambda s: str(s.status_classes[5])),
+      ('Mean ms', lambda s: _FormatMs(s.MeanLatency())),
+      ('p50 ms', lambda s: _FormatMs(s.LatencyPercentile(0.5))),
+      ('p95 ms', lambda s: _FormatMs(s.LatencyPercentile(0.95))),
+      ('Max ms', lambda s: _FormatMs(s.MaxLatency())),
+  )
+
+  def __init__(self, project, stats):
+    """Create a new RequestStatsFrame.
+
+    Args:
+      project: the Project whose requests we show.
+      stats: the RequestStats for that project.
+    """
+    title = 'Request Stats (%s)' % project.name
+    super(RequestStatsFrame, self).__init__(project, stats, title,
+                                            size=(700, 300))
+    self._list.SetColumnWidth(1, 250)
+    sizer = wx.BoxSizer(wx.VERTICAL)
+    sizer.Add(self._list, 1, wx.EXPAND)
+    sizer.Add(self._ResetButton(), 0, wx.ALIGN_RIGHT | wx.ALL, 2)
+    self.SetSizer(sizer)
+    self.RefreshTable()
+
+  def RefreshTable(self):
+    """Fill the table with the current statistics."""
+    self._FillTable([[value(route_stats) for (_, value) in self.COLUMNS]
+                     for route_stats in self._model.Routes()])
+    self.SetStatusText('%d requests' % self._model.request_count)
+
+
+def _FormatMs(value):
+  """Format a latency in ms for the table; '' if unknown."""
+  if value is None:
+    return ''
+  return '%.0f' % value
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for request_stats.py"""
+
+import unittest
+import launcher
+
+
+class RequestStatsTest(unittest.TestCase):
+
+  def testRoute(self):
+    stats = launcher.RequestStats()
+    self.assertEqual('/item/<id>/edit', stats.Route('/item/123/edit?x=1'))
+    self.assertEqual('/blob/<id>', stats.Route('/blob/0123456789abcdef0'))
+    self.assertEqual('/v2/about', stats.Route('/v2/about'))
+
+  def testFeed(self):
+    stats = launcher.RequestStats()
+    prefix = 'INFO     2009-04-08 23:09:25,456 dev_appserver.py:2906] '
+    stats.AddLines([prefix + '"GET /item/1 HTTP/1.1" 200 -',
+                    prefix + '"GET /item/2?a=b HTTP/1.1" 500 - 1.5s',
+                    'INFO something else',
+                    prefix + '"POST /item/2 HTTP/1.0" 302 12 in 12ms'])
+    self.assertEqual(3, stats.request_count)
+    stats.AddLines([prefix + '"GET /item/3 HTTP/1.1" 200 - 3ms'])
+    self.assertEqual(4, stats.request_count)
+    routes = stats.Routes()
+    self.assertEqual(2, len(routes))
+    (get, post) = routes
+    self.assertEqual(('GET', '/item/<id>', 3),
+                     (get.method, get.route, get.count))
+    self.assertEqual(2, get.status_classes[2])
+    self.assertEqual(1, get.status_classes[5])
+    self.assertEqual(2, get.timed_count)
+    self.assertEqual(1500, get.MaxLatency())
+    self.assertEqual(751.5, get.MeanLatency())
+    self.assertEqual(5, get.LatencyPercentile(0.5))
+    self.assertEqual(1500, get.LatencyPercentile(0.95))
+    self.assertEqual(1, post.status_classes[3])
+    self.assertEqual(12, post.MaxLatency())
+    stats.Reset()
+    self.assertEqual([], stats.Routes())
+
+  def testProbesNotCounted(self):
+    stats = launcher.RequestStats()
+    stats.AddLines(['"GET /?launcher_probe=1 HTTP/1.1" 200 -',
+                    '"GET /ready?x=1&launcher_probe=1 HTTP/1.1" 200 -',
+                    '"GET /?x=1 HTTP/1.1" 200 -'])
+    self.assertEqual(1, stats.request_count)
+    self.assertEqual(1, len(stats.Routes()))
+
+  def testMaxRoutes(self):
+    stats = launcher.RequestStats()
+    stats.MAX_ROUTES = 2
+    for route in ('a', 'b', 'c', 'd'):
+      stats.FeedLine('"GET /%s HTTP/1.1" 200 -' % route)
+    routes = [r.route for r in stats.Routes()]
+    self.assertEqual(['(other)', '/a', '/b'], routes)
+
+  def testLatencyBuckets(self):
+    route = launcher.RouteStats('GET', '/')
+    self.assertEqual(None, route.LatencyPercentile(0.5))
+    for latency in (0.5, 3, 3, 30000):
+      route.AddRequest(200, latency)
+    self.assertEqual([1, 0, 2], list(route.latency_counts[:3]))
+    self.assertEqual(1, route.latency_counts[-1])
+    self.assertEqual(5, route.LatencyPercentile(0.75))
+    self.assertEqual(30000, route.LatencyPercentile(1.0))
+    route.AddRequest(999)
+    self.assertEqual(1, route.status_classes[0])
+    self.assertEqual(4, route.timed_count)
+
+
+if __name__ == '__main__':
+  unittest.main()
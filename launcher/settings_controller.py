@@ -58,12 +58,30 @@ class SettingsController(dialog_controller_base.DialogControllerBase):
     self.dialog.app_port_text_ctrl.SetValue(str(self._project.port))
     flagstring = ' '.join(self._project.flags) or ''
     self.dialog.full_flag_list_text_ctrl.SetValue(flagstring)
+    self.dialog.restart_policy_choice.SetSelection(
+        launcher.Project.RESTART_POLICIES.index(self._project.restart_policy))
+    self.dialog.launch_patterns_text_ctrl.SetValue(
+        '\n'.join(self._project.launch_patterns))
+    self.dialog.metrics_text_ctrl.SetValue('\n'.join(self._project.metrics))
 
   def _UpdateProject(self):
     """Update our project with values from the dialog.
 
-    This method is not called if the dialog is cancelled.
+    This method is not called if the dialog is cancelled.  The restart
+    policy, launch patterns and metrics may be changed while the
+    project runs; the launch patterns are used from its next run.
     """
+    patterns = self._ParseLines(
+        self.dialog.launch_patterns_text_ctrl.GetValue())
+    metrics = self._ParseLines(self.dialog.metrics_text_ctrl.GetValue())
+    error = self._CheckPatterns(patterns, metrics)
+    if error:
+      self.FailureMessage(error, 'Application Edit')
+      return
+    self._project.restart_policy = launcher.Project.RESTART_POLICIES[
+        self.dialog.restart_policy_choice.GetSelection()]
+    self._project.launch_patterns = patterns
+    self._project.metrics = metrics
     # TODO(jrg): yell about bad looking flags?
     port = int(self.dialog.app_port_text_ctrl.GetValue())
     flags = self._ParseFlags(self.dialog.full_flag_list_text_ctrl.GetValue())
@@ -78,6 +96,31 @@ class SettingsController(dialog_controller_base.DialogControllerBase):
       self._project.port = port
       self._project.flags = flags
 
+  def _ParseLines(self, text):
+    """Return the non-blank lines of some text, stripped."""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+  def _CheckPatterns(self, patterns, metrics):
+    """Check launch patterns and metric definitions.
+
+    Args:
+      patterns: a list of regular expressions.
+      metrics: a list of 'name=regexp' strings.
+    Returns:
+      A message about the first bad one, or None if all are good.
+    """
+    for pattern in patterns:
+      try:
+        re.compile(pattern)
+      except re.error, err:
+        return 'Bad launch pattern %s: %s' % (pattern, err)
+    for metric in metrics:
+      try:
+        launcher.MetricExtractor.FromSpec(metric)
+      except (ValueError, re.error), err:
+        return 'Bad metric %s: %s' % (metric, err)
+    return None
+
   def _ParseFlags(self, flagstring):
     """Parse command line flags from a string of flags.
 
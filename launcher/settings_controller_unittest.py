@@ -66,6 +66,14 @@ class SettingsControllerTest(unittest.TestCase):
     sc.dialog.full_flag_list_text_ctrl.SetValue('--bozo-assault')
     sc._UpdateProject()
     self.assertTrue('--bozo-assault' in project.flags)
+    # Then the restart policy, launch patterns and metrics.
+    sc.dialog.restart_policy_choice.SetSelection(2)
+    sc.dialog.launch_patterns_text_ctrl.SetValue('\n  Starting  \n\n')
+    sc.dialog.metrics_text_ctrl.SetValue('hits=cache hit\nms=(\\d+)ms')
+    sc._UpdateProject()
+    self.assertEqual('always', project.restart_policy)
+    self.assertEqual(['Starting'], project.launch_patterns)
+    self.assertEqual(['hits=cache hit', 'ms=(\\d+)ms'], project.metrics)
     # Deny a change if it's running
     failures = [0]
     def plusone(arg1, arg2):
@@ -84,6 +92,13 @@ class SettingsControllerTest(unittest.TestCase):
     sc.dialog.full_flag_list_text_ctrl.SetValue('--anti-clown-spray')
     sc._UpdateProject()
     self.assertEqual(1, failures[0])
+    failures[0] = 0
+    # A bad metric is refused, running or not.
+    project.runstate = launcher.Project.STATE_STOP
+    sc.dialog.metrics_text_ctrl.SetValue('no pattern here')
+    sc._UpdateProject()
+    self.assertEqual(1, failures[0])
+    self.assertEqual(['hits=cache hit', 'ms=(\\d+)ms'], project.metrics)
 
   def testParseFlags(self):
     project = launcher.Project('path', 9000)
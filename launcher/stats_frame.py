@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Base class for windows showing a table of a project's statistics."""
+
+
+import wx
+
+
+class StatsFrame(wx.Frame):
+  """A table refreshed from a model while shown (view in MVC).
+
+  Subclasses set COLUMNS (whose first items are the column labels),
+  lay out self._list with whatever else they show, and fill the table
+  in RefreshTable().  The model only needs a Reset() method.  The table
+  is refreshed every couple of seconds while the window is shown.  Like
+  a LogConsole, closing the window only hides it.
+  """
+
+  # Column labels, each followed by whatever the subclass needs.
+  COLUMNS = ()
+
+  # How often (in ms) we refresh the table while shown.
+  REFRESH_INTERVAL_MS = 2000
+
+  def __init__(self, project, model, title, size,
+               list_style=wx.LC_REPORT):
+    """Create a new StatsFrame.  Call RefreshTable() once laid out.
+
+    Args:
+      project: the Project whose statistics we show.
+      model: the object holding them.
+      title: the title for our window.
+      size: the initial size of our window.
+      list_style: the style of our wx.ListCtrl.
+    """
+    super(StatsFrame, self).__init__(None, -1, title, size=size)
+    self._project = project
+    self._model = model
+    self._list = wx.ListCtrl(self, -1, style=list_style)
+    for (index, column) in enumerate(self.COLUMNS):
+      self._list.InsertColumn(index, column[0])
+    self.CreateStatusBar()
+    self._timer = wx.Timer(self)
+    self.Bind(wx.EVT_TIMER, self.OnTimer, self._timer)
+    self.Bind(wx.EVT_CLOSE, self.CloseHandler)
+
+  def _ResetButton(self):
+    """Return a new Reset button, bound to OnReset()."""
+    reset = wx.Button(self, -1, 'Reset')
+    self.Bind(wx.EVT_BUTTON, self.OnReset, reset)
+    return reset
+
+  def RefreshTable(self):
+    """Fill the table from the model.  Subclasses must override."""
+    raise NotImplementedError()
+
+  def _FillTable(self, rows):
+    """Replace the table's contents.
+
+    Args:
+      rows: a list of rows, each a list of strings (one per column).
+    """
+    self._list.Freeze()
+    try:
+      self._list.DeleteAllItems()
+      for (index, row) in enumerate(rows):
+        self._list.InsertStringItem(index, row[0])
+        for (column, text) in enumerate(row[1:]):
+          self._list.SetStringItem(index, column + 1, text)
+    finally:
+      self._list.Thaw()
+
+  def DisplayAndBringToFront(self):
+    """Display the frame (if needed), pop it to the front and refresh it."""
+    self.RefreshTable()
+    self.Show()
+    self.Raise()
+    self._timer.Start(self.REFRESH_INTERVAL_MS)
+
+  def GetRows(self):
+    """Return the table as a list of rows of strings.  For unittests."""
+    rows = []
+    for row in range(self._list.GetItemCount()):
+      rows.append([self._list.GetItem(row, column).GetText()
+                   for column in range(len(self.COLUMNS))])
+    return rows
+
+  def OnTimer(self, event):
+    """Refresh while shown.  Called directly from UI."""
+    if self.IsShown():
+      self.RefreshTable()
+    else:
+      self._timer.Stop()
+
+  def OnReset(self, event):
+    """Forget the statistics so far.  Called directly from UI."""
+    self._model.Reset()
+    self.RefreshTable()
+
+  def CloseHandler(self, event):
+    """Hide rather than destroy, unless we must.  Called directly from UI."""
+    self._timer.Stop()
+    if not event.CanVeto():
+      self.Destroy()
+    else:
+      self.Show(False)
+      event.Veto()
+
+  @property
+  def project(self):
+    """The Project whose statistics we show."""
+    return self._project
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for stats_frame.py and the frames built on it."""
+
+import unittest
+import wx
+import launcher
+
+
+class FakeCounts(object):
+  """A model of a few named counts."""
+
+  def __init__(self):
+    self.counts = {}
+
+  def Reset(self):
+    self.counts = {}
+
+
+class CountsFrame(launcher.StatsFrame):
+  """A minimal StatsFrame."""
+
+  COLUMNS = (('Name',), ('Count',))
+
+  def __init__(self, project, counts):
+    super(CountsFrame, self).__init__(project, counts, 'Counts', (300, 200))
+    self.RefreshTable()
+
+  def RefreshTable(self):
+    self._FillTable([[name, str(count)]
+                     for (name, count) in sorted(self._model.counts.items())])
+
+
+class StatsFrameTest(unittest.TestCase):
+
+  def setUp(self):
+    # Must always create a wx.App first
+    self.app = wx.PySimpleApp()
+    self.project = launcher.Project('path', 8000, 'name')
+
+  def testRefreshAndReset(self):
+    counts = FakeCounts()
+    frame = CountsFrame(self.project, counts)
+    self.assertEqual(self.project, frame.project)
+    self.assertEqual([], frame.GetRows())
+    counts.counts = {'b': 2, 'a': 1}
+    frame.DisplayAndBringToFront()
+    self.assertEqual([['a', '1'], ['b', '2']], frame.GetRows())
+    frame.OnReset(None)
+    self.assertEqual([], frame.GetRows())
+
+  def testCloseHides(self):
+    frame = CountsFrame(self.project, FakeCounts())
+    frame.DisplayAndBringToFront()
+    frame.Close(force=False)
+    self.assertFalse(frame.IsShown())
+    self.assertFalse(frame._timer.IsRunning())
+
+  def testRequestStatsFrame(self):
+    stats = launcher.RequestStats()
+    stats.AddLines(['INFO     2009-04-08 23:09:25,456 dev_appserver.py:2906] '
+                    '"GET /a HTTP/1.1" 200 -'])
+    frame = launcher.RequestStatsFrame(self.project, stats)
+    rows = frame.GetRows()
+    self.assertEqual(1, len(rows))
+    self.assertEqual(['GET', '/a', '1', '1'], rows[0][:4])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""A single I/O thread for the output of all running tasks.
+
+Without this, every running project (and every deployment) gets its
+own thread blocked in readline().  The TaskMultiplexer owns the stdout
+pipes of all child processes instead, and uses poll (or epoll, if
+available) to read whichever of them have output.  It hands complete
+lines and exit codes back to the owning task.
+
+Windows can't poll pipes, so there TaskThreads keep using a thread
+each.  See TaskMultiplexer.IsSupported().
+"""
+
+
+import errno
+import logging
+import os
+import select
+import threading
+if os.name == 'posix':
+  import fcntl
+
+
+class TaskMultiplexer(object):
+  """Poll-driven reader of subprocess output for many tasks.
+
+  A task is any object with these attributes:
+    process: a subprocess.Popen whose stdout is a pipe
+    reader: a LineReader on process.stdout
+    _HandleOutputLine(line): called for each line of output
+    _HandleExit(code): called once the process has exited
+  Both callbacks are called on the multiplexer's thread.  If one
+  raises, we log it and stop reading that task's output (its exit is
+  still reported); every other task carries on.
+
+  All poller state is only touched by the multiplexer's own thread.
+  Other threads queue requests and wake it with a write to a pipe.
+  """
+
+  # How often (in seconds) we look for exited processes whose output
+  # has already hit EOF.
+  _REAP_INTERVAL = 0.1
+
+  # The shared instance; see Instance().
+  _instance = None
+
+  def __init__(self):
+    # self._lock: protects self._pending
+    # self._pending: tasks added by other threads, not yet being polled
+    # self._tasks: maps a pipe fd to its task
+    # self._reaping: tasks at EOF, waiting for their process to exit
+    self._lock = threading.Lock()
+    self._pending = []
+    self._tasks = {}
+    self._reaping = []
+    self._thread = None
+    (self._wake_read, self._wake_write) = os.pipe()
+    self._SetNonBlocking(self._wake_read)
+    if hasattr(select, 'epoll'):
+      self._poller = select.epoll()
+      self._read_mask = select.EPOLLIN | select.EPOLLHUP | select.EPOLLERR
+      self._poll_forever = -1
+      self._poll_scale = 1       # epoll timeouts are in seconds
+    else:
+      self._poller = select.poll()
+      self._read_mask = select.POLLIN | select.POLLHUP | select.POLLERR
+      self._poll_forever = None
+      self._poll_scale = 1000    # poll timeouts are in milliseconds
+    self._poller.register(self._wake_read, self._read_mask)
+
+  @staticmethod
+  def IsSupported():
+    """Return True if pipes can be multiplexed on this platform."""
+    return os.name == 'posix' and (hasattr(select, 'epoll') or
+                                   hasattr(select, 'poll'))
+
+  @classmethod
+  def Instance(cls):
+    """Return the shared TaskMultiplexer, creating it if needed."""
+    if not cls._instance:
+      cls._instance = cls()
+    return cls._instance
+
+  def AddTask(self, task):
+    """Start reading the output of a task's (already started) process.
+
+    Safe to call from any thread.
+
+    Args:
+      task: a task, as described in the class docstring.
+    """
+    self._lock.acquire()
+    try:
+      self._pending.append(task)
+      if not self._thread:
+        self._thread = threading.Thread(target=self._Run,
+                                        name='TaskMultiplexer')
+        self._thread.setDaemon(True)
+        self._thread.start()
+    finally:
+      self._lock.release()
+    self._Wake()
+
+  def TaskCount(self):
+    """Return the number of tasks we are currently watching."""
+    self._lock.acquire()
+    try:
+      return len(self._pending) + len(self._tasks) + len(self._reaping)
+    finally:
+      self._lock.release()
+
+  def _Wake(self):
+    """Wake our thread from poll() so it notices new requests."""
+    try:
+      os.write(self._wake_write, 'x')
+    except OSError:
+      pass  # pipe full; a wakeup is already on its way.
+
+  def _SetNonBlocking(self, fd):
+    """Put a file descriptor into non-blocking mode."""
+    flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+    fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+  def _Run(self):
+    """Main loop of the multiplexer thread.  Never returns."""
+    while True:
+      self._RegisterPendingTasks()
+      if self._reaping:
+        timeout = self._REAP_INTERVAL * self._poll_scale
+      else:
+        timeout = self._poll_forever
+      try:
+        events = self._poller.poll(timeout)
+      except (select.error, IOError, OSError), err:
+        if err.args[0] == errno.EINTR:
+          continue
+        raise
+      for (fd, unused_mask) in events:
+        if fd == self._wake_read:
+          self._DrainWakePipe()
+        else:
+          self._ReadTask(fd)
+      self._ReapExitedTasks()
+
+  def _RegisterPendingTasks(self):
+    """Start polling the pipes of tasks added since we last looked."""
+    self._lock.acquire()
+    try:
+      pending = self._pending
+      self._pending = []
+    finally:
+      self._lock.release()
+    for task in pending:
+      fd = task.process.stdout.fileno()
+      self._SetNonBlocking(fd)
+      self._tasks[fd] = task
+      self._poller.register(fd, self._read_mask)
+
+  def _DrainWakePipe(self):
+    """Empty the wakeup pipe; its contents have no meaning."""
+    try:
+      while os.read(self._wake_read, 4096):
+        pass
+    except OSError:
+      pass
+
+  def _ReadTask(self, fd):
+    """Read available output for the task on fd and pass on whole lines.
+
+    Only EOF or a failed read stops us reading the pipe.  A line the
+    task fails to handle is logged and skipped, so that neither it nor
+    the other tasks lose any more output.
+
+    Args:
+      fd: the readable (or hung up) pipe file descriptor
+    """
+    task = self._tasks[fd]
+    try:
+      lines = task.reader.Read()
+    except Exception:
+      logging.exception('Reading output of process %d failed; '
+                        'no longer reading it' % task.process.pid)
+      self._TaskOutputDone(fd, task)
+      return
+    failures = 0
+    for line in lines:
+      try:
+        task._HandleOutputLine(line)
+      except Exception:
+        if not failures:
+          logging.exception('Handling output of process %d failed' %
+                            task.process.pid)
+        failures += 1
+    if failures > 1:
+      logging.error('Handling %d more lines of output of process %d failed' %
+                    (failures - 1, task.process.pid))
+    if task.reader.at_eof:
+      self._TaskOutputDone(fd, task)
+
+  def _TaskOutputDone(self, fd, task):
+    """Stop polling a task's pipe (at EOF, or failed); wait for its exit.
+
+    Args:
+      fd: the pipe file descriptor
+      task: the task which owns fd
+    """
+    self._poller.unregister(fd)
+    del self._tasks[fd]
+    task.process.stdout.close()
+    self._reaping.append(task)
+
+  def _ReapExitedTasks(self):
+    """Report the exit of any process whose output has hit EOF."""
+    for task in self._reaping[:]:
+      code = task.process.poll()
+      if code is not None:
+        self._reaping.remove(task)
+        pid = task.process.pid
+        try:
+          task._HandleExit(code)
+        except Exception:
+          logging.exception('Handling exit of process %d failed' % pid)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unittests for task_multiplexer.py"""
+
+import subprocess
+import sys
+import threading
+import unittest
+import launcher
+
+
+class FakeTask(object):
+  """A minimal task, as described in TaskMultiplexer's docstring."""
+
+  def __init__(self, cmd):
+    self.process = subprocess.Popen(cmd,
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT)
+    self.reader = launcher.LineReader(self.process.stdout.fileno())
+    self.lines = []
+    self.code = None
+    self.done = threading.Event()
+
+  def _HandleOutputLine(self, line):
+    self.lines.append(line)
+
+  def _HandleExit(self, code):
+    self.code = code
+    self.done.set()
+
+
+class TaskMultiplexerTest(unittest.TestCase):
+
+  def testManyTasks(self):
+    if not launcher.TaskMultiplexer.IsSupported():
+      return
+    mux = launcher.TaskMultiplexer()
+    script = ('import sys\n'
+              'for i in range(5000): print "line", i\n'
+              'sys.stdout.write("no newline")\n'
+              'sys.exit(%d)')
+    tasks = [FakeTask([sys.executable, '-c', script % i]) for i in range(4)]
+    for task in tasks:
+      mux.AddTask(task)
+    for task in tasks:
+      task.done.wait(20)
+    for (i, task) in enumerate(tasks):
+      self.assertEqual(i, task.code)
+      self.assertEqual(5001, len(task.lines))
+      self.assertEqual('line 0\n', task.lines[0])
+      self.assertEqual('line 4999\n', task.lines[-2])
+      self.assertEqual('no newline', task.lines[-1])
+    self.assertEqual(0, mux.TaskCount())
+
+  def testFailingCallback(self):
+    """A line whose callback raises is skipped; reading goes on."""
+    if not launcher.TaskMultiplexer.IsSupported():
+      return
+    class FailingTask(FakeTask):
+      def _HandleOutputLine(self, line):
+        if line.endswith('7\n'):
+          raise ValueError('bad line')
+        FakeTask._HandleOutputLine(self, line)
+    mux = launcher.TaskMultiplexer()
+    script = 'for i in range(1000): print "line", i'
+    bad = FailingTask([sys.executable, '-c', script])
+    good = FakeTask([sys.executable, '-c', script])
+    mux.AddTask(bad)
+    mux.AddTask(good)
+    bad.done.wait(20)
+    good.done.wait(20)
+    self.assertEqual(1000, len(good.lines))
+    self.assertEqual(0, good.code)
+    self.assertEqual(900, len(bad.lines))
+    self.assertEqual('line 999\n', bad.lines[-1])
+    self.assertEqual(0, bad.code)
+    self.assertEqual(0, mux.TaskCount())
+
+  def testInstance(self):
+    if not launcher.TaskMultiplexer.IsSupported():
+      return
+    self.assertEqual(id(launcher.TaskMultiplexer.Instance()),
+                     id(launcher.TaskMultiplexer.Instance()))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Stopping all tasks together when the launcher exits."""
+
+
+import ConfigParser
+import logging
+import time
+
+
+class TaskShutdown(object):
+  """Stops a set of TaskThreads in parallel, within a deadline.
+
+  Start() asks every task to stop at once (TaskThread.stop() only
+  signals, so the tasks wind down together).  Poll() then notes which
+  have exited; once the deadline has passed, whatever is left is
+  killed outright (TaskThread.kill()), and we give up waiting
+  FORCE_WAIT_SECONDS after that.  The state of each task can be
+  saved, so the next launcher knows which were not cleanly stopped;
+  see Save() and LoadRecord().
+  """
+
+  DEFAULT_DEADLINE_SECONDS = 10.0
+  # Seconds to wait for killed tasks to exit before giving up on them.
+  FORCE_WAIT_SECONDS = 2.0
+
+  STATE_STOPPING = 'stopping'
+  STATE_STOPPED = 'stopped'
+  STATE_KILLING = 'killing'
+  STATE_KILLED = 'killed'
+  # States which mean a task was not cleanly stopped.
+  UNCLEAN_STATES = (STATE_STOPPING, STATE_KILLING, STATE_KILLED)
+
+  def __init__(self, threads, deadline_seconds=DEFAULT_DEADLINE_SECONDS,
+               clock=time.time):
+    """Create a new TaskShutdown.
+
+    Args:
+      threads: the TaskThreads to stop.
+      deadline_seconds: seconds the tasks have to stop before they
+        are killed.
+      clock: a function returning the time in seconds; for unittests.
+    """
+    # self._states: the state (STATE_STOPPING, etc) of each thread
+    # self._deadline: when we kill what's left, once started
+    # self._forced: True once we have killed what was left
+    self._threads = list(threads)
+    self._states = [self.STATE_STOPPING] * len(self._threads)
+    self._deadline_seconds = deadline_seconds
+    self._clock = clock
+    self._deadline = None
+    self._forced = False
+
+  def Start(self):
+    """Ask all the tasks to stop."""
+    self._deadline = self._clock() + self._deadline_seconds
+    for thread in self._threads:
+      try:
+        thread.stop()
+      except OSError, err:
+        logging.info('Cannot stop %s: %s' % (_Name(thread), err))
+    self.Poll()
+
+  def Poll(self):
+    """Note which tasks have exited, and kill the rest once past the deadline.
+
+    Returns:
+      True if we are done: all the tasks have exited, or we have
+      given up waiting for them.
+    """
+    for (index, thread) in enumerate(self._threads):
+      if not thread.isAlive():
+        if self._states[index] == self.STATE_STOPPING:
+          self._states[index] = self.STATE_STOPPED
+        elif self._states[index] == self.STATE_KILLING:
+          self._states[index] = self.STATE_KILLED
+    if self.StoppingCount() == 0:
+      return True
+    now = self._clock()
+    if not self._forced and now >= self._deadline:
+      self._Force()
+    return now >= self._deadline + self.FORCE_WAIT_SECONDS
+
+  def _Force(self):
+    """Kill the tasks which haven't exited."""
+    self._forced = True
+    for (index, thread) in enumerate(self._threads):
+      if self._states[index] == self.STATE_STOPPING:
+        logging.info('%s did not stop within %s seconds; killing it' %
+                     (_Name(thread), self._deadline_seconds))
+        self._states[index] = self.STATE_KILLING
+        try:
+          thread.kill()
+        except OSError, err:
+          logging.info('Cannot kill %s: %s' % (_Name(thread), err))
+
+  def StoppingCount(self):
+    """Return the number of tasks which haven't exited yet."""
+    return len([state for state in self._states
+                if state in (self.STATE_STOPPING, self.STATE_KILLING)])
+
+  def States(self):
+    """Return a list of (project, state) for each task, in the order given."""
+    return [(thread.project, state)
+            for (thread, state) in zip(self._threads, self._states)]
+
+  def Summary(self):
+    """Return a line per task, such as 'guestbook: stopping'."""
+    return '\n'.join(['%s: %s' % (_Name(thread), state)
+                      for (thread, state) in zip(self._threads, self._states)])
+
+  def Save(self, filename):
+    """Save the state of each task.
+
+    Args:
+      filename: the file to write, as read by LoadRecord().
+    """
+    parser = ConfigParser.ConfigParser()
+    for (index, (project, state)) in enumerate(self.States()):
+      section = 'task%d' % index
+      parser.add_section(section)
+      parser.set(section, 'name', getattr(project, 'name', ''))
+      parser.set(section, 'path', getattr(project, 'path', ''))
+      parser.set(section, 'state', state)
+    try:
+      output = open(filename, 'w')
+      try:
+        output.write('# Google App Engine Launcher: tasks at last exit\n')
+        parser.write(output)
+      finally:
+        output.close()
+    except IOError, err:
+      logging.info('Cannot save task states to %s: %s' % (filename, err))
+
+  @staticmethod
+  def LoadRecord(filename):
+    """Load the task states saved by Save().
+
+    Args:
+      filename: the file to read.
+    Returns:
+      A list of (project path, project name, state) tuples; empty if
+      the file doesn't exist or can't be read.
+    """
+    parser = ConfigParser.ConfigParser()
+    try:
+      parser.read([filename])
+    except ConfigParser.Error, err:
+      logging.info('Cannot load task states from %s: %s' % (filename, err))
+      return []
+    record = []
+    sections = [section for section in parser.sections()
+                if section.startswith('task') and section[4:].isdigit()]
+    sections.sort(key=lambda section: int(section[4:]))
+    for section in sections:
+      try:
+        record.append((parser.get(section, 'path'),
+                       parser.get(section, 'name'),
+                       parser.get(section, 'state')))
+      except ConfigParser.Error:
+        continue
+    return record
+
+
+def _Name(thread):
+  """Return the name of a TaskThread's project, for messages."""
+  return getattr(thread.project, 'name', None) or str(thread.project)
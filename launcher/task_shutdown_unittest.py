@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for task_shutdown.py"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import launcher
+import testutil
+
+
+class FakeProject(object):
+
+  def __init__(self, name):
+    self.name = name
+    self.path = '/tmp/' + name
+
+
+class FakeThread(object):
+  """A TaskThread which exits when stopped, or only when killed."""
+
+  def __init__(self, name, stubborn=False):
+    self.project = FakeProject(name)
+    self.stubborn = stubborn
+    self.alive = True
+    self.calls = []
+
+  def isAlive(self):
+    return self.alive
+
+  def stop(self):
+    self.calls.append('stop')
+    if not self.stubborn:
+      self.alive = False
+
+  def kill(self):
+    self.calls.append('kill')
+
+
+class TaskShutdownTest(unittest.TestCase):
+
+  def setUp(self):
+    self.clock = testutil.FakeClock()
+    self.dirname = tempfile.mkdtemp()
+    self.filename = os.path.join(self.dirname, 'shutdown.ini')
+
+  def tearDown(self):
+    shutil.rmtree(self.dirname)
+
+  def testAllStop(self):
+    threads = [FakeThread('a'), FakeThread('b')]
+    shutdown = launcher.TaskShutdown(threads, 5, self.clock)
+    shutdown.Start()
+    self.assertEqual(['stop'], threads[0].calls)
+    self.assertEqual(['stop'], threads[1].calls)
+    self.assertTrue(shutdown.Poll())
+    self.assertEqual(0, shutdown.StoppingCount())
+    self.assertEqual('a: stopped\nb: stopped', shutdown.Summary())
+
+  def testDeadline(self):
+    threads = [FakeThread('a'), FakeThread('slow', stubborn=True)]
+    shutdown = launcher.TaskShutdown(threads, 5, self.clock)
+    shutdown.Start()
+    self.assertFalse(shutdown.Poll())
+    self.assertEqual(1, shutdown.StoppingCount())
+    self.assertEqual('a: stopped\nslow: stopping', shutdown.Summary())
+    self.clock.now += 5
+    self.assertFalse(shutdown.Poll())
+    self.assertEqual(['stop', 'kill'], threads[1].calls)
+    self.assertEqual(['stop'], threads[0].calls)
+    self.assertEqual('slow: killing', shutdown.Summary().split('\n')[1])
+    # Killed only once.
+    self.assertFalse(shutdown.Poll())
+    self.assertEqual(['stop', 'kill'], threads[1].calls)
+    threads[1].alive = False
+    self.assertTrue(shutdown.Poll())
+    self.assertEqual([(threads[0].project, 'stopped'),
+                      (threads[1].project, 'killed')], shutdown.States())
+
+  def testGiveUp(self):
+    threads = [FakeThread('hung', stubborn=True)]
+    shutdown = launcher.TaskShutdown(threads, 5, self.clock)
+    shutdown.Start()
+    self.clock.now += 5
+    self.assertFalse(shutdown.Poll())
+    self.clock.now += launcher.TaskShutdown.FORCE_WAIT_SECONDS
+    self.assertTrue(shutdown.Poll())
+    self.assertEqual(1, shutdown.StoppingCount())
+    self.assertEqual('hung: killing', shutdown.Summary())
+
+  def testNoThreads(self):
+    shutdown = launcher.TaskShutdown([], 5, self.clock)
+    shutdown.Start()
+    self.assertTrue(shutdown.Poll())
+    self.assertEqual('', shutdown.Summary())
+
+  def testSaveAndLoad(self):
+    threads = [FakeThread('t%d' % i) for i in range(11)]
+    threads.append(FakeThread('slow', stubborn=True))
+    shutdown = launcher.TaskShutdown(threads, 5, self.clock)
+    shutdown.Start()
+    shutdown.Save(self.filename)
+    record = launcher.TaskShutdown.LoadRecord(self.filename)
+    self.assertEqual(12, len(record))
+    self.assertEqual(('/tmp/t0', 't0', 'stopped'), record[0])
+    self.assertEqual(('/tmp/t10', 't10', 'stopped'), record[10])
+    self.assertEqual(('/tmp/slow', 'slow', 'stopping'), record[11])
+
+  def testLoadMissing(self):
+    self.assertEqual([], launcher.TaskShutdown.LoadRecord(self.filename))
+    open(self.filename, 'w').write('not an ini file\n')
+    self.assertEqual([], launcher.TaskShutdown.LoadRecord(self.filename))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Restarting a project's task when it exits, as its restart policy says."""
+
+
+import collections
+import random
+import time
+import launcher
+
+
+class TaskSupervisor(object):
+  """Decides whether, and when, to restart one project's task.
+
+  Under the 'on-failure' policy a task is restarted when it dies;
+  under 'always', whenever it exits without being stopped by us.  The
+  delay before each restart doubles (from BASE_DELAY_SECONDS, up to
+  MAX_DELAY_SECONDS) while the task keeps exiting, with some random
+  jitter so projects which died together don't restart in lockstep;
+  a run of STABLE_SECONDS resets it.  If the task exits MAX_EXITS
+  times within EXIT_WINDOW_SECONDS it is crash looping, and we give
+  up until ResetBackoff().
+
+  We also keep the last CRASH_LINES lines of output of the current
+  run (see AddLines()), and when a task dies they are saved as a
+  crash report; the last MAX_CRASH_REPORTS are kept.
+  """
+
+  BASE_DELAY_SECONDS = 1.0
+  MAX_DELAY_SECONDS = 60.0
+  # Each delay is changed by up to this fraction, at random.
+  JITTER = 0.2
+  STABLE_SECONDS = 60.0
+  MAX_EXITS = 5
+  EXIT_WINDOW_SECONDS = 300.0
+  CRASH_LINES = 50
+  MAX_CRASH_REPORTS = 10
+
+  def __init__(self, clock=time.time, random_fraction=random.random):
+    """Create a new TaskSupervisor.
+
+    Args:
+      clock: a function returning the time in seconds; for unittests.
+      random_fraction: a function returning a random float in [0, 1);
+        for unittests.
+    """
+    # self._started: when the current run started, or None
+    # self._restarts: restarts since the last stable run
+    # self._exits: times of recent exits which we restarted after
+    # self._lines: the last CRASH_LINES lines of the current run
+    # self._crashes: (time, lines) of recent deaths, oldest first
+    self._clock = clock
+    self._random_fraction = random_fraction
+    self._started = None
+    self._restarts = 0
+    self._exits = collections.deque()
+    self._lines = collections.deque(maxlen=self.CRASH_LINES)
+    self._crashes = collections.deque(maxlen=self.MAX_CRASH_REPORTS)
+    self.gave_up = False
+
+  def TaskStarted(self):
+    """Note that a run of the task has started."""
+    self._started = self._clock()
+    self._lines.clear()
+
+  def AddLines(self, lines):
+    """Keep the end of the current run's output, for crash reports.
+
+    Args:
+      lines: complete lines of output, without their newlines (see
+        LineSplitter).
+    """
+    self._lines.extend(lines)
+
+  def TaskExited(self, policy, died, stopped, partial_line=''):
+    """Note that the task has exited, and decide whether to restart it.
+
+    Args:
+      policy: the project's restart policy (a Project.RESTART_* value).
+      died: True if the task failed (launcher.Project.STATE_DIED).
+      stopped: True if we stopped it, which is never restarted.
+      partial_line: any output after the last complete line, which
+        ends a crash report.
+    Returns:
+      The seconds to wait before restarting the task, or None if it
+      shouldn't be restarted.
+    """
+    now = self._clock()
+    if died:
+      lines = list(self._lines)
+      if partial_line:
+        lines.append(partial_line)
+      self._crashes.append((now, lines[-self.CRASH_LINES:]))
+    if self._started is not None and now - self._started >= self.STABLE_SECONDS:
+      self._restarts = 0
+    self._started = None
+    if stopped or self.gave_up:
+      return None
+    project_class = launcher.Project
+    if policy not in (project_class.RESTART_ON_FAILURE,
+                      project_class.RESTART_ALWAYS):
+      return None
+    if policy == project_class.RESTART_ON_FAILURE and not died:
+      return None
+    while self._exits and now - self._exits[0] >= self.EXIT_WINDOW_SECONDS:
+      self._exits.popleft()
+    self._exits.append(now)
+    if len(self._exits) >= self.MAX_EXITS:
+      self.gave_up = True
+      return None
+    delay = min(self.MAX_DELAY_SECONDS,
+                self.BASE_DELAY_SECONDS * 2 ** self._restarts)
+    self._restarts += 1
+    jitter = self.JITTER * (2 * self._random_fraction() - 1)
+    return delay * (1 + jitter)
+
+  def ResetBackoff(self):
+    """Forget recent exits (e.g. when the user runs the task again)."""
+    self._restarts = 0
+    self._exits.clear()
+    self.gave_up = False
+
+  def ExitCount(self):
+    """Return the number of exits counted toward giving up."""
+    return len(self._exits)
+
+  def CrashReports(self):
+    """Return a list of (time, lines of output) for recent deaths."""
+    return list(self._crashes)
+
+  def FormatCrashReports(self):
+    """Return the crash reports as text, newest first."""
+    if not self._crashes:
+      return 'No crashes.\n'
+    reports = []
+    for (when, lines) in reversed(self._crashes):
+      reports.append('--- Died at %s; last %d lines of output:\n%s\n' %
+                     (time.strftime('%Y-%m-%d %X', time.localtime(when)),
+                      len(lines), '\n'.join(lines)))
+    return '\n'.join(reports)
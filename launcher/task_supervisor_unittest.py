@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+#
+# Copyright 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Unittests for task_supervisor.py"""
+
+import unittest
+import launcher
+import testutil
+
+
+class TaskSupervisorTest(unittest.TestCase):
+
+  def setUp(self):
+    self.clock = testutil.FakeClock()
+    self.fraction = 0.5  # no jitter
+    self.supervisor = launcher.TaskSupervisor(self.clock,
+                                              lambda: self.fraction)
+
+  def Exit(self, policy='on-failure', died=True, stopped=False, ran=1):
+    """Start a run, let it go for ran seconds, and return the exit's delay."""
+    self.supervisor.TaskStarted()
+    self.clock.now += ran
+    return self.supervisor.TaskExited(policy, died, stopped)
+
+  def testPolicies(self):
+    self.assertEqual(None, self.Exit('never'))
+    self.assertEqual(None, self.Exit('on-failure', died=False))
+    self.assertEqual(1.0, self.Exit('on-failure'))
+    self.assertEqual(2.0, self.Exit('always', died=False))
+    self.assertEqual(None, self.Exit('always', stopped=True))
+    self.assertEqual(None, self.Exit(None))
+
+  def testBackoff(self):
+    self.supervisor.MAX_EXITS = 100
+    self.assertEqual(1.0, self.Exit())
+    self.assertEqual(2.0, self.Exit())
+    self.assertEqual(4.0, self.Exit())
+    self.fraction = 0.0
+    self.assertEqual(8.0 * 0.8, self.Exit())
+    # A stable run resets the delay.
+    self.fraction = 0.99
+    delay = self.Exit(ran=launcher.TaskSupervisor.STABLE_SECONDS)
+    self.assertTrue(1.0 < delay < 1.2)
+
+  def testMaxDelay(self):
+    self.supervisor.MAX_EXITS = 100
+    for i in range(10):
+      delay = self.Exit()
+    self.assertEqual(launcher.TaskSupervisor.MAX_DELAY_SECONDS, delay)
+
+  def testCrashLoop(self):
+    for i in range(launcher.TaskSupervisor.MAX_EXITS - 1):
+      self.assertNotEqual(None, self.Exit())
+    self.assertFalse(self.supervisor.gave_up)
+    self.assertEqual(None, self.Exit())
+    self.assertTrue(self.supervisor.gave_up)
+    self.assertEqual(None, self.Exit())
+    self.supervisor.ResetBackoff()
+    self.assertFalse(self.supervisor.gave_up)
+    self.assertEqual(1.0, self.Exit())
+
+  def testExitsOutsideWindow(self):
+    window = launcher.TaskSupervisor.EXIT_WINDOW_SECONDS
+    for i in range(launcher.TaskSupervisor.MAX_EXITS * 2):
+      self.assertNotEqual(None, self.Exit(ran=window / 2))
+    self.assertEqual(2, self.supervisor.ExitCount())
+
+  def testCrashReports(self):
+    self.supervisor.TaskStarted()
+    lines = ['line %d' % i for i in range(100)]
+    self.supervisor.AddLines(lines[:60])
+    self.supervisor.AddLines(lines[60:-1])
+    self.supervisor.TaskExited('never', True, False, lines[-1])
+    reports = self.supervisor.CrashReports()
+    self.assertEqual(1, len(reports))
+    self.assertEqual(launcher.TaskSupervisor.CRASH_LINES, len(reports[0][1]))
+    self.assertEqual(lines[-launcher.TaskSupervisor.CRASH_LINES:],
+                     reports[0][1])
+    # A clean exit isn't a crash; a new run starts a new report.
+    self.supervisor.TaskStarted()
+    self.supervisor.AddLines(['fine'])
+    self.supervisor.TaskExited('never', False, False)
+    self.supervisor.TaskStarted()
+    self.supervisor.AddLines(['oops'])
+    self.supervisor.TaskExited('never', True, False)
+    self.assertEqual(['oops'], self.supervisor.CrashReports()[-1][1])
+    text = self.supervisor.FormatCrashReports()
+    self.assertTrue(text.index('oops') < text.index('line 99'))
+    self.assertEqual('No crashes.\n',
+                     launcher.TaskSupervisor().FormatCrashReports())
+
+
+if __name__ == '__main__':
+  unittest.main()
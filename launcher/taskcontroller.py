@@ -18,6 +18,7 @@
 import logging
 import os
 import subprocess
+import time
 import webbrowser
 import wx
 import launcher
@@ -30,6 +31,15 @@ class TaskController(object):
   Tasks are running instances of App Engine projects.
   """
 
+  # How often (in ms) we check on tasks while waiting for them to stop.
+  _SHUTDOWN_POLL_MS = 100
+
+  # How often (in ms) the HangWatchdog checks running tasks.
+  _WATCHDOG_INTERVAL_MS = 5000
+
+  # How often (in ms) exited orphans handed to us are reaped.
+  _REAP_INTERVAL_MS = 10000
+
   def __init__(self, app_controller):
     """Create a new TaskController.
 
@@ -39,10 +49,66 @@ class TaskController(object):
     self._app_controller = app_controller
     # self._frame: the main frame for project display
     # self._threads: an array of threads for running App Engine applicatons
-    # self._consoles: an array of LogConsoles for App Engine applications
+    # self._deploy_controllers: the DeployControllers which may still
+    #   have deployments running
+    # self._shut_down: True once Shutdown() has been called
+    # self._shutdown: the TaskShutdown being waited on, or None
+    # self._shutdown_dialog: the dialog showing its progress, or None
+    # self._shutdown_callback: called when the wait is over
+    # self._consoles: an array of LogConsoles for App Engine applications,
+    #   made only when a project's output is first shown
+    # self._project_logs: ProjectLogs, indexed by project
+    # self._merged_consoles: an array of MergedLogConsoles
+    # self._journals: LogJournals (or None if we couldn't make one),
+    #   indexed by project
+    # self._line_splitters: LineSplitters of output, indexed by project
+    # self._request_stats: RequestStats, indexed by project
+    # self._repeat_folders: RepeatFolders (or None if folding is off),
+    #   indexed by project
+    # self._stats_frames: an array of RequestStatsFrames
+    # self._error_groups: ErrorGroups, indexed by project
+    # self._errors_frames: an array of ErrorsFrames
+    # self._metrics: ProjectMetrics, indexed by project
+    # self._metrics_frames: an array of MetricsFrames
+    # self._alert_monitors: AlertMonitors, indexed by project
+    # self._supervisors: TaskSupervisors, indexed by project
+    # self._restart_timers: wx.CallLaters due to restart a project's
+    #   task, indexed by project
+    # self._watchdog: our HangWatchdog, once made
+    # self._watchdog_timer: the wx.CallLater due to run the watchdog
+    # self._reap_timer: the wx.CallLater due to reap orphans
+    # self._hung_threads: threads we killed for hanging, so to be
+    #   restarted as though they had died
+    # self._alert_patterns: the preference value self._alert_rules
+    #   were made from
     self._frame = None
     self._threads = []
+    self._deploy_controllers = []
+    self._shut_down = False
+    self._shutdown = None
+    self._shutdown_dialog = None
+    self._shutdown_callback = None
     self._consoles = []
+    self._project_logs = {}
+    self._merged_consoles = []
+    self._journals = {}
+    self._line_splitters = {}
+    self._request_stats = {}
+    self._repeat_folders = {}
+    self._stats_frames = []
+    self._error_groups = {}
+    self._errors_frames = []
+    self._metrics = {}
+    self._metrics_frames = []
+    self._alert_monitors = {}
+    self._supervisors = {}
+    self._restart_timers = {}
+    self._watchdog = None
+    self._watchdog_timer = None
+    self._reap_timer = None
+    self._hung_threads = []
+    self._alert_patterns = None
+    self._alert_rules = launcher.AlertRules([])
     self._runtime = None
     self._platform = launcher.Platform()
     self._preferences = None
@@ -96,9 +162,17 @@ class TaskController(object):
                       'appropriate measure to fix it (e.g. install Python).'
                       % project.path)
       else:
-        t = self._CreateTaskThreadForProject(project, cmd)
-        t.start()
-        self._threads.append(t)
+        self._CancelRestart(project)
+        self._FindOrCreateSupervisor(project).ResetBackoff()
+        self._StartTask(project, cmd)
+
+  def _StartTask(self, project, cmd):
+    """Start a task thread running cmd for project."""
+    t = self._CreateTaskThreadForProject(project, cmd)
+    t.start()
+    self._threads.append(t)
+    self._ScheduleWatchdog()
+    self._ScheduleReap()
 
   def _OpenFile(self, path, run_open_cmd):
     """Open file in browser.
@@ -158,7 +232,8 @@ class TaskController(object):
       thread = self._FindThreadForProject(project)
       if not thread:
         if project.runstate == launcher.Project.STATE_DIED:
-          # Just clearing out a stop.
+          # Just clearing out a stop (and any restart on its way).
+          self._CancelRestart(project)
           project.runstate = launcher.Project.STATE_STOP
           self.RunStateChanged(project)
         else:
@@ -187,13 +262,111 @@ class TaskController(object):
     Args:
       project: the Project associated (or to be associated with) the LogConsole
     """
+    # A destroyed console is false; see LogConsole.CloseHandler().
+    self._consoles = [console for console in self._consoles if console]
     for console in self._consoles:
       if project == console.project:
         return console
-    console = launcher.LogConsole(project)
+    virtual_view = bool(self._preferences and self._preferences[
+        launcher.Preferences.PREF_VIRTUAL_LOG_VIEW])
+    console = launcher.LogConsole(
+        project, virtual_view=virtual_view,
+        project_log=self._FindOrCreateProjectLog(project))
+    console.SetOutputRateLimit(self._OutputRateLimit())
     self._consoles.append(console)
     return console
 
+  def _FindOrCreateProjectLog(self, project):
+    """Find and return the launcher.ProjectLog for project; create if needed.
+
+    Output is kept here from the first line, but a LogConsole to show
+    it is only made when asked for (see Logs()).
+
+    Args:
+      project: the Project whose output the log keeps
+    """
+    if project not in self._project_logs:
+      (max_lines, max_bytes) = self._LogLimits()
+      self._project_logs[project] = launcher.ProjectLog(
+          max_lines, max_bytes, journal=self._FindOrCreateJournal(project))
+    return self._project_logs[project]
+
+  def _FindOrCreateJournal(self, project):
+    """Find and return the launcher.LogJournal for project; create if needed.
+
+    Args:
+      project: the Project whose output the journal records
+    Returns:
+      A LogJournal, or None if one can't be created.
+    """
+    if project not in self._journals:
+      journal = None
+      try:
+        directory = self._platform.LogDirectory()
+        filename = launcher.LogJournal.FilenameForProject(directory, project)
+        journal = launcher.LogJournal(filename)
+      except (IOError, OSError), err:
+        # Not worth a dialog; the in-memory LogStore still works.
+        logging.info('Cannot keep a log journal for %s: %s' %
+                     (project.name, err))
+      self._journals[project] = journal
+    return self._journals[project]
+
+  def _FindOrCreateRepeatFolder(self, project):
+    """Find and return the RepeatFolder for project; create if needed.
+
+    Args:
+      project: the Project whose output is folded
+    Returns:
+      A RepeatFolder, or None if folding is turned off in preferences.
+    """
+    if project not in self._repeat_folders:
+      folder = None
+      if not (self._preferences and self._preferences[
+          launcher.Preferences.PREF_NO_FOLD_REPEATS]):
+        folder = launcher.RepeatFolder()
+      self._repeat_folders[project] = folder
+    return self._repeat_folders[project]
+
+  def _LogLimits(self):
+    """Return the (max lines, max bytes) of output kept per project.
+
+    Taken from preferences; bad or missing values fall back to the
+    LogStore defaults.
+    """
+    limits = [launcher.LogStore.DEFAULT_MAX_LINES,
+              launcher.LogStore.DEFAULT_MAX_BYTES]
+    if not self._preferences:
+      return tuple(limits)
+    for (index, pref, scale) in (
+        (0, launcher.Preferences.PREF_LOG_MAX_LINES, 1),
+        (1, launcher.Preferences.PREF_LOG_MAX_MEGABYTES, 1024 * 1024)):
+      try:
+        value = int(float(self._preferences[pref]) * scale)
+      except (TypeError, ValueError):
+        continue
+      if value > 0:
+        limits[index] = value
+    return tuple(limits)
+
+  def _OutputRateLimit(self):
+    """Return the lines per second of output a console shows in full.
+
+    Taken from preferences; a bad or missing value falls back to the
+    OutputThrottle default.
+    """
+    default = launcher.OutputThrottle.DEFAULT_MAX_LINES_PER_SECOND
+    if not self._preferences:
+      return default
+    pref = launcher.Preferences.PREF_LOG_MAX_LINES_PER_SECOND
+    try:
+      value = int(self._preferences[pref])
+    except (TypeError, ValueError):
+      return default
+    if value <= 0:
+      return default
+    return value
+
   def StopAll(self, _=None):
     """Stop all projects.
 
@@ -202,6 +375,110 @@ class TaskController(object):
     """
     [t.stop() for t in self._threads]  # t.stop() is async.
 
+  def Shutdown(self, callback, progress_dialog_class=wx.ProgressDialog):
+    """Stop all tasks (deployments too) before the launcher exits.
+
+    The tasks are stopped together.  While they wind down, a timer
+    checks on them, shows how each is doing, and kills whatever is
+    left at the deadline (see launcher.TaskShutdown); the event loop
+    keeps running meanwhile.  Once they have all exited (or we have
+    given up on them), callback is called, so the app can exit.  How
+    each was stopped is saved for ReportLastShutdown() at the next
+    startup.  Only the first call does anything.
+
+    Args:
+      callback: called with no args when the tasks are done.
+      progress_dialog_class: the class of dialog to show progress in;
+        for unittests.
+    """
+    if self._shut_down:
+      return
+    self._shut_down = True
+    threads = list(self._threads)
+    for dc in self._deploy_controllers:
+      threads.extend(dc.TaskThreads())
+    threads = [t for t in threads if t.isAlive()]
+    self._shutdown = launcher.TaskShutdown(threads, self._ShutdownDeadline())
+    self._shutdown_callback = callback
+    self._shutdown.Start()
+    # Saved now too, so a launcher which dies while waiting is noticed.
+    self._shutdown.Save(self._platform.ShutdownFile())
+    if not self._shutdown.StoppingCount():
+      self._ShutdownDone()
+      return
+    self._shutdown_dialog = progress_dialog_class(
+        'Stopping applications', self._shutdown.Summary(),
+        maximum=len(threads), style=wx.PD_APP_MODAL | wx.PD_ELAPSED_TIME)
+    wx.CallLater(self._SHUTDOWN_POLL_MS, self._OnShutdownTimer)
+
+  def _OnShutdownTimer(self):
+    """Check on the tasks being stopped; see Shutdown()."""
+    shutdown = self._shutdown
+    if not shutdown.Poll():
+      total = len(shutdown.States())
+      self._shutdown_dialog.Update(total - shutdown.StoppingCount(),
+                                   shutdown.Summary())
+      wx.CallLater(self._SHUTDOWN_POLL_MS, self._OnShutdownTimer)
+      return
+    self._shutdown_dialog.Destroy()
+    self._shutdown_dialog = None
+    self._ShutdownDone()
+
+  def _ShutdownDone(self):
+    """Save how the tasks were stopped, and call the Shutdown() callback."""
+    self._shutdown.Save(self._platform.ShutdownFile())
+    self._shutdown = None
+    callback = self._shutdown_callback
+    self._shutdown_callback = None
+    callback()
+
+  def _ShutdownDeadline(self):
+    """Return the seconds tasks have to stop when the launcher exits.
+
+    Taken from preferences; a bad or missing value falls back to the
+    TaskShutdown default.
+    """
+    default = launcher.TaskShutdown.DEFAULT_DEADLINE_SECONDS
+    if not self._preferences:
+      return default
+    pref = launcher.Preferences.PREF_SHUTDOWN_DEADLINE_SECONDS
+    try:
+      value = float(self._preferences[pref])
+    except (TypeError, ValueError):
+      return default
+    if value < 0:
+      return default
+    return value
+
+  def ReportLastShutdown(self, projects):
+    """Note in their output which projects weren't cleanly stopped last time.
+
+    Reads (and then removes) the record Shutdown() saved when the
+    launcher last exited.
+
+    Args:
+      projects: the projects we know of.
+    """
+    filename = self._platform.ShutdownFile()
+    record = launcher.TaskShutdown.LoadRecord(filename)
+    if os.path.exists(filename):
+      try:
+        os.remove(filename)
+      except OSError, err:
+        logging.info('Cannot remove %s: %s' % (filename, err))
+    by_path = dict([(project.path, project) for project in projects])
+    for (path, name, state) in record:
+      if state not in launcher.TaskShutdown.UNCLEAN_STATES:
+        continue
+      logging.info('%s was not cleanly stopped at last exit (%s)' %
+                   (name or path, state))
+      project = by_path.get(path)
+      if project:
+        self.DisplayProjectOutput(
+            project, time.strftime('%Y-%m-%d %X') +
+            ' (Not cleanly stopped when the launcher last exited: %s)\n\n' %
+            state)
+
   def _FindThreadForProject(self, project):
     """Find and return the launcher.TaskThread for project, or None.
 
@@ -222,6 +499,162 @@ class TaskController(object):
       console = self._FindOrCreateConsole(project)
       console.DisplayAndBringToFront()
 
+  def MergedLogs(self, event):
+    """Display one Console window merging the selected projects' output.
+
+    Called directly from UI.
+    """
+    projects = self._frame.SelectedProjects()
+    if projects:
+      console = self._FindOrCreateMergedConsole(projects)
+      console.DisplayAndBringToFront()
+
+  def _FindOrCreateMergedConsole(self, projects):
+    """Find and return the launcher.MergedLogConsole for some projects.
+
+    Args:
+      projects: a list of the projects whose output is merged
+    """
+    self._merged_consoles = [console for console in self._merged_consoles
+                             if console]
+    for console in self._merged_consoles:
+      if set(console.projects) == set(projects):
+        return console
+    stores = [self._FindOrCreateProjectLog(project).store
+              for project in projects]
+    (max_lines, max_bytes) = self._LogLimits()
+    virtual_view = bool(self._preferences and self._preferences[
+        launcher.Preferences.PREF_VIRTUAL_LOG_VIEW])
+    console = launcher.MergedLogConsole(projects, stores, max_lines,
+                                        max_bytes, virtual_view=virtual_view)
+    console.SetOutputRateLimit(self._OutputRateLimit())
+    self._merged_consoles.append(console)
+    return console
+
+  def Stats(self, event):
+    """Display the request stats for the project(s) selected in the main frame.
+
+    Called directly from UI.
+    """
+    for project in self._frame.SelectedProjects():
+      frame = self._FindOrCreateStatsFrame(project)
+      frame.DisplayAndBringToFront()
+
+  def _FindOrCreateStatsFrame(self, project):
+    """Find and return the launcher.RequestStatsFrame for project.
+
+    Args:
+      project: the project whose request stats we want to show
+    """
+    for frame in self._stats_frames:
+      if frame.project == project:
+        return frame
+    frame = launcher.RequestStatsFrame(
+        project, self._FindOrCreateRequestStats(project))
+    self._stats_frames.append(frame)
+    return frame
+
+  def _FindOrCreateLineSplitter(self, project):
+    """Find and return the launcher.LineSplitter for project's output."""
+    if project not in self._line_splitters:
+      self._line_splitters[project] = launcher.LineSplitter()
+    return self._line_splitters[project]
+
+  def _FindOrCreateRequestStats(self, project):
+    """Find and return the launcher.RequestStats for project."""
+    if project not in self._request_stats:
+      self._request_stats[project] = launcher.RequestStats()
+    return self._request_stats[project]
+
+  def Errors(self, event):
+    """Display the tracebacks of the project(s) selected in the main frame.
+
+    Called directly from UI.
+    """
+    for project in self._frame.SelectedProjects():
+      frame = self._FindOrCreateErrorsFrame(project)
+      frame.DisplayAndBringToFront()
+
+  def _FindOrCreateErrorsFrame(self, project):
+    """Find and return the launcher.ErrorsFrame for project.
+
+    Args:
+      project: the project whose tracebacks we want to show
+    """
+    for frame in self._errors_frames:
+      if frame.project == project:
+        return frame
+    frame = launcher.ErrorsFrame(project,
+                                 self._FindOrCreateErrorGroups(project))
+    self._errors_frames.append(frame)
+    return frame
+
+  def _FindOrCreateErrorGroups(self, project):
+    """Find and return the launcher.ErrorGroups for project."""
+    if project not in self._error_groups:
+      self._error_groups[project] = launcher.ErrorGroups()
+    return self._error_groups[project]
+
+  def Metrics(self, event):
+    """Display the metrics of the project(s) selected in the main frame.
+
+    Called directly from UI.
+    """
+    for project in self._frame.SelectedProjects():
+      frame = self._FindOrCreateMetricsFrame(project)
+      frame.DisplayAndBringToFront()
+
+  def _FindOrCreateMetricsFrame(self, project):
+    """Find and return the launcher.MetricsFrame for project.
+
+    Args:
+      project: the project whose metrics we want to show
+    """
+    for frame in self._metrics_frames:
+      if frame.project == project:
+        return frame
+    frame = launcher.MetricsFrame(project,
+                                  self._FindOrCreateMetrics(project))
+    self._metrics_frames.append(frame)
+    return frame
+
+  def _FindOrCreateMetrics(self, project):
+    """Find and return the launcher.ProjectMetrics for project.
+
+    The metrics are given the project's current metric definitions.
+    """
+    specs = getattr(project, 'metrics', None) or []
+    if project not in self._metrics:
+      self._metrics[project] = launcher.ProjectMetrics.FromSpecs(specs)
+    metrics = self._metrics[project]
+    metrics.SetSpecs(specs)
+    return metrics
+
+  def _FindOrCreateAlertMonitor(self, project):
+    """Find and return the launcher.AlertMonitor for project.
+
+    The monitor is given the current alert rules.
+    """
+    if project not in self._alert_monitors:
+      self._alert_monitors[project] = launcher.AlertMonitor(
+          self._AlertRules())
+    monitor = self._alert_monitors[project]
+    monitor.rules = self._AlertRules()
+    return monitor
+
+  def _AlertRules(self):
+    """Return the AlertRules from preferences.
+
+    They are compiled again only when the preference changes.
+    """
+    value = None
+    if self._preferences:
+      value = self._preferences[launcher.Preferences.PREF_ALERT_PATTERNS]
+    if value != self._alert_patterns:
+      self._alert_patterns = value
+      self._alert_rules = launcher.AlertRules.FromPreference(value)
+    return self._alert_rules
+
   def SdkConsole(self, event):
     """Opens the local SDK Administration console.
 
@@ -287,7 +720,11 @@ class TaskController(object):
     dc = deploy_controller or launcher.DeployController(self._runtime,
                                                         launcher.Preferences(),
                                                         project_list)
+    self._deploy_controllers = [old for old in self._deploy_controllers
+                                if old.TaskThreads()]
+    self._deploy_controllers.append(dc)
     dc.InitiateDeployment()
+    self._ScheduleReap()
 
   def Dashboard(self, event):
     """Opens the App Engine Dashboard for the currently selected project(s).
@@ -308,8 +745,171 @@ class TaskController(object):
       project: the project whose run state has changed
     """
     self._app_controller.RefreshMainView()
+    self._SuperviseProject(project)
     self._DeleteThreadIfNeeded(project)
 
+  def _SuperviseProject(self, project):
+    """Arrange to restart a project's task, if its restart policy says so.
+
+    Args:
+      project: the project whose run state has changed
+    """
+    if project.runstate == launcher.Project.STATE_STARTING:
+      self._FindOrCreateSupervisor(project).TaskStarted()
+      return
+    if project.runstate not in (launcher.Project.STATE_STOP,
+                                launcher.Project.STATE_DIED):
+      return
+    thread = self._FindThreadForProject(project)
+    if not thread:
+      return
+    supervisor = self._FindOrCreateSupervisor(project)
+    gave_up = supervisor.gave_up
+    hung = thread in self._hung_threads
+    if hung:
+      self._hung_threads.remove(thread)
+    delay = supervisor.TaskExited(
+        getattr(project, 'restart_policy', None),
+        hung or project.runstate == launcher.Project.STATE_DIED,
+        (thread.killed and not hung) or self._shut_down,
+        self._FindOrCreateLineSplitter(project).PartialLine())
+    if delay is not None:
+      self.DisplayProjectOutput(
+          project, '(Restarting in %.1f seconds)\n' % delay)
+      self._restart_timers[project] = wx.CallLater(
+          int(delay * 1000), self._RestartProject, project, thread.cmd)
+    elif supervisor.gave_up and not gave_up:
+      message = ('Exited %d times in %d seconds; not restarting again '
+                 'until run by hand' % (supervisor.ExitCount(),
+                                        supervisor.EXIT_WINDOW_SECONDS))
+      self.DisplayProjectOutput(project, '(%s)\n' % message)
+      if self._frame:
+        self._frame.ShowAlert(project, 'crash loop', message)
+
+  def _RestartProject(self, project, cmd):
+    """Restart a project's task, unless it has been run or stopped since.
+
+    Called on the main thread by a timer set by _SuperviseProject().
+    """
+    if self._restart_timers.pop(project, None) is None:
+      return
+    if self._shut_down or self._FindThreadForProject(project):
+      return
+    self._StartTask(project, cmd)
+
+  def _CancelRestart(self, project):
+    """Cancel a restart of a project's task which is on its way."""
+    timer = self._restart_timers.pop(project, None)
+    if timer:
+      timer.Stop()
+
+  def _ScheduleWatchdog(self):
+    """Arrange for the HangWatchdog to check our tasks soon."""
+    if not self._watchdog_timer:
+      self._watchdog_timer = wx.CallLater(self._WATCHDOG_INTERVAL_MS,
+                                          self._OnWatchdogTimer)
+
+  def _OnWatchdogTimer(self):
+    """Check running tasks for hangs.  Called on the main thread by a timer.
+
+    A project which hangs is marked unresponsive.  If its restart
+    policy would restart it, it is killed, and restarted as though it
+    had died.  The timer stops when no tasks are left.
+    """
+    self._watchdog_timer = None
+    timeout = self._HangTimeout()
+    if self._shut_down or not timeout:
+      return
+    if not self._watchdog:
+      self._watchdog = launcher.HangWatchdog(timeout, self._platform)
+    self._watchdog.timeout_seconds = timeout
+    running = [thread for thread in self._threads
+               if thread.project.runstate == launcher.Project.STATE_RUN]
+    (hung, recovered) = self._watchdog.Check(running)
+    for thread in hung:
+      self._ProjectHung(thread, timeout)
+    for thread in recovered:
+      thread.project.unresponsive = False
+      self.DisplayProjectOutput(thread.project, '(Responsive again)\n')
+    if hung or recovered:
+      self._app_controller.RefreshMainView()
+    if self._threads:
+      self._ScheduleWatchdog()
+
+  def _ScheduleReap(self):
+    """Arrange for exited orphans to be reaped soon."""
+    if not self._reap_timer:
+      self._reap_timer = wx.CallLater(self._REAP_INTERVAL_MS,
+                                      self._OnReapTimer)
+
+  def _OnReapTimer(self):
+    """Reap exited orphans.  Called on the main thread by a timer.
+
+    Once a task has started we may be handed orphans (see
+    Platform.ReapOrphans()) at any time, such as the helpers of a
+    browser we opened, so the timer keeps going until shutdown.
+    """
+    self._reap_timer = None
+    if self._shut_down:
+      return
+    self._platform.ReapOrphans()
+    self._ScheduleReap()
+
+  def _ProjectHung(self, thread, timeout):
+    """Mark a project whose task has hung, and kill it if it'd be restarted.
+
+    Args:
+      thread: the task thread of the project.
+      timeout: the seconds it went without a sign of life.
+    """
+    project = thread.project
+    project.unresponsive = True
+    message = ('No output, CPU time or HTTP response for %d seconds' %
+               timeout)
+    self.DisplayProjectOutput(project, '(Unresponsive: %s)\n' % message)
+    if self._frame:
+      self._frame.ShowAlert(project, 'unresponsive', message)
+    if getattr(project, 'restart_policy', None) in (
+        launcher.Project.RESTART_ON_FAILURE, launcher.Project.RESTART_ALWAYS):
+      self.DisplayProjectOutput(project, '(Killing it, to be restarted)\n')
+      self._hung_threads.append(thread)
+      thread.kill()
+
+  def _HangTimeout(self):
+    """Return the seconds a task may go without a sign of life; 0 for ever.
+
+    Taken from preferences; a bad or missing value falls back to the
+    HangWatchdog default.
+    """
+    default = launcher.HangWatchdog.DEFAULT_TIMEOUT_SECONDS
+    if not self._preferences:
+      return default
+    pref = launcher.Preferences.PREF_HANG_TIMEOUT_SECONDS
+    try:
+      value = float(self._preferences[pref])
+    except (TypeError, ValueError):
+      return default
+    if value < 0:
+      return default
+    return value
+
+  def _FindOrCreateSupervisor(self, project):
+    """Find and return the launcher.TaskSupervisor for project."""
+    if project not in self._supervisors:
+      self._supervisors[project] = launcher.TaskSupervisor()
+    return self._supervisors[project]
+
+  def CrashReports(self, event):
+    """Display the recent crashes of the project(s) selected in the main frame.
+
+    Called directly from UI.
+    """
+    for project in self._frame.SelectedProjects():
+      supervisor = self._FindOrCreateSupervisor(project)
+      frame = launcher.TextFrame('Crash Reports (%s)' % project.name)
+      frame.AppendText(supervisor.FormatCrashReports())
+      frame.DisplayAndBringToFront()
+
   def _DeleteThreadIfNeeded(self, project):
     """If we have a thread for the project and it isn't running, delete it.
 
@@ -329,6 +929,18 @@ class TaskController(object):
     """
     return launcher.Platform()
 
+  def _ServedPort(self, project):
+    """Return the port a running project is actually being served on.
+
+    This is the port the dev_appserver announced when it started, or
+    the project's configured port if we don't know better.
+
+    Args:
+      project: the project whose port we want
+    """
+    thread = self._FindThreadForProject(project)
+    return (thread and thread.served_port) or project.port
+
   def _BrowseProject(self, project, browsefunc=webbrowser.open):
     """Unconditionally browse the specified project.
 
@@ -336,7 +948,7 @@ class TaskController(object):
       project: the project we want to browse
       browsefunc: if set, use as a browsing function that takes 1 arg, a URL
     """
-    browsefunc('http://localhost:%d' % project.port)
+    browsefunc('http://localhost:%d' % self._ServedPort(project))
 
   def _BrowseAdminConsoleForProject(self, project, browsefunc=webbrowser.open):
     """Unconditionally browse the SDK Administration Console for the project.
@@ -345,7 +957,7 @@ class TaskController(object):
       project: the project whose admin console we want to browse
       browsefunc: if set, use as a browsing function that takes 1 arg, a URL
     """
-    browsefunc('http://localhost:%d/_ah/admin' % project.port)
+    browsefunc('http://localhost:%d/_ah/admin' % self._ServedPort(project))
 
   def _BrowseDashboardForProject(self, project, browsefunc=webbrowser.open):
     """Unconditionally browse the Dashoard for the project.
@@ -366,9 +978,30 @@ class TaskController(object):
   def DisplayProjectOutput(self, project, text):
     """For the output from |project|, send to the appropriate UI.
 
+    The output is split into lines once, and the complete lines are
+    handed to each of the project's analyzers.
+
     Args:
       project: the project whose output we now have
       text: the output from the project that needs display
     """
-    console = self._FindOrCreateConsole(project)
-    console.AppendText(text)
+    lines = self._FindOrCreateLineSplitter(project).Split(text)
+    self._FindOrCreateRequestStats(project).AddLines(lines)
+    self._FindOrCreateErrorGroups(project).AddLines(lines)
+    self._FindOrCreateMetrics(project).AddLines(lines)
+    self._FindOrCreateSupervisor(project).AddLines(lines)
+    alerts = self._FindOrCreateAlertMonitor(project).AddLines(lines)
+    if alerts and self._frame:
+      (pattern, line) = alerts[-1]
+      self._frame.ShowAlert(project, pattern, line, len(alerts))
+    project_log = self._FindOrCreateProjectLog(project)
+    folder = self._FindOrCreateRepeatFolder(project)
+    if folder:
+      folded = folder.Fold(text)
+    else:
+      folded = [(text, 0)]
+    for (chunk, repeats) in folded:
+      if chunk:
+        project_log.AppendText(chunk)
+      if repeats:
+        project_log.AddRepeats(repeats)
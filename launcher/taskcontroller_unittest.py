@@ -17,6 +17,9 @@
 
 """Unittests for taskcontroller.py"""
 
+import os
+import shutil
+import tempfile
 import unittest
 import wx
 import mox
@@ -45,6 +48,44 @@ class FakeDevAppServerTaskThread(launcher.DevAppServerTaskThread):
     self.runval -= 1
 
 
+class FakeShutdownThread(object):
+  """A task thread which exits as soon as it is stopped."""
+
+  def __init__(self, project):
+    self.project = project
+    self.alive = True
+
+  def isAlive(self):
+    return self.alive
+
+  def stop(self):
+    self.alive = False
+
+
+class FakeProgressDialog(object):
+
+  def __init__(self, title, message, maximum, style):
+    self.message = message
+    self.value = 0
+    self.destroyed = False
+
+  def Update(self, value, message):
+    self.value = value
+    self.message = message
+
+  def Destroy(self):
+    self.destroyed = True
+
+
+class FakeShutdownPlatform(object):
+
+  def __init__(self, filename):
+    self.filename = filename
+
+  def ShutdownFile(self):
+    return self.filename
+
+
 class TaskControllerTest(unittest.TestCase):
 
   def setUp(self):
@@ -231,23 +272,213 @@ class TaskControllerTest(unittest.TestCase):
     mox.Verify(frame_mock)
     self.assertTrue(self.looked_for)
 
-  def _FindOrCreateConsoleDPO(self, project):
+  def testRunStateChangedRestarts(self):
+    project = launcher.Project('/tmp/himom', 8000,
+                               restart_policy='on-failure')
+    project.runstate = launcher.Project.STATE_DIED
+    tc = launcher.TaskController(FakeAppController())
+    thread = FakeShutdownThread(project)
+    thread.killed = False
+    thread.cmd = ['dev_appserver.py']
+    tc._threads = [thread]
+    output = []
+    tc.DisplayProjectOutput = lambda project, text: output.append(text)
+    tc.RunStateChanged(project)
+    self.assertEqual([], tc._threads)
+    self.assertTrue(output[0].startswith('(Restarting in'))
+    self.assertTrue(project in tc._restart_timers)
+    started = []
+    tc._StartTask = lambda project, cmd: started.append(cmd)
+    tc._RestartProject(project, thread.cmd)
+    self.assertEqual([['dev_appserver.py']], started)
+    # A task we stopped is not restarted.
+    thread.killed = True
+    tc._threads = [thread]
+    tc.RunStateChanged(project)
+    self.assertFalse(project in tc._restart_timers)
+
+  def testProjectHung(self):
+    project = launcher.Project('/tmp/himom', 8000, restart_policy='always')
+    project.runstate = launcher.Project.STATE_RUN
+    tc = launcher.TaskController(FakeAppController())
+    thread = FakeShutdownThread(project)
+    thread.killed = False
+    thread.cmd = ['dev_appserver.py']
+    thread.kill = lambda: setattr(thread, 'killed', True)
+    tc._threads = [thread]
+    output = []
+    tc.DisplayProjectOutput = lambda project, text: output.append(text)
+    tc._ProjectHung(thread, 60)
+    self.assertTrue(project.unresponsive)
+    self.assertTrue(thread.killed)
+    self.assertTrue(output[0].startswith('(Unresponsive'))
+    # Though we killed it, it is restarted.
+    project.runstate = launcher.Project.STATE_STOP
+    self.assertFalse(project.unresponsive)
+    tc.RunStateChanged(project)
+    self.assertTrue(project in tc._restart_timers)
+    tc._CancelRestart(project)
+
+  def _FindOrCreateProjectLogDPO(self, project):
     """Override of TaskController's method to return a mock.
 
     For use with testDisplayProjectOutput, below.
     """
     self.assertTrue(project == 'momproject')
-    self.console = mox.MockObject(launcher.LogConsole)
-    self.console.AppendText('hi')
-    mox.Replay(self.console)
-    return self.console
+    self.project_log = mox.MockObject(launcher.ProjectLog)
+    self.project_log.AppendText('hi')
+    mox.Replay(self.project_log)
+    return self.project_log
 
   def testDisplayProjectOutput(self):
     """Test of TaskController's DisplayProjectOutput."""
     tc = launcher.TaskController(FakeAppController())
-    tc._FindOrCreateConsole = self._FindOrCreateConsoleDPO
+    tc._FindOrCreateProjectLog = self._FindOrCreateProjectLogDPO
     tc.DisplayProjectOutput('momproject', 'hi')
-    mox.Verify(self.console)
+    mox.Verify(self.project_log)
+
+  def testDisplayProjectOutputCountsRequests(self):
+    tc = launcher.TaskController(FakeAppController())
+    project_log = mox.MockObject(launcher.ProjectLog)
+    project_log.AppendText(mox.IgnoreArg()).MultipleTimes()
+    mox.Replay(project_log)
+    tc._FindOrCreateProjectLog = lambda project: project_log
+    request = 'INFO x.py:1] "GET / HTTP/1.1" '
+    tc.DisplayProjectOutput('momproject', request + '200 -\n')
+    tc.DisplayProjectOutput('momproject', request + '404')
+    stats = tc._FindOrCreateRequestStats('momproject')
+    self.assertEqual(1, stats.request_count)
+    tc.DisplayProjectOutput('momproject', ' -\n')
+    self.assertEqual(2, stats.request_count)
+
+  def testDisplayProjectOutputGroupsTracebacks(self):
+    tc = launcher.TaskController(FakeAppController())
+    project_log = mox.MockObject(launcher.ProjectLog)
+    project_log.AppendText(mox.IgnoreArg()).MultipleTimes()
+    mox.Replay(project_log)
+    tc._FindOrCreateProjectLog = lambda project: project_log
+    tc.DisplayProjectOutput('momproject',
+                            'Traceback (most recent call last):\n'
+                            '  File "main.py", line 3, in get\n')
+    tc.DisplayProjectOutput('momproject', 'NameError: x\n')
+    groups = tc._FindOrCreateErrorGroups('momproject')
+    self.assertEqual(['NameError'],
+                     [group.exception_type for group in groups.Groups()])
+
+  def testDisplayProjectOutputRaisesAlerts(self):
+    tc = launcher.TaskController(FakeAppController())
+    project_log = mox.MockObject(launcher.ProjectLog)
+    project_log.AppendText(mox.IgnoreArg()).MultipleTimes()
+    mox.Replay(project_log)
+    frame_mock = mox.MockObject(launcher.MainFrame)
+    frame_mock.ShowAlert('momproject', 'OverQuotaError',
+                         'OverQuotaError: 2', 2)
+    mox.Replay(frame_mock)
+    prefs = {launcher.Preferences.PREF_ALERT_PATTERNS: 'OverQuotaError',
+             launcher.Preferences.PREF_NO_FOLD_REPEATS: None}
+    tc.SetModelsViews(frame=frame_mock, preferences=prefs)
+    tc._FindOrCreateProjectLog = lambda project: project_log
+    tc.DisplayProjectOutput('momproject', 'fine\nOverQuotaError: 1\n'
+                            'OverQuotaError: 2\n')
+    mox.Verify(frame_mock)
+
+  def testDisplayProjectOutputFoldsRepeats(self):
+    tc = launcher.TaskController(FakeAppController())
+    project_log = mox.MockObject(launcher.ProjectLog)
+    project_log.AppendText('a\nb\n')
+    project_log.AddRepeats(2)
+    project_log.AppendText('c\n')
+    mox.Replay(project_log)
+    tc._FindOrCreateProjectLog = lambda project: project_log
+    tc.DisplayProjectOutput('momproject', 'a\nb\nb\nb\nc\n')
+    mox.Verify(project_log)
+
+  def testDisplayProjectOutputMakesNoConsole(self):
+    """Output is kept without a LogConsole until one is asked for."""
+    tc = launcher.TaskController(FakeAppController())
+    tc._FindOrCreateJournal = lambda project: None
+    tc.DisplayProjectOutput('momproject', 'hi\n')
+    self.assertEqual([], tc._consoles)
+    self.assertEqual('hi\n',
+                     tc._FindOrCreateProjectLog('momproject').store.GetText())
+
+  def testShutdown(self):
+    dirname = tempfile.mkdtemp()
+    try:
+      filename = os.path.join(dirname, 'shutdown.ini')
+      projects = self.Projects(2)
+      tc = launcher.TaskController(FakeAppController())
+      tc.SetModelsViews(platform=FakeShutdownPlatform(filename))
+      tc._threads = [FakeShutdownThread(project) for project in projects]
+      dialogs = []
+      done = []
+      tc.Shutdown(lambda: done.append(True),
+                  lambda *args, **kwargs: dialogs.append(args))
+      self.assertEqual([], dialogs)  # all stopped at once
+      self.assertEqual([True], done)
+      self.assertFalse(tc._threads[0].alive)
+      self.assertFalse(tc._threads[1].alive)
+      record = launcher.TaskShutdown.LoadRecord(filename)
+      self.assertEqual([(projects[0].path, projects[0].name, 'stopped'),
+                        (projects[1].path, projects[1].name, 'stopped')],
+                       record)
+      # A project killed last time is noted in its output.
+      shutdown = launcher.TaskShutdown([FakeShutdownThread(projects[1])])
+      shutdown.Save(filename)
+      output = []
+      tc.DisplayProjectOutput = lambda project, text: output.append(
+          (project, text))
+      tc.ReportLastShutdown(projects)
+      self.assertEqual(1, len(output))
+      self.assertEqual(projects[1], output[0][0])
+      self.assertTrue('Not cleanly stopped' in output[0][1])
+      self.assertFalse(os.path.exists(filename))
+    finally:
+      shutil.rmtree(dirname)
+
+  def testShutdownWaits(self):
+    """Tasks slow to stop are waited for on a timer, not in a loop."""
+    calls = []
+    def FakeCallLater(ms, callable, *args):
+      calls.append(callable)
+    orig_calllater = wx.CallLater
+    wx.CallLater = FakeCallLater
+    dirname = tempfile.mkdtemp()
+    try:
+      filename = os.path.join(dirname, 'shutdown.ini')
+      projects = self.Projects(2)
+      tc = launcher.TaskController(FakeAppController())
+      tc.SetModelsViews(platform=FakeShutdownPlatform(filename))
+      tc._threads = [FakeShutdownThread(project) for project in projects]
+      slow = tc._threads[1]
+      slow.stop = lambda: None
+      dialogs = []
+      def FakeDialog(*args, **kwargs):
+        dialogs.append(FakeProgressDialog(*args, **kwargs))
+        return dialogs[-1]
+      done = []
+      tc.Shutdown(lambda: done.append(True), FakeDialog)
+      self.assertEqual([], done)
+      self.assertEqual(1, len(dialogs))
+      self.assertEqual([tc._OnShutdownTimer], calls)
+      calls.pop()()
+      self.assertEqual([], done)
+      self.assertEqual(1, dialogs[0].value)
+      self.assertEqual(1, len(calls))
+      slow.alive = False
+      calls.pop()()
+      self.assertEqual([True], done)
+      self.assertTrue(dialogs[0].destroyed)
+      self.assertEqual([], calls)
+      self.assertEqual(['stopped', 'stopped'],
+                       [state for (_, _, state)
+                        in launcher.TaskShutdown.LoadRecord(filename)])
+      # Asking again does nothing.
+      tc.Shutdown(lambda: done.append(True), FakeDialog)
+      self.assertEqual([True], done)
+    finally:
+      wx.CallLater = orig_calllater
+      shutil.rmtree(dirname)
 
   def testSDKConsole(self):
     projects = self.Projects(5)
@@ -15,13 +15,16 @@
 # limitations under the License.
 #
 
+import logging
 import os
-import re
 import subprocess
 import time
 import threading
 import wx
 import launcher
+import launch_detector
+import line_reader
+import task_multiplexer
 
 
 # TODO(jrg): rename this file task_thread.py
@@ -30,12 +33,33 @@ class TaskThread(threading.Thread):
 
   This thread creates a subprocess and directs the subprocess output
   to the task controller for display.  All tasks have an associated
-  project.
+  project.  Where the platform allows, the output is actually read by
+  the shared TaskMultiplexer and no thread is started; see start().
 
   All callbacks initiated from this class (e.g. DisplayProjectOutput,
   _TaskWillStart) are called on the main thread with wx.CallAfter().
+
+  Output is not delivered one line at a time.  Lines accumulate in a
+  pending buffer which is flushed to the controller as a single chunk
+  at most once per _OUTPUT_FLUSH_INTERVAL_MS, so a chatty subprocess
+  can't flood the wx event queue.  The buffer is also flushed right
+  before any run state callback so text and callbacks stay in order.
+  If the main thread falls so far behind that the buffer reaches
+  _MAX_PENDING_BYTES, further lines are counted rather than kept, and
+  the count is shown when the buffer is next flushed.
+
+  Every line is passed on: the journal and the output analyzers must
+  see all of it.  Only the LogConsole's text control samples output
+  that comes too fast to render (see LogConsole.SetOutputRateLimit()).
   """
 
+  # How often (in milliseconds) pending output is handed to the
+  # main thread.  33ms is roughly 30 updates per second.
+  _OUTPUT_FLUSH_INTERVAL_MS = 33
+
+  # Most bytes of output held for the main thread between flushes.
+  _MAX_PENDING_BYTES = 4 * 1024 * 1024
+
   def __init__(self, controller, project, cmd, stdin=None):
     """Initialize a new TaskThread.
 
@@ -54,36 +78,131 @@ class TaskThread(threading.Thread):
     self._cmd = cmd
     self._stdin = stdin
     self.process = None
+    # self.reader: a LineReader on the subprocess output, once started
+    self.reader = None
+    # self._launch_detector: spots the "we've started!" output line
+    # self._multiplexed: True if the TaskMultiplexer reads our output
+    # self._running: for a multiplexed task, True until the process exits
+    # self._killed: True once stop() has killed the process
+    self._launch_detector = launch_detector.LaunchDetector(
+        getattr(project, 'launch_patterns', None))
+    self._multiplexed = False
+    self._running = False
+    self._killed = False
+    # self._output_lock: protects the pending output buffer and flag below
+    # self._pending_output: lines not yet handed to the main thread
+    # self._pending_bytes: the length of the lines in _pending_output
+    # self._pending_dropped: lines left out since _pending_output was full
+    # self._flush_scheduled: True if a timed flush is already on its way
+    self._output_lock = threading.Lock()
+    self._pending_output = []
+    self._pending_bytes = 0
+    self._pending_dropped = 0
+    self._flush_scheduled = False
+
+  # Override of threading.Thread method so NotToBeCamelCased
+  def start(self):
+    """Start the task.
+
+    Where possible the subprocess output is read by the shared
+    TaskMultiplexer rather than by a thread of our own; this object
+    is then just a handle on the task.  Otherwise (e.g. on Windows)
+    we fall back to running as a real thread.
+    """
+    if not self._UseMultiplexer():
+      super(TaskThread, self).start()
+      return
+    self._multiplexed = True
+    self._running = True
+    try:
+      self._StartProcess()
+    except OSError, err:
+      self.LogOutput('Cannot run command: %s\n' % err, date=True)
+      self._HandleExit(-1)
+      return
+    self._Multiplexer().AddTask(self)
 
   # Override of threading.Thread method so NotToBeCamelCased
   def run(self):
+    self._StartProcess()
+    while not self.reader.at_eof:
+      for line in self.reader.Read():
+        self._HandleOutputLine(line)
+    # if we get here: process died (or is about to), so thread can die.
+    self._HandleExit(self.process.wait())
+
+  def isAlive(self):
+    """Return whether our task is running.
+
+    Override of threading.Thread method, since a multiplexed task never
+    starts a real thread.
+    """
+    if self._multiplexed:
+      return self._running
+    return super(TaskThread, self).isAlive()
+
+  is_alive = isAlive
+
+  def _UseMultiplexer(self):
+    """Return True if our output should be read by the TaskMultiplexer.
+
+    Split out for easier unit testing.
+    """
+    return task_multiplexer.TaskMultiplexer.IsSupported()
+
+  def _Multiplexer(self):
+    """Return the TaskMultiplexer which reads our output.
+
+    Split out for easier unit testing.
+    """
+    return task_multiplexer.TaskMultiplexer.Instance()
+
+  def _StartProcess(self):
+    """Announce the task is starting, then start its subprocess.
+
+    The subprocess gets a process group of its own, so stop() kills
+    whatever it starts along with it.
+    """
     self._TaskWillStart()
     self.LogOutput('Running command: \"%s\"\n' % str(self._cmd), date=True)
-    self.process = subprocess.Popen(self._cmd,
-                                    stdin=self._stdin,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.STDOUT)
-    try:
-      started = False
-      while True:
-        line = self.process.stdout.readline()
-        if not line:
-          break
-        self.LogOutput(line)
-        if not started:
-          # Don't declare ourselves as 'started' until we see the subprocess
-          # announce that it is ready.
-          if self._IsLaunchCompletedLogLine(line):
-            self._TaskDidStart()
-            started = True
-
-    except IOError:
-      pass
-    # if we get here: process died (or is about to), so thread can die.
-    code = self.process.wait()
+    self._killed = False
+    self.process = subprocess.Popen(
+        self._PlatformObject().NewProcessGroupCommand(self._cmd),
+        stdin=self._stdin, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    self.reader = line_reader.LineReader(self.process.stdout.fileno())
+
+  def _HandleOutputLine(self, line):
+    """Handle one line of output from our subprocess.
+
+    Called from whichever thread reads our output.
+
+    Args:
+      line: a line of output, including its newline (if any)
+    """
+    self.LogOutput(line)
+    # Don't declare ourselves as 'started' until we see the subprocess
+    # announce that it is ready.  The detector stops looking after that.
+    if self._launch_detector.Check(line):
+      self._TaskDidStart()
+
+  def _HandleExit(self, code):
+    """Handle the exit of our subprocess.
+
+    Called from whichever thread reads our output.
+
+    Args:
+      code: the return code of our subprocess
+    """
     self.LogOutput('(Process exited with code %d)\n\n' % code, date=True)
+    for (pid, command, orphan_code) in self._PlatformObject().ReapOrphans():
+      self.LogOutput('(Orphaned process %d (%s) exited with code %d)\n' %
+                     (pid, command, orphan_code), date=True)
+    logging.info('Task for %s read %d bytes in %d lines of output' %
+                 (getattr(self._project, 'name', self._project),
+                  self.bytes_read, self.lines_read))
     self._TaskDidStop(code)
     self.process = None
+    self._running = False
 
   def _IsLaunchCompletedLogLine(self, line):
     """Is the line that was logged the "hey, we've started!" value?
@@ -95,16 +214,25 @@ class TaskThread(threading.Thread):
       True if the line is a special line that indicates that the subprocess
       as started.  False otherwise.
     """
-    if re.match('.*Running application.*http://[^:]+:[0-9]+', line):
-      return True
-    return False
+    return self._launch_detector.Match(line) is not None
 
   # Override of threading.Thread method so NotToBeCamelCased
   def stop(self):
-    if not self.process:
+    """Kill our subprocess (and its process group), if it's running."""
+    process = self.process
+    if not process:
       return
     platform = self._PlatformObject()
-    platform.KillProcess(self.process)
+    self._killed = True
+    platform.KillProcess(process)
+
+  def kill(self):
+    """Kill our subprocess at once, if it's running; stop() is gentler."""
+    process = self.process
+    if not process:
+      return
+    self._killed = True
+    self._PlatformObject().ForceKillProcess(process)
 
   def _PlatformObject(self):
     """Return a platform object.
@@ -122,13 +250,73 @@ class TaskThread(threading.Thread):
     """
     if date:
       line = time.strftime("%Y-%m-%d %X") + ' ' + line
-    wx.CallAfter(self._controller.DisplayProjectOutput, self._project, line)
+    self._output_lock.acquire()
+    try:
+      if self._pending_bytes + len(line) > self._MAX_PENDING_BYTES:
+        self._pending_dropped += 1
+      else:
+        self._pending_output.append(line)
+        self._pending_bytes += len(line)
+      schedule = not self._flush_scheduled
+      self._flush_scheduled = True
+    finally:
+      self._output_lock.release()
+    if schedule:
+      wx.CallAfter(self._ScheduleOutputFlush)
+
+  def _ScheduleOutputFlush(self):
+    """Arrange for pending output to be flushed on the next tick.
+
+    Called on the main thread, since wx timers must be created there.
+    """
+    wx.CallLater(self._OUTPUT_FLUSH_INTERVAL_MS, self._OnOutputFlushTimer)
+
+  def _OnOutputFlushTimer(self):
+    """Flush pending output; called on the main thread by a timer."""
+    self._output_lock.acquire()
+    try:
+      self._flush_scheduled = False
+      self._FlushOutputLocked()
+    finally:
+      self._output_lock.release()
+
+  def _FlushOutput(self):
+    """Hand all pending output to the main thread as one chunk.
+
+    Safe to call from any thread.  Called before every run state
+    callback so the controller sees text and state changes in the
+    order they happened.
+    """
+    self._output_lock.acquire()
+    try:
+      self._FlushOutputLocked()
+    finally:
+      self._output_lock.release()
+
+  def _FlushOutputLocked(self):
+    """Like _FlushOutput(), but self._output_lock must already be held.
+
+    wx.CallAfter() is done while holding the lock so that chunks are
+    queued in the same order the lines were logged.
+    """
+    if self._pending_dropped:
+      self._pending_output.append(
+          '...%d lines dropped while the display caught up...\n' %
+          self._pending_dropped)
+      self._pending_dropped = 0
+    if not self._pending_output:
+      return
+    text = ''.join(self._pending_output)
+    self._pending_output = []
+    self._pending_bytes = 0
+    wx.CallAfter(self._controller.DisplayProjectOutput, self._project, text)
 
   def _TaskWillStart(self):
     """If our controller has a _TaskWillStart, call it on the main thread.
 
     The controller's property is called with our project as an arg.
     This method is called right before the task is started."""
+    self._FlushOutput()
     attr = getattr(self._controller, '_TaskWillStart', None)
     if attr and callable(attr):
       wx.CallAfter(attr, self.project)
@@ -138,6 +326,7 @@ class TaskThread(threading.Thread):
 
     The controller's property is called with our project as an arg.
     This method is called right after the task is started."""
+    self._FlushOutput()
     attr = getattr(self._controller, '_TaskDidStart', None)
     if attr and callable(attr):
       wx.CallAfter(attr, self.project)
@@ -148,6 +337,7 @@ class TaskThread(threading.Thread):
     The controller's property is called with our project and the
     task result code as arguments.
     This method is called right after the task has stopped."""
+    self._FlushOutput()
     attr = getattr(self._controller, '_TaskDidStop', None)
     if attr and callable(attr):
       wx.CallAfter(attr, self.project, code)
@@ -156,3 +346,32 @@ class TaskThread(threading.Thread):
   def project(self):
     """A taskthread's project is read-only."""
     return self._project
+
+  @property
+  def cmd(self):
+    """The command our subprocess runs."""
+    return self._cmd
+
+  @property
+  def killed(self):
+    """True if we stopped (or killed) our subprocess."""
+    return self._killed
+
+  @property
+  def served_port(self):
+    """The port announced in the launch line, or None if not (yet) known."""
+    return self._launch_detector.port
+
+  @property
+  def bytes_read(self):
+    """The number of bytes of output read from our subprocess."""
+    if not self.reader:
+      return 0
+    return self.reader.bytes_read
+
+  @property
+  def lines_read(self):
+    """The number of lines of output read from our subprocess."""
+    if not self.reader:
+      return 0
+    return self.reader.lines_read
@@ -33,7 +33,7 @@ class TaskThreadTest(unittest.TestCase):
     # Must always create a wx.App first
     self.app = wx.PySimpleApp()
 
-  def doTestThreadRun(self, killit=False):
+  def doTestThreadRun(self, killit=False, multiplexed=True):
     """Run a command, watch for state change.
     Optionally kill it to speed up death.
     """
@@ -47,6 +47,8 @@ class TaskThreadTest(unittest.TestCase):
     # Start a task ripe for the killing.
     command = [sys.executable, '-c', 'import time; time.sleep(%d)' % secs]
     tt = launcher.TaskThread(controller, project, command)
+    if not multiplexed:
+      tt._UseMultiplexer = lambda: False
     tt.start()
     # TODO(jrg): is this a reasonable chance?
     for i in range(20):
@@ -69,6 +71,12 @@ class TaskThreadTest(unittest.TestCase):
   def testKilled(self):
     self.doTestThreadRun(killit=True)
 
+  def testRunOutThreaded(self):
+    self.doTestThreadRun(killit=False, multiplexed=False)
+
+  def testKilledThreaded(self):
+    self.doTestThreadRun(killit=True, multiplexed=False)
+
   def testLaunchLogLineCompleted(self):
     tt = launcher.TaskThread(self, None, None)
     line = ('INFO     2009-04-08 15:36:23,888 dev_appserver_main.py] Running '
@@ -88,6 +96,104 @@ class TaskThreadTest(unittest.TestCase):
             'module. ImportError: No module named _imaging')
     self.assertFalse(tt._IsLaunchCompletedLogLine(line))
 
+  def DisplayProjectOutput(self, project, text):
+    """We use ourself as a fake controller for output batching tests."""
+    self.displayed.append(text)
+
+  def _TaskDidStart(self, project):
+    """We use ourself as a fake controller for output batching tests."""
+    self.displayed.append('<started>')
+
+  def testOutputBatching(self):
+    """Many lines become one wx.CallAfter(); callbacks stay in order."""
+    calls = []
+    def FakeCallAfter(callable, *args):
+      calls.append((callable, args))
+    orig_callafter = wx.CallAfter
+    wx.CallAfter = FakeCallAfter
+    try:
+      self.displayed = []
+      tt = launcher.TaskThread(self, 'proj', None)
+      for i in range(100):
+        tt.LogOutput('line %d\n' % i)
+      # Only a single request to schedule a flush; nothing displayed yet.
+      self.assertEqual(1, len(calls))
+      self.assertEqual(tt._ScheduleOutputFlush, calls[0][0])
+      del calls[:]
+      tt._OnOutputFlushTimer()
+      self.assertEqual(1, len(calls))
+      (callable, args) = calls.pop()
+      callable(*args)
+      self.assertEqual(1, len(self.displayed))
+      self.assertEqual(100, self.displayed[0].count('\n'))
+      # A flush with nothing pending is a no-op.
+      tt._OnOutputFlushTimer()
+      self.assertFalse(calls)
+      # Text logged before a callback must be displayed before it.
+      self.displayed = []
+      tt.LogOutput('before\n')
+      del calls[:]
+      tt._TaskDidStart()
+      for (callable, args) in calls:
+        callable(*args)
+      self.assertEqual(['before\n', '<started>'], self.displayed)
+    finally:
+      wx.CallAfter = orig_callafter
+
+  def testRunawayOutputIsNotDropped(self):
+    """However fast a task prints, every line reaches the controller."""
+    calls = []
+    def FakeCallAfter(callable, *args):
+      calls.append((callable, args))
+    def FakeCallLater(ms, callable, *args):
+      calls.append((callable, args))
+    orig_callafter = wx.CallAfter
+    orig_calllater = wx.CallLater
+    wx.CallAfter = FakeCallAfter
+    wx.CallLater = FakeCallLater
+    try:
+      self.displayed = []
+      tt = launcher.TaskThread(self, 'proj', None)
+      for i in range(10000):
+        tt._HandleOutputLine('line %d\n' % i)
+      del calls[:]
+      tt._OnOutputFlushTimer()
+      (callable, args) = calls.pop(0)
+      callable(*args)
+      self.assertEqual(10000, self.displayed[0].count('\n'))
+      self.assertFalse(calls)
+    finally:
+      wx.CallAfter = orig_callafter
+      wx.CallLater = orig_calllater
+
+  def testPendingOutputIsCapped(self):
+    """If the main thread falls behind, pending output stops growing."""
+    calls = []
+    def FakeCallAfter(callable, *args):
+      calls.append((callable, args))
+    orig_callafter = wx.CallAfter
+    wx.CallAfter = FakeCallAfter
+    try:
+      self.displayed = []
+      tt = launcher.TaskThread(self, 'proj', None)
+      tt._MAX_PENDING_BYTES = 100
+      for i in range(20):
+        tt.LogOutput('line %04d\n' % i)  # 10 bytes each
+      del calls[:]
+      tt._FlushOutput()
+      (callable, args) = calls.pop(0)
+      callable(*args)
+      self.assertEqual(''.join(['line %04d\n' % i for i in range(10)]) +
+                       '...10 lines dropped while the display caught up...\n',
+                       self.displayed[0])
+      tt.LogOutput('more\n')
+      tt._FlushOutput()
+      (callable, args) = calls.pop(-1)
+      callable(*args)
+      self.assertEqual('more\n', self.displayed[1])
+    finally:
+      wx.CallAfter = orig_callafter
+
   # NOTE: the following pieces of TaskThread are explicitly tested in
   # deploy_controller_unittest.py's testTaskThreadForProject():
   # - use of stdin to on __init__
@@ -32,6 +32,12 @@ class ProjectSettingsDialog(wx.Dialog):
         self.app_port_text_ctrl = wx.TextCtrl(self, -1, "")
         self.full_flag_list_label = wx.StaticText(self, -1, "Extra Command Line Flags:")
         self.full_flag_list_text_ctrl = wx.TextCtrl(self, -1, "", style=wx.TE_MULTILINE)
+        self.restart_policy_label = wx.StaticText(self, -1, "Restart:")
+        self.restart_policy_choice = wx.Choice(self, -1, choices=["never", "on-failure", "always"])
+        self.launch_patterns_label = wx.StaticText(self, -1, "Launch Patterns:")
+        self.launch_patterns_text_ctrl = wx.TextCtrl(self, -1, "", style=wx.TE_MULTILINE)
+        self.metrics_label = wx.StaticText(self, -1, "Metrics:")
+        self.metrics_text_ctrl = wx.TextCtrl(self, -1, "", style=wx.TE_MULTILINE)
         self.update_button = wx.Button(self, -1, "Update")
         self.cancel_button = wx.Button(self, -1, "Cancel")
 
@@ -46,6 +52,11 @@ class ProjectSettingsDialog(wx.Dialog):
         self.app_path_text_ctrl.Enable(False)
         self.app_browse_button.Enable(False)
         self.full_flag_list_text_ctrl.SetMinSize((320,120))
+        self.restart_policy_choice.SetSelection(0)
+        self.launch_patterns_text_ctrl.SetMinSize((320,60))
+        self.launch_patterns_text_ctrl.SetToolTipString("Regular expressions, one per line, for the output line which means the application has started")
+        self.metrics_text_ctrl.SetMinSize((320,60))
+        self.metrics_text_ctrl.SetToolTipString("Metrics, one per line, as name=regular expression; the first group, if any, is the value")
         self.update_button.SetDefault()
         # end wxGlade
 
@@ -54,7 +65,7 @@ class ProjectSettingsDialog(wx.Dialog):
         sizer_1 = wx.BoxSizer(wx.VERTICAL)
         sizer_4 = wx.BoxSizer(wx.HORIZONTAL)
         sizer_3 = wx.StaticBoxSizer(self.sizer_3_staticbox, wx.HORIZONTAL)
-        grid_sizer_2 = wx.FlexGridSizer(1, 3, 10, 10)
+        grid_sizer_2 = wx.FlexGridSizer(4, 3, 10, 10)
         sizer_2 = wx.StaticBoxSizer(self.sizer_2_staticbox, wx.VERTICAL)
         grid_sizer_1 = wx.FlexGridSizer(3, 3, 10, 10)
         app_name_label = wx.StaticText(self, -1, "Application Name:")
@@ -73,6 +84,15 @@ class ProjectSettingsDialog(wx.Dialog):
         grid_sizer_2.Add(self.full_flag_list_label, 0, wx.ALIGN_RIGHT, 10)
         grid_sizer_2.Add(self.full_flag_list_text_ctrl, 1, wx.EXPAND, 0)
         grid_sizer_2.Add((84, 20), 0, 0, 0)
+        grid_sizer_2.Add(self.restart_policy_label, 0, wx.ALIGN_RIGHT, 10)
+        grid_sizer_2.Add(self.restart_policy_choice, 0, 0, 0)
+        grid_sizer_2.Add((20, 20), 0, 0, 0)
+        grid_sizer_2.Add(self.launch_patterns_label, 0, wx.ALIGN_RIGHT, 10)
+        grid_sizer_2.Add(self.launch_patterns_text_ctrl, 1, wx.EXPAND, 0)
+        grid_sizer_2.Add((20, 20), 0, 0, 0)
+        grid_sizer_2.Add(self.metrics_label, 0, wx.ALIGN_RIGHT, 10)
+        grid_sizer_2.Add(self.metrics_text_ctrl, 1, wx.EXPAND, 0)
+        grid_sizer_2.Add((20, 20), 0, 0, 0)
         grid_sizer_2.AddGrowableCol(1)
         sizer_3.Add(grid_sizer_2, 0, wx.EXPAND|wx.SHAPED, 10)
         sizer_1.Add(sizer_3, 0, wx.LEFT|wx.RIGHT|wx.BOTTOM|wx.EXPAND, 15)